@@ -0,0 +1,58 @@
+"""
+PlantRoute inference server on Modal: every engine in one container.
+Mounts the engines' FastAPI apps under path prefixes (same request/response contracts as the per-engine apps):
+  /preference/predict                  (ml.preference_engine)
+  /regret_protection/predict           (ml.regret_protection_engine)
+  /dual_regret/predict                 (ml.dual_regret: both of the above in one call)
+  /preference_xgboost/score, /batch_score, ...  (ml.preference_engine_XGBoost)
+  /carbon/carbon_predictor, /carbon/optimize_alternatives  (ml.carbon_engine)
+plus /health and /metrics for the whole process. Engines are imported and their models loaded on first use;
+set ML_SERVER_PRELOAD (comma-separated prefixes) to pay that at container start instead.
+
+Deploy from my-app (directory that contains both modal_apps/ and src/):
+  modal deploy modal_apps/inference_server.py
+Then point PREFERENCE_ENGINE_XGBOOST_URL at <url>/preference_xgboost, MODAL_PREFERENCE_URL at <url>/preference/predict,
+MODAL_DUAL_REGRET_URL at <url>/dual_regret/predict, etc.
+"""
+
+import sys
+from pathlib import Path
+
+import modal
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = ROOT / "src"
+REMOTE_WORKSPACE = "/workspace/src"
+XGB_MODEL_REL = "ml/preference_engine_XGBoost/artifacts/model.joblib"
+
+app = modal.App("plantroute-inference")
+
+image = (
+    modal.Image.debian_slim(python_version="3.11")
+    .pip_install(
+        "numpy",
+        "pandas",
+        "pydantic",
+        "scikit-learn",
+        "xgboost",
+        "joblib",
+        "fastapi[standard]",
+    )
+    .add_local_dir(str(SRC_DIR), remote_path=REMOTE_WORKSPACE)
+)
+
+
+@app.function(
+    image=image,
+    env={
+        "PREFERENCE_ENGINE_XGBOOST_MODEL_PATH": f"{REMOTE_WORKSPACE}/{XGB_MODEL_REL}",
+        "ML_SERVER_PRELOAD": "preference_xgboost",
+    },
+    allow_concurrent_inputs=50,
+)
+@modal.asgi_app(label="plantroute-inference")
+def create_asgi():
+    sys.path.insert(0, REMOTE_WORKSPACE)
+    from ml.serving.server import app as server_app
+
+    return server_app
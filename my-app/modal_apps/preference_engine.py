@@ -4,7 +4,7 @@ Regret-risk prediction: user_preferences + itinerary_item -> regret_probability
 
 NOT USED for attraction recommendations; the app uses the XGBoost engine (see preference_engine_xgboost.py).
 Code kept for reference. Deploy from my-app: modal deploy modal_apps/preference_engine.py
-Ensure src/ml/preference_engine/data/model.pkl exists (run: python -m ml.preference_engine.train from src/).
+Ensure src/ml/preference_engine/data/model.npz exists (run: python -m ml.preference_engine.train from src/).
 """
 
 import sys
@@ -19,48 +19,77 @@ app = modal.App("plantroute-preference-engine")
 
 image = (
     modal.Image.debian_slim(python_version="3.11")
-    .pip_install("numpy", "pandas", "scikit-learn", "pydantic", "fastapi[standard]")
+    # Serves data/model.npz (NumPy only); pandas / scikit-learn are needed for training, not here
+    .pip_install("numpy", "pydantic", "fastapi[standard]")
     .add_local_dir(str(MOUNT_PATH), remote_path=REMOTE_WORKSPACE)
 )
 
-_model_cache = None
 
+@app.cls(
+    image=image,
+    allow_concurrent_inputs=50,
+)
+class Engine:
+    """One instance per container: imports, model load and a warm-up prediction run once in @modal.enter."""
 
-def _get_model():
-    global _model_cache
-    if _model_cache is None:
+    @modal.enter()
+    def load(self):
         sys.path.insert(0, REMOTE_WORKSPACE)
-        from ml.preference_engine.model import load_model
+        from ml.serving.cold_start import StartupTimer
 
-        model_path = f"{REMOTE_WORKSPACE}/ml/preference_engine/data/model.pkl"
-        _model_cache = load_model(model_path)
-    return _model_cache
+        timer = StartupTimer()
+        with timer.stage("import"):
+            from ml.preference_engine.model import load_model, predict, predict_itinerary
+            from ml.preference_engine.schemas import (
+                ItineraryItem,
+                PredictItineraryRequest,
+                PredictItineraryResponse,
+                PredictRequest,
+                PredictResponse,
+                UserPreferences,
+            )
 
+        self._predict = predict
+        self._request_cls = PredictRequest
+        self._response_cls = PredictResponse
+        self._predict_itinerary = predict_itinerary
+        self._itinerary_request_cls = PredictItineraryRequest
+        self._itinerary_response_cls = PredictItineraryResponse
+        model_path = f"{REMOTE_WORKSPACE}/ml/preference_engine/data/model.npz"
+        self.model = timer.time_call("model_load", lambda: load_model(model_path))
 
-@app.function(
-    image=image,
-    allow_concurrent_inputs=50,
-)
-@modal.web_endpoint(method="POST")
-def predict(body: dict) -> dict:
-    """POST with JSON body: { user_preferences, itinerary_item, context? }. Returns { prediction }."""
-    sys.path.insert(0, REMOTE_WORKSPACE)
-    from ml.preference_engine.model import predict as run_predict
-    from ml.preference_engine.schemas import PredictRequest, PredictResponse
-
-    model = _get_model()
-    req = PredictRequest(**body)
-    ctx = req.context if req.context is not None else None
-    pred = run_predict(
-        prefs=req.user_preferences,
-        item=req.itinerary_item,
-        ctx=ctx,
-        model=model,
-    )
-    return PredictResponse(prediction=pred).model_dump()
-
-
-@app.function(image=image)
-@modal.web_endpoint(method="GET")
-def health() -> dict:
-    return {"status": "ok", "engine": "preference"}
+        def warmup():
+            return predict(prefs=UserPreferences(), item=ItineraryItem(), model=self.model)
+
+        timer.time_call("cold_call", warmup)  # first predict pays lazy init
+        timer.time_call("warm_call", warmup)
+        self.startup = timer.info()
+
+    # Labels keep the URLs of the former per-function endpoints
+    @modal.web_endpoint(method="POST", label="plantroute-preference-engine-predict")
+    def predict(self, body: dict) -> dict:
+        """POST with JSON body: { user_preferences, itinerary_item, context? }. Returns { prediction }."""
+        req = self._request_cls(**body)
+        pred = self._predict(
+            prefs=req.user_preferences,
+            item=req.itinerary_item,
+            ctx=req.context,
+            model=self.model,
+        )
+        return self._response_cls(prediction=pred).model_dump()
+
+    @modal.web_endpoint(method="POST", label="plantroute-preference-engine-predict-itinerary")
+    def predict_itinerary(self, body: dict) -> dict:
+        """POST with JSON body: { user_preferences, days: [{ items }], context? }. Returns { days }."""
+        req = self._itinerary_request_cls(**body)
+        days = self._predict_itinerary(
+            prefs=req.user_preferences,
+            days=[day.items for day in req.days],
+            ctx=req.context,
+            model=self.model,
+        )
+        return self._itinerary_response_cls(days=days).model_dump()
+
+    @modal.web_endpoint(method="GET", label="plantroute-preference-engine-health")
+    def health(self) -> dict:
+        return {"status": "ok", "engine": "preference", "startup": self.startup}
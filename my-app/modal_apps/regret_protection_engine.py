@@ -2,7 +2,7 @@
 PlantRoute regret protection engine on Modal.
 Safety-first regret-risk prediction; same request/response as preference_engine.
 Deploy from my-app: modal deploy modal_apps/regret_protection_engine.py
-Ensure src/ml/regret_protection_engine/data/model.pkl exists (run: python -m ml.regret_protection_engine.train from src/).
+Ensure src/ml/regret_protection_engine/data/model.npz exists (run: python -m ml.regret_protection_engine.train from src/).
 """
 
 import sys
@@ -16,48 +16,77 @@ REMOTE_WORKSPACE = "/workspace/src"
 app = modal.App("plantroute-regret-protection-engine")
 image = (
     modal.Image.debian_slim(python_version="3.11")
-    .pip_install("numpy", "pandas", "scikit-learn", "pydantic", "fastapi[standard]")
+    # Serves data/model.npz (NumPy only); pandas / scikit-learn are needed for training, not here
+    .pip_install("numpy", "pydantic", "fastapi[standard]")
     .add_local_dir(str(MOUNT_PATH), remote_path=REMOTE_WORKSPACE)
 )
 
-_model_cache = None
 
+@app.cls(
+    image=image,
+    allow_concurrent_inputs=50,
+)
+class Engine:
+    """One instance per container: imports, model load and a warm-up prediction run once in @modal.enter."""
 
-def _get_model():
-    global _model_cache
-    if _model_cache is None:
+    @modal.enter()
+    def load(self):
         sys.path.insert(0, REMOTE_WORKSPACE)
-        from ml.regret_protection_engine.model import load_model
+        from ml.serving.cold_start import StartupTimer
 
-        model_path = f"{REMOTE_WORKSPACE}/ml/regret_protection_engine/data/model.pkl"
-        _model_cache = load_model(model_path)
-    return _model_cache
+        timer = StartupTimer()
+        with timer.stage("import"):
+            from ml.regret_protection_engine.model import load_model, predict, predict_itinerary
+            from ml.regret_protection_engine.schemas import (
+                ItineraryItem,
+                PredictItineraryRequest,
+                PredictItineraryResponse,
+                PredictRequest,
+                PredictResponse,
+                UserPreferences,
+            )
 
+        self._predict = predict
+        self._request_cls = PredictRequest
+        self._response_cls = PredictResponse
+        self._predict_itinerary = predict_itinerary
+        self._itinerary_request_cls = PredictItineraryRequest
+        self._itinerary_response_cls = PredictItineraryResponse
+        model_path = f"{REMOTE_WORKSPACE}/ml/regret_protection_engine/data/model.npz"
+        self.model = timer.time_call("model_load", lambda: load_model(model_path))
 
-@app.function(
-    image=image,
-    allow_concurrent_inputs=50,
-)
-@modal.web_endpoint(method="POST")
-def predict(body: dict) -> dict:
-    """POST with JSON body: { user_preferences, itinerary_item, context? }. Returns { prediction }."""
-    sys.path.insert(0, REMOTE_WORKSPACE)
-    from ml.regret_protection_engine.model import predict as run_predict
-    from ml.regret_protection_engine.schemas import PredictRequest, PredictResponse
-
-    model = _get_model()
-    req = PredictRequest(**body)
-    ctx = req.context if req.context is not None else None
-    pred = run_predict(
-        prefs=req.user_preferences,
-        item=req.itinerary_item,
-        ctx=ctx,
-        model=model,
-    )
-    return PredictResponse(prediction=pred).model_dump()
-
-
-@app.function(image=image)
-@modal.web_endpoint(method="GET")
-def health() -> dict:
-    return {"status": "ok", "engine": "regret_protection"}
+        def warmup():
+            return predict(prefs=UserPreferences(), item=ItineraryItem(), model=self.model)
+
+        timer.time_call("cold_call", warmup)  # first predict pays lazy init
+        timer.time_call("warm_call", warmup)
+        self.startup = timer.info()
+
+    # Labels keep the URLs of the former per-function endpoints
+    @modal.web_endpoint(method="POST", label="plantroute-regret-protection-engine-predict")
+    def predict(self, body: dict) -> dict:
+        """POST with JSON body: { user_preferences, itinerary_item, context? }. Returns { prediction }."""
+        req = self._request_cls(**body)
+        pred = self._predict(
+            prefs=req.user_preferences,
+            item=req.itinerary_item,
+            ctx=req.context,
+            model=self.model,
+        )
+        return self._response_cls(prediction=pred).model_dump()
+
+    @modal.web_endpoint(method="POST", label="plantroute-regret-protection-engine-predict-itinerary")
+    def predict_itinerary(self, body: dict) -> dict:
+        """POST with JSON body: { user_preferences, days: [{ items }], context? }. Returns { days }."""
+        req = self._itinerary_request_cls(**body)
+        days = self._predict_itinerary(
+            prefs=req.user_preferences,
+            days=[day.items for day in req.days],
+            ctx=req.context,
+            model=self.model,
+        )
+        return self._itinerary_response_cls(days=days).model_dump()
+
+    @modal.web_endpoint(method="GET", label="plantroute-regret-protection-engine-health")
+    def health(self) -> dict:
+        return {"status": "ok", "engine": "regret_protection", "startup": self.startup}
@@ -4,7 +4,8 @@ import { RegretRequestSchema } from "@/lib/schemas";
 import { withRateLimit, RATE_LIMITS } from "@/lib/rate-limit";
 import { sanitizeForLog } from "@/lib/sanitize-log";
 
-type Engine = "preference" | "regret_protection";
+// "dual" scores both engines in one call (ml/dual_regret, served by the inference server under /dual_regret)
+type Engine = "preference" | "regret_protection" | "dual";
 
 export async function POST(req: NextRequest) {
   const rateLimitResponse = await withRateLimit(req, RATE_LIMITS.regret, null);
@@ -12,7 +13,7 @@ export async function POST(req: NextRequest) {
 
   const engineParam = req.nextUrl.searchParams.get("engine") as Engine | null;
   const engine: Engine =
-    engineParam === "regret_protection" ? "regret_protection" : "preference";
+    engineParam === "regret_protection" || engineParam === "dual" ? engineParam : "preference";
 
   let body: unknown;
   try {
@@ -27,13 +28,15 @@ export async function POST(req: NextRequest) {
   const modalToken = process.env.MODAL_TOKEN?.trim();
   const preferenceUrl = process.env.MODAL_PREFERENCE_URL?.trim();
   const regretUrl = process.env.MODAL_REGRET_URL?.trim();
+  const dualUrl = process.env.MODAL_DUAL_REGRET_URL?.trim();
 
   const url =
-    engine === "regret_protection" ? regretUrl : preferenceUrl;
+    engine === "regret_protection" ? regretUrl : engine === "dual" ? dualUrl : preferenceUrl;
   if (!modalToken || !url) {
     return NextResponse.json(
       {
-        error: "Regret inference requires Modal. Set MODAL_TOKEN and MODAL_PREFERENCE_URL (or MODAL_REGRET_URL).",
+        error:
+          "Regret inference requires Modal. Set MODAL_TOKEN and MODAL_PREFERENCE_URL (or MODAL_REGRET_URL, MODAL_DUAL_REGRET_URL).",
       },
       { status: 503 }
     );
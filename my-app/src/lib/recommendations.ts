@@ -34,6 +34,8 @@ export interface BatchScoreRequest {
   travel: TravelInput;
   interests: string[];
   activities: ActivityInput[];
+  /** Per-activity explanations (on by default; false skips them, which is 2-4x cheaper for bulk scoring). */
+  explain?: boolean;
 }
 
 export interface ScoreResponseItem {
@@ -96,6 +98,7 @@ export function buildBatchScoreRequest(
     travel,
     interests,
     activities: activities.map(activityToEngineInput),
+    explain: true,
   };
 }
 
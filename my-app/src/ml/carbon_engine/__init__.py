@@ -0,0 +1 @@
+# Carbon engine: deterministic CO2e for itineraries (Haversine distance + fixed emission factors)
@@ -0,0 +1,27 @@
+# FastAPI: /carbon_predictor, /optimize_alternatives, /health (no model artifact; pure functions)
+
+from fastapi import FastAPI
+
+from ..serving.metrics import instrument, timed
+from .model import carbon_predictor, optimize_alternatives
+from .schemas import CarbonRequest, CarbonResult, OptimizeRequest, OptimizeResult
+
+app = FastAPI(title="Carbon Engine", description="Deterministic CO2e for itineraries")
+instrument(app, "carbon_engine")
+
+
+@app.post("/carbon_predictor", response_model=CarbonResult)
+@timed
+def carbon_predictor_endpoint(body: CarbonRequest) -> CarbonResult:
+    return CarbonResult(**carbon_predictor(body.itinerary_json))
+
+
+@app.post("/optimize_alternatives", response_model=OptimizeResult)
+@timed
+def optimize_alternatives_endpoint(body: OptimizeRequest) -> OptimizeResult:
+    return OptimizeResult(**optimize_alternatives(body.itinerary_json, body.user_prefs))
+
+
+@app.get("/health")
+def health() -> dict:
+    return {"status": "ok", "engine": "carbon"}
@@ -0,0 +1,40 @@
+# Emission factors (kg CO2e). No LLMs or external API calls; same numbers as src/lib/carbon-local.ts.
+
+# Transport, per passenger-km
+FLIGHT_SHORT_KM = 1500
+FLIGHT_FACTOR_SHORT = 0.15  # under 1500 km
+FLIGHT_FACTOR_LONG = 0.11  # 1500 km and over
+RADIATIVE_FORCING = 1.9  # multiplier for all flights
+TRAIN_FACTOR = 0.04
+BUS_FACTOR = 0.08
+CAR_FACTOR = 0.20
+FERRY_FACTOR = 0.12
+
+TRANSPORT_FACTORS = {
+    "train": TRAIN_FACTOR,
+    "bus": BUS_FACTOR,
+    "car": CAR_FACTOR,
+    "ferry": FERRY_FACTOR,
+    "walk": 0.0,
+}
+
+# Per-activity fixed intensities (kg CO2e per visit)
+ACTIVITY_FACTORS = {
+    "museum": 2.5,
+    "restaurant": 4.0,
+    "outdoor": 0.5,
+    "ski": 18.0,
+    "beach": 0.8,
+    "nightlife": 3.0,
+    "wellness": 2.0,
+    "shopping": 5.0,
+}
+ACTIVITY_DEFAULT = 3.0
+
+# Hotel: kg CO2e per room-night
+HOTEL_KG_PER_NIGHT = 15.0
+
+# Threshold for "short" flight -> replace with train in optimize_alternatives (km)
+SHORT_FLIGHT_REPLACE_KM = 800
+
+EARTH_RADIUS_KM = 6371.0
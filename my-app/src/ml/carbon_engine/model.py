@@ -0,0 +1,154 @@
+# Deterministic CO2e calculation for itineraries and a lower-carbon alternative.
+
+import copy
+import math
+
+from .config.defaults import (
+    ACTIVITY_DEFAULT,
+    ACTIVITY_FACTORS,
+    CAR_FACTOR,
+    EARTH_RADIUS_KM,
+    FLIGHT_FACTOR_LONG,
+    FLIGHT_FACTOR_SHORT,
+    FLIGHT_SHORT_KM,
+    HOTEL_KG_PER_NIGHT,
+    RADIATIVE_FORCING,
+    SHORT_FLIGHT_REPLACE_KM,
+    TRANSPORT_FACTORS,
+)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in km. Inline implementation, no geo libraries."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lng2 - lng1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _get_point(obj: dict) -> tuple[float, float, str]:
+    """Get (lat, lng, name) from origin/destination dict. Handles latitude/longitude spellings."""
+    if not obj:
+        return (0.0, 0.0, "")
+    lat = obj.get("lat") or obj.get("latitude") or 0.0
+    lng = obj.get("lng") or obj.get("longitude") or 0.0
+    name = obj.get("name") or ""
+    return (float(lat), float(lng), str(name))
+
+
+def activity_emission_kg(category: str) -> float:
+    """Return kg CO2e for one activity visit by category."""
+    cat = (category or "default").lower().strip()
+    return ACTIVITY_FACTORS.get(cat, ACTIVITY_DEFAULT)
+
+
+def carbon_predictor(itinerary_json: dict) -> dict:
+    """
+    Calculate CO2e deterministically from itinerary using Haversine and fixed factors.
+    Returns { "items": [{ "id", "type", "description", "distance_km", "emission_kg" }], "total_kg" }.
+    """
+    items = []
+    days = itinerary_json.get("days") or []
+
+    for day in days:
+        # Transport segments
+        for seg in day.get("transport") or []:
+            seg_id = seg.get("id") or ""
+            mode = (seg.get("mode") or "car").lower()
+            lat1, lng1, name1 = _get_point(seg.get("origin") or {})
+            lat2, lng2, name2 = _get_point(seg.get("destination") or {})
+            dist_km = seg.get("distance_km")
+            if dist_km is None and (lat1 or lat2 or lng1 or lng2):
+                dist_km = haversine_km(lat1, lng1, lat2, lng2)
+            dist_km = round(float(dist_km or 0.0), 2)
+
+            if mode.startswith("flight"):
+                factor = FLIGHT_FACTOR_SHORT if dist_km < FLIGHT_SHORT_KM else FLIGHT_FACTOR_LONG
+                emission_kg = dist_km * factor * RADIATIVE_FORCING
+            else:
+                emission_kg = dist_km * TRANSPORT_FACTORS.get(mode, CAR_FACTOR)
+
+            items.append({
+                "id": seg_id,
+                "type": "transport",
+                "description": f"{mode} {name1} -> {name2}".strip(),
+                "distance_km": dist_km,
+                "emission_kg": round(emission_kg, 3),
+            })
+
+        # Activities
+        for act in day.get("activities") or []:
+            items.append({
+                "id": act.get("id") or "",
+                "type": "activity",
+                "description": act.get("name") or "Activity",
+                "distance_km": None,
+                "emission_kg": round(activity_emission_kg(act.get("category") or "default"), 3),
+            })
+
+        # Hotel (per night)
+        hotel = day.get("hotel")
+        if hotel:
+            items.append({
+                "id": hotel.get("id") or "",
+                "type": "hotel",
+                "description": hotel.get("name") or "Hotel",
+                "distance_km": None,
+                "emission_kg": round(HOTEL_KG_PER_NIGHT, 3),
+            })
+
+    total_kg = round(sum(i["emission_kg"] for i in items), 3)
+    return {"items": items, "total_kg": total_kg}
+
+
+def _segment_distance_km(seg: dict) -> float:
+    """Get distance for a transport segment (Haversine or stored)."""
+    dist_km = seg.get("distance_km")
+    if dist_km is not None:
+        return float(dist_km)
+    lat1, lng1, _ = _get_point(seg.get("origin") or {})
+    lat2, lng2, _ = _get_point(seg.get("destination") or {})
+    return haversine_km(lat1, lng1, lat2, lng2)
+
+
+def optimize_alternatives(itinerary_json: dict, user_prefs: dict) -> dict:
+    """
+    Return a lower-carbon version: replace flights under 800 km with train,
+    replace ski activities with outdoor. Compares both with carbon_predictor.
+    Returns {
+      "original_total_kg", "alternative_total_kg", "alternative_itinerary",
+      "savings_kg", "regret_score"
+    } with regret_score = (original - alternative) / original clamped 0–1.
+    """
+    original_total_kg = carbon_predictor(itinerary_json)["total_kg"]
+    alt = copy.deepcopy(itinerary_json)
+
+    for day in alt.get("days") or []:
+        for seg in day.get("transport") or []:
+            mode = (seg.get("mode") or "").lower()
+            if mode.startswith("flight") and _segment_distance_km(seg) < SHORT_FLIGHT_REPLACE_KM:
+                seg["mode"] = "train"
+        for act in day.get("activities") or []:
+            if (act.get("category") or "").lower() == "ski":
+                act["category"] = "outdoor"
+
+    alternative_total_kg = carbon_predictor(alt)["total_kg"]
+    savings_kg = round(original_total_kg - alternative_total_kg, 3)
+    if original_total_kg <= 0:
+        regret_score = 0.0
+    else:
+        regret_score = (original_total_kg - alternative_total_kg) / original_total_kg
+        regret_score = max(0.0, min(1.0, regret_score))
+
+    return {
+        "original_total_kg": original_total_kg,
+        "alternative_total_kg": alternative_total_kg,
+        "alternative_itinerary": alt,
+        "savings_kg": savings_kg,
+        "regret_score": round(regret_score, 4),
+    }
@@ -0,0 +1,35 @@
+# Request/response schemas for the carbon engine API (same bodies as the Modal functions).
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CarbonRequest(BaseModel):
+    itinerary_json: dict
+
+
+class OptimizeRequest(BaseModel):
+    itinerary_json: dict
+    user_prefs: dict = Field(default_factory=dict)
+
+
+class CarbonItem(BaseModel):
+    id: str
+    type: Literal["transport", "activity", "hotel"]
+    description: str
+    distance_km: Optional[float] = None
+    emission_kg: float
+
+
+class CarbonResult(BaseModel):
+    items: list[CarbonItem]
+    total_kg: float
+
+
+class OptimizeResult(BaseModel):
+    original_total_kg: float
+    alternative_total_kg: float
+    alternative_itinerary: dict
+    savings_kg: float
+    regret_score: float = Field(..., ge=0.0, le=1.0)
@@ -0,0 +1,24 @@
+# Tests for API contract.
+
+from fastapi.testclient import TestClient
+
+from ml.carbon_engine.api import app
+from ml.carbon_engine.model import carbon_predictor, optimize_alternatives
+
+from .test_model import ITINERARY
+
+
+def test_health() -> None:
+    r = TestClient(app).get("/health")
+    assert r.status_code == 200
+    assert r.json()["engine"] == "carbon"
+
+
+def test_endpoints_match_functions() -> None:
+    client = TestClient(app)
+    r = client.post("/carbon_predictor", json={"itinerary_json": ITINERARY})
+    assert r.status_code == 200
+    assert r.json() == carbon_predictor(ITINERARY)
+    r = client.post("/optimize_alternatives", json={"itinerary_json": ITINERARY, "user_prefs": {}})
+    assert r.status_code == 200
+    assert r.json() == optimize_alternatives(ITINERARY, {})
@@ -0,0 +1,59 @@
+# Tests for carbon calculation.
+
+import pytest
+
+from ml.carbon_engine.config.defaults import HOTEL_KG_PER_NIGHT, RADIATIVE_FORCING, TRAIN_FACTOR
+from ml.carbon_engine.model import carbon_predictor, haversine_km, optimize_alternatives
+
+PARIS = {"lat": 48.8566, "lng": 2.3522, "name": "Paris"}
+ROME = {"lat": 41.9028, "lng": 12.4964, "name": "Rome"}
+
+ITINERARY = {
+    "days": [
+        {
+            "transport": [
+                {"id": "seg-1", "mode": "flight_short", "origin": PARIS, "destination": ROME},
+                {"id": "seg-2", "mode": "flight_short", "distance_km": 500.0},
+            ],
+            "activities": [
+                {"id": "act-1", "name": "Vatican Museums", "category": "museum"},
+                {"id": "act-2", "name": "Slopes", "category": "Ski"},
+                {"id": "act-3", "name": "Mystery", "category": "unknown"},
+            ],
+            "hotel": {"id": "hotel-1", "name": "Hotel Test"},
+        }
+    ]
+}
+
+
+def test_haversine_paris_rome() -> None:
+    assert haversine_km(PARIS["lat"], PARIS["lng"], ROME["lat"], ROME["lng"]) == pytest.approx(1105.8, abs=1.0)
+    assert haversine_km(10.0, 20.0, 10.0, 20.0) == 0.0
+
+
+def test_carbon_predictor_items_and_total() -> None:
+    result = carbon_predictor(ITINERARY)
+    by_id = {i["id"]: i for i in result["items"]}
+    assert [i["type"] for i in result["items"]] == ["transport", "transport", "activity", "activity", "activity", "hotel"]
+    assert by_id["seg-1"]["description"] == "flight_short Paris -> Rome"
+    assert by_id["seg-1"]["emission_kg"] == round(by_id["seg-1"]["distance_km"] * 0.15 * RADIATIVE_FORCING, 3)
+    assert by_id["seg-2"]["emission_kg"] == round(500.0 * 0.15 * RADIATIVE_FORCING, 3)
+    assert [by_id[k]["emission_kg"] for k in ("act-1", "act-2", "act-3")] == [2.5, 18.0, 3.0]
+    assert by_id["hotel-1"]["emission_kg"] == HOTEL_KG_PER_NIGHT
+    assert result["total_kg"] == round(sum(i["emission_kg"] for i in result["items"]), 3)
+
+
+def test_optimize_alternatives_replaces_short_flights_and_ski() -> None:
+    out = optimize_alternatives(ITINERARY, {})
+    day = out["alternative_itinerary"]["days"][0]
+    assert [s["mode"] for s in day["transport"]] == ["flight_short", "train"]  # Paris-Rome is over 800 km
+    assert day["activities"][1]["category"] == "outdoor"
+    assert ITINERARY["days"][0]["activities"][1]["category"] == "Ski"  # input untouched
+    expected_savings = 500.0 * 0.15 * RADIATIVE_FORCING - 500.0 * TRAIN_FACTOR + (18.0 - 0.5)
+    assert out["savings_kg"] == pytest.approx(expected_savings, abs=1e-3)
+    assert 0.0 < out["regret_score"] <= 1.0
+
+
+def test_empty_itinerary() -> None:
+    assert carbon_predictor({}) == {"items": [], "total_kg": 0}
+    assert optimize_alternatives({}, {})["regret_score"] == 0.0
@@ -0,0 +1 @@
+# Dual regret: preference + regret_protection engines scored together from one feature computation
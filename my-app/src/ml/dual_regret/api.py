@@ -0,0 +1,87 @@
+# FastAPI app: both linear regret engines in one request.
+
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from ..preference_engine import model as preference_model
+from ..preference_engine.schemas import ItineraryItem, UserPreferences
+from ..regret_protection_engine import model as regret_model
+from ..serving.admin import admin_router
+from ..serving.admission import ADMISSION, INTERACTIVE
+from ..serving.metrics import instrument, observe_model_versions, timed
+from ..serving.registry import shared_registry
+from .model import DualModel, predict_dual
+from .schemas import DualPredictRequest, DualPredictResponse
+
+# The engines' own registries (shared when they are mounted in the same server), so each artifact is loaded and
+# hot-reloaded once and an engine's /admin/reload reaches this app too; the stacked model is rebuilt after a swap
+_registries = {
+    engine: shared_registry(
+        name,
+        module.load_model,
+        module._resolve_model_path(),
+        warmup=lambda model, module=module: module.predict(UserPreferences(), ItineraryItem(), model=model),
+    )
+    for engine, name, module in (
+        ("preference", "preference_engine", preference_model),
+        ("regret_protection", "regret_protection_engine", regret_model),
+    )
+}
+_stacked: tuple = (None, None, None)  # (preference version, regret_protection version, DualModel)
+_stacked_lock = threading.Lock()
+
+
+def get_model() -> DualModel:
+    global _stacked
+    preference = _registries["preference"].current()
+    regret_protection = _registries["regret_protection"].current()
+    cached_preference, cached_regret, model = _stacked
+    if cached_preference is not preference or cached_regret is not regret_protection:
+        with _stacked_lock:
+            cached_preference, cached_regret, model = _stacked
+            if cached_preference is not preference or cached_regret is not regret_protection:
+                model = DualModel(preference.model, regret_protection.model)
+                _stacked = (preference, regret_protection, model)
+    return model
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        get_model()
+        for registry in _registries.values():
+            registry.start_watching()
+        yield
+    finally:
+        for registry in _registries.values():
+            registry.stop_watching()
+
+
+app = FastAPI(title="Dual Regret", description="Preference + regret protection in one request", lifespan=lifespan)
+for _engine, _registry in _registries.items():
+    # POST /preference/admin/reload, POST /regret_protection/admin/reload
+    app.include_router(admin_router(_registry), prefix=f"/{_engine}")
+    observe_model_versions(_registry.name, _registry)
+instrument(app, "dual_regret")
+
+
+@app.post("/predict", response_model=DualPredictResponse)
+@timed
+async def predict_endpoint(body: DualPredictRequest) -> DualPredictResponse:
+    return await ADMISSION.run(INTERACTIVE, _predict, body)
+
+
+def _predict(body: DualPredictRequest) -> DualPredictResponse:
+    pred = predict_dual(prefs=body.user_preferences, item=body.itinerary_item, ctx=body.context, model=get_model())
+    return DualPredictResponse(prediction=pred)
+
+
+@app.get("/health")
+def health() -> dict:
+    return {
+        "status": "ok",
+        "engine": "dual_regret",
+        "models": {engine: registry.info() for engine, registry in _registries.items()},
+    }
@@ -0,0 +1,139 @@
+# Score both linear engines from one feature computation and one stacked matrix multiply.
+
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from ..preference_engine import features as preference_features
+from ..preference_engine import model as preference_model
+from ..preference_engine.config.defaults import FEATURE_COLUMNS
+from ..preference_engine.schemas import Context, ItineraryItem, UserPreferences
+from ..regret_protection_engine import features as regret_features
+from ..regret_protection_engine import model as regret_model
+from ..serving.metrics import stage
+from .schemas import DualPrediction
+
+# The only feature whose config differs between the engines (WALK_COMFORT_KM_MAX 12 vs 10 km)
+WALK_COLUMN = FEATURE_COLUMNS.index("walk_over_tolerance_km")
+N_FEATURES = len(FEATURE_COLUMNS)
+
+
+def build_dual_feature_matrix(
+    prefs: UserPreferences | Sequence[UserPreferences],
+    items: Sequence[ItineraryItem],
+    ctxs: Optional[Sequence[Optional[Context]]] = None,
+) -> np.ndarray:
+    """N x 17 float64: the preference engine's 16 features, then the regret engine's walk_over_tolerance_km.
+
+    Every other column is the same in both engines, so it is computed once.
+    """
+    users = prefs if isinstance(prefs, (list, tuple)) else [prefs]
+    if len(items) == 1:
+        return _dual_feature_row(users[0], items[0], ctxs[0] if ctxs is not None else None)
+    user_arrays = preference_features.preference_arrays(users)
+    item_arrays = preference_features.item_arrays(items, ctxs)
+    X = np.empty((len(items), N_FEATURES + 1), dtype=np.float64)
+    X[:, :N_FEATURES] = preference_features.feature_matrix_from_arrays(user_arrays, **item_arrays)
+    X[:, N_FEATURES] = regret_features.walk_over_tolerance_km(item_arrays["walk_km"], user_arrays["walking_effort"])
+    return X
+
+
+def _dual_feature_row(prefs: UserPreferences, item: ItineraryItem, ctx: Optional[Context]) -> np.ndarray:
+    """One row (the /predict case) from the scalar build_features: same values, less fixed cost than the kernel."""
+    feats = preference_features.build_features(prefs, item, ctx)
+    walk_km = item.walking_km if item.walking_km_cumulative_day is None else item.walking_km_cumulative_day
+    regret_walk = regret_features.walk_over_tolerance_km(np.array([walk_km]), np.array([prefs.walking_effort]))
+    return np.array([[feats[c] for c in FEATURE_COLUMNS] + [regret_walk[0]]], dtype=np.float64)
+
+
+def engine_features(X: np.ndarray, engine: str) -> np.ndarray:
+    """One engine's N x 16 feature matrix out of a build_dual_feature_matrix matrix."""
+    if engine == "preference":
+        return X[:, :N_FEATURES]
+    out = X[:, :N_FEATURES].copy()
+    out[:, WALK_COLUMN] = X[:, N_FEATURES]
+    return out
+
+
+class DualModel:
+    """Both engines' logistic members stacked into one 17 x M weight matrix (M = 2 for uncalibrated models).
+
+    The preference rows read the walk feature from its usual column and the regret_protection rows from column 16,
+    so each engine sees its own walk threshold. One X @ W + b gives every member's margin; each engine's
+    calibration and member averaging then run on its own columns of the result.
+    """
+
+    def __init__(self, preference: Any, regret_protection: Any):
+        self.models = {"preference": preference, "regret_protection": regret_protection}
+        blocks = []
+        self.members: dict[str, slice] = {}
+        start = 0
+        for engine, model in self.models.items():
+            if not hasattr(model, "probability_from_margin"):
+                raise TypeError(
+                    f"{engine}: dual scoring needs the NumPy array export (data/model.npz), got "
+                    f"{type(model).__name__}. Run: python -m ml.{engine}_engine.linear"
+                )
+            w = np.zeros((len(model.intercept), N_FEATURES + 1))
+            w[:, :N_FEATURES] = model.coef
+            if engine == "regret_protection":
+                w[:, [WALK_COLUMN, N_FEATURES]] = w[:, [N_FEATURES, WALK_COLUMN]]
+            blocks.append(w)
+            self.members[engine] = slice(start, start + len(w))
+            start += len(w)
+        self.weights = np.ascontiguousarray(np.vstack(blocks).T)
+        self.bias = np.concatenate([m.intercept for m in self.models.values()])
+
+    def predict_positive(self, X: np.ndarray) -> dict[str, np.ndarray]:
+        """Positive-class probability per engine for a build_dual_feature_matrix matrix."""
+        margin = X @ self.weights + self.bias
+        return {
+            engine: model.probability_from_margin(margin[:, self.members[engine]])
+            for engine, model in self.models.items()
+        }
+
+
+def load_dual(
+    preference_path: Optional[Path | str] = None,
+    regret_protection_path: Optional[Path | str] = None,
+) -> DualModel:
+    """Both engines' default artifacts (or the given paths) as one DualModel."""
+    return DualModel(
+        preference_model.load_model(preference_path),
+        regret_model.load_model(regret_protection_path),
+    )
+
+
+def predict_dual_batch(
+    prefs: UserPreferences,
+    rows: list[tuple[ItineraryItem, Optional[Context]]],
+    model: Optional[DualModel] = None,
+) -> list[DualPrediction]:
+    """Both engines' predictions for many (item, context) pairs of one user: one feature matrix, one matmul."""
+    if model is None:
+        model = load_dual()
+    if not rows:
+        return []
+    with stage("features"):
+        X = build_dual_feature_matrix(prefs, [item for item, _ in rows], [ctx for _, ctx in rows])
+    with stage("inference"):
+        probas = model.predict_positive(X)
+    preference = preference_model.predictions_from_probabilities(
+        model.models["preference"], engine_features(X, "preference"), probas["preference"]
+    )
+    regret_protection = regret_model.predictions_from_probabilities(
+        model.models["regret_protection"], engine_features(X, "regret_protection"), probas["regret_protection"]
+    )
+    return [
+        DualPrediction(preference=p, regret_protection=r) for p, r in zip(preference, regret_protection)
+    ]
+
+
+def predict_dual(
+    prefs: UserPreferences,
+    item: ItineraryItem,
+    ctx: Optional[Context] = None,
+    model: Optional[DualModel] = None,
+) -> DualPrediction:
+    return predict_dual_batch(prefs, [(item, ctx)], model=model)[0]
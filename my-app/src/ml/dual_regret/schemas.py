@@ -0,0 +1,19 @@
+# Request/response schemas for dual scoring. Input is the linear engines' /predict body (identical in both);
+# each prediction keeps its own engine's type.
+
+from pydantic import BaseModel
+
+from ..preference_engine.schemas import PredictRequest
+from ..preference_engine.schemas import RegretPrediction as PreferencePrediction
+from ..regret_protection_engine.schemas import RegretPrediction as RegretProtectionPrediction
+
+DualPredictRequest = PredictRequest
+
+
+class DualPrediction(BaseModel):
+    preference: PreferencePrediction
+    regret_protection: RegretProtectionPrediction
+
+
+class DualPredictResponse(BaseModel):
+    prediction: DualPrediction
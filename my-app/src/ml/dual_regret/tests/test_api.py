@@ -0,0 +1,70 @@
+# Tests for API contract.
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ML_DIR = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def client():
+    for engine in ("preference_engine", "regret_protection_engine"):
+        if not (ML_DIR / engine / "data" / "model.npz").exists():
+            pytest.skip(f"No array export. Run: python -m ml.{engine}.linear")
+    from ml.dual_regret.api import app
+    return TestClient(app)
+
+
+def test_health(client: TestClient) -> None:
+    with client:
+        data = client.get("/health").json()
+    assert data["status"] == "ok"
+    assert data["models"]["preference"]["loaded"] is True
+    assert data["models"]["regret_protection"]["loaded"] is True
+
+
+def test_predict_returns_both_engines(client: TestClient) -> None:
+    body = {
+        "user_preferences": {"pace": 0.3, "walking_effort": 0.8},
+        "itinerary_item": {"start_hour": 7.0, "walking_km": 11.0, "activity_count_today": 6},
+    }
+    r = client.post("/predict", json=body)
+    assert r.status_code == 200
+    prediction = r.json()["prediction"]
+    from ml.preference_engine.api import app as preference_app
+    from ml.regret_protection_engine.api import app as regret_app
+
+    for engine, engine_app in (("preference", preference_app), ("regret_protection", regret_app)):
+        single = TestClient(engine_app).post("/predict", json=body).json()["prediction"]
+        assert prediction[engine] == single
+
+
+def test_reload_per_engine(client: TestClient) -> None:
+    from ml.serving.config.defaults import ADMIN_TOKEN
+
+    headers = {"X-Admin-Token": ADMIN_TOKEN} if ADMIN_TOKEN else {}
+    r = client.post("/regret_protection/admin/reload", params={"force": True}, headers=headers)
+    if ADMIN_TOKEN is None:
+        # Admin routes are off unless ML_ADMIN_TOKEN is set
+        assert r.status_code == 403
+        return
+    assert r.status_code == 200
+    assert r.json()["model"]["reloads"] >= 1
+
+
+def test_shares_the_engine_registries(client: TestClient) -> None:
+    from ml.dual_regret import api as dual_api
+    from ml.preference_engine import api as preference_api
+    from ml.regret_protection_engine import api as regret_api
+    from ml.serving.registry import REGISTRIES
+
+    assert dual_api._registries["preference"] is preference_api._registry is REGISTRIES["preference_engine"]
+    assert dual_api._registries["regret_protection"] is regret_api._registry
+    # A swap in the engine's registry (e.g. its /admin/reload) is what the dual view serves next
+    before = dual_api.get_model()
+    preference_api._registry.reload(force=True)
+    after = dual_api.get_model()
+    assert after is not before
+    assert after.models["preference"] is preference_api.get_model()
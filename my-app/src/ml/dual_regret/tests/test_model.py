@@ -0,0 +1,79 @@
+# Tests for dual scoring: same results as calling each engine on its own.
+
+import numpy as np
+import pytest
+
+from ml.dual_regret.model import DualModel, build_dual_feature_matrix, engine_features, load_dual, predict_dual_batch
+from ml.preference_engine import model as preference_model
+from ml.preference_engine.config import defaults as preference_config
+from ml.preference_engine.features import build_feature_matrix
+from ml.preference_engine.schemas import Context, ItineraryItem, UserPreferences
+from ml.regret_protection_engine import model as regret_model
+from ml.regret_protection_engine.config import defaults as regret_config
+from ml.regret_protection_engine.features import build_feature_matrix as regret_feature_matrix
+
+
+@pytest.fixture(scope="module")
+def model() -> DualModel:
+    try:
+        return load_dual()
+    except (FileNotFoundError, TypeError) as e:
+        pytest.skip(f"Both engines need data/model.npz: {e}")
+
+
+def _rows() -> list[tuple[ItineraryItem, Context | None]]:
+    # Walks between the two engines' comfort limits, where only the regret engine penalizes
+    return [
+        (ItineraryItem(walking_km=km, start_hour=h, crowd_level=0.8, activity_count_today=n), ctx)
+        for km, h, n, ctx in (
+            (2.0, 10.0, 2, None),
+            (9.0, 7.0, 5, Context(previous_day_end_hour=23.0)),
+            (11.5, 12.0, 8, None),
+            (16.0, 6.0, 10, Context()),
+        )
+    ]
+
+
+def test_engines_share_every_setting_but_the_walk_threshold() -> None:
+    assert preference_config.FEATURE_COLUMNS == regret_config.FEATURE_COLUMNS
+    for name in ("WALK_COMFORT_KM_MIN", "EARLY_START_HOUR", "LATE_NIGHT_HOUR"):
+        assert getattr(preference_config, name) == getattr(regret_config, name)
+    assert preference_config.WALK_COMFORT_KM_MAX != regret_config.WALK_COMFORT_KM_MAX
+
+
+def test_dual_features_equal_each_engines_own() -> None:
+    prefs = UserPreferences(walking_effort=0.8)
+    items = [item for item, _ in _rows()]
+    ctxs = [ctx for _, ctx in _rows()]
+    X = build_dual_feature_matrix(prefs, items, ctxs)
+    preference_X = engine_features(X, "preference")
+    regret_X = engine_features(X, "regret_protection")
+    np.testing.assert_array_equal(preference_X, build_feature_matrix(prefs, items, ctxs))
+    np.testing.assert_array_equal(regret_X, regret_feature_matrix(prefs, items, ctxs))
+    assert (preference_X[:, 1] != regret_X[:, 1]).any()
+    for i, (item, ctx) in enumerate(zip(items, ctxs)):
+        # A single row takes the scalar path
+        np.testing.assert_array_equal(build_dual_feature_matrix(prefs, [item], [ctx]), X[i : i + 1])
+
+
+def test_stacked_probabilities_match_each_model(model: DualModel) -> None:
+    X = build_dual_feature_matrix(UserPreferences(), [ItineraryItem(walking_km=k) for k in np.linspace(0, 20, 50)])
+    probas = model.predict_positive(X)
+    for engine in ("preference", "regret_protection"):
+        expected = model.models[engine].predict_proba(engine_features(X, engine))[:, 1]
+        np.testing.assert_allclose(probas[engine], expected, rtol=0, atol=1e-12)
+
+
+def test_predictions_match_single_engine_predict(model: DualModel) -> None:
+    prefs = UserPreferences(pace=0.3, walking_effort=0.8, crowd_comfort=0.2)
+    result = predict_dual_batch(prefs, _rows(), model=model)
+    for dual, (item, ctx) in zip(result, _rows()):
+        assert dual.preference == preference_model.predict(prefs, item, ctx, model=model.models["preference"])
+        assert dual.regret_protection == regret_model.predict(
+            prefs, item, ctx, model=model.models["regret_protection"]
+        )
+
+
+def test_dual_model_needs_array_export(model: DualModel) -> None:
+    with pytest.raises(TypeError, match="model.npz"):
+        DualModel(object(), model.models["regret_protection"])
@@ -0,0 +1,88 @@
+# Latency benchmark: pickled sklearn model + DataFrame vs the NumPy array export (linear.py).
+# Usage: from src/ run: python -m ml.preference_engine.bench
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+if __name__ == "__main__":
+    src = Path(__file__).resolve().parents[2]
+    if str(src) not in sys.path:
+        sys.path.insert(0, str(src))
+
+from ml.preference_engine.config.defaults import ARRAY_MODEL_PATH
+from ml.preference_engine.model import PACKAGE_DIR, PICKLE_MODEL_PATH, load_model, predict
+from ml.preference_engine.schemas import ItineraryItem, UserPreferences
+
+REPEATS = 2000
+LOAD_RUNS = 5
+ARTIFACTS = {"pickle": PICKLE_MODEL_PATH, "numpy": PACKAGE_DIR / ARRAY_MODEL_PATH}
+
+# Fresh interpreter per measurement so imports are not shared between artifacts
+_LOAD_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+from ml.preference_engine.model import load_model
+model = load_model(sys.argv[1])
+print(json.dumps({
+    "load_ms": (time.perf_counter() - t0) * 1000.0,
+    "pandas_imported": "pandas" in sys.modules,
+    "sklearn_imported": "sklearn" in sys.modules,
+}))
+"""
+
+
+def _median_ms(fn, repeats: int) -> float:
+    fn()  # warm-up
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000.0
+
+
+def bench_predict(repeats: int = REPEATS) -> dict[str, float]:
+    """Median predict() latency (ms, features + inference + reasons) per artifact."""
+    prefs = UserPreferences(pace=0.3, walking_effort=0.3)
+    item = ItineraryItem(start_hour=7.0, walking_km=6.0, walking_km_cumulative_day=14.0, activity_count_today=6)
+    results = {}
+    for name, path in ARTIFACTS.items():
+        model = load_model(path)
+        results[name] = _median_ms(lambda: predict(prefs, item, model=model), repeats)
+    return results
+
+
+def bench_load(path: Path, runs: int = LOAD_RUNS) -> dict:
+    """Median import + load time of a fresh process, and whether pandas / sklearn got imported."""
+    src = Path(__file__).resolve().parents[2]
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _LOAD_SCRIPT, str(path)], cwd=src, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "load_ms": statistics.median(s["load_ms"] for s in samples),
+        "pandas_imported": samples[0]["pandas_imported"],
+        "sklearn_imported": samples[0]["sklearn_imported"],
+    }
+
+
+def main() -> None:
+    results = bench_predict()
+    print(f"predict() median latency, {REPEATS} calls (ms)")
+    for name, ms in results.items():
+        print(f"{name:>8}{ms:>10.3f}")
+    print(f"\nimport + load, median of {LOAD_RUNS} fresh processes")
+    print(f"{'artifact':>8}{'ms':>10}{'pandas':>10}{'sklearn':>10}")
+    for name, path in ARTIFACTS.items():
+        r = bench_load(path)
+        print(f"{name:>8}{r['load_ms']:>10.1f}{str(r['pandas_imported']):>10}{str(r['sklearn_imported']):>10}")
+
+
+if __name__ == "__main__":
+    main()
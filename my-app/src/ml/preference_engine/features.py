@@ -1,9 +1,12 @@
 # Feature extraction and mismatch logic.
 
-from typing import Optional
+from typing import Optional, Sequence
+
+import numpy as np
 
 from .config.defaults import (
     EARLY_START_HOUR,
+    FEATURE_COLUMNS,
     LATE_NIGHT_HOUR,
     WALK_COMFORT_KM_MAX,
     WALK_COMFORT_KM_MIN,
@@ -65,3 +68,211 @@ def build_features(
     out["_morning_tolerance"] = prefs.morning_tolerance
     out["_budget_comfort"] = prefs.budget_comfort
     return out
+
+
+# Columns of feature_matrix_from_arrays in the order it computes them; build_features rounds the first group
+# (walk_over_tolerance_km too, computed by walk_over_tolerance_km())
+_ROUNDED_INDEX = [
+    FEATURE_COLUMNS.index(name)
+    for name in (
+        "pace_overage",
+        "early_start_violation",
+        "crowd_mismatch",
+        "budget_overrun",
+        "outdoor_bad_weather",
+        "late_night_after_early",
+        "noise_mismatch",
+        "spontaneity_mismatch",
+    )
+]
+_WALK_INDEX = FEATURE_COLUMNS.index("walk_over_tolerance_km")
+_RAW_INDEX = [
+    FEATURE_COLUMNS.index(name)
+    for name in (
+        "_start_hour_norm",
+        "_walk_km_norm",
+        "_activities_norm",
+        "_pace",
+        "_crowd_comfort",
+        "_morning_tolerance",
+        "_budget_comfort",
+    )
+]
+
+
+def _round6(values: np.ndarray) -> np.ndarray:
+    """Vectorized round(x, 6) that agrees with Python's round() (ties at exact halves included)."""
+    scaled = values * 1e6
+    out = np.rint(scaled) / 1e6
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        out[near_half] = [round(float(v), 6) for v in values[near_half]]
+    return out
+
+
+def preference_arrays(prefs: Sequence[UserPreferences]) -> dict:
+    """The preference fields build_features reads, one array entry per user."""
+    return {
+        "pace": np.array([p.pace for p in prefs], dtype=np.float64),
+        "crowd_comfort": np.array([p.crowd_comfort for p in prefs], dtype=np.float64),
+        "morning_tolerance": np.array([p.morning_tolerance for p in prefs], dtype=np.float64),
+        "walking_effort": np.array([p.walking_effort for p in prefs], dtype=np.float64),
+        "budget_comfort": np.array([p.budget_comfort for p in prefs], dtype=np.float64),
+        "planning_vs_spontaneity": np.array([p.planning_vs_spontaneity for p in prefs], dtype=np.float64),
+        "noise_sensitivity": np.array([p.noise_sensitivity for p in prefs], dtype=np.float64),
+        "dislikes_weather": np.array([p.dislike_heat or p.dislike_cold or p.dislike_rain for p in prefs]),
+    }
+
+
+def item_arrays(items: Sequence[ItineraryItem], ctxs: Optional[Sequence[Optional[Context]]] = None) -> dict:
+    """Item (and context) fields as columns: walk_km already resolved, unknown previous_day_end_hour as NaN."""
+    nan = float("nan")
+    ctxs = ctxs if ctxs is not None else [None] * len(items)
+    return {
+        "start_hour": np.array([i.start_hour for i in items], dtype=np.float64),
+        "walk_km": np.array(
+            [i.walking_km if i.walking_km_cumulative_day is None else i.walking_km_cumulative_day for i in items],
+            dtype=np.float64,
+        ),
+        "crowd_level": np.array([i.crowd_level for i in items], dtype=np.float64),
+        "outdoor_fraction": np.array([i.outdoor_fraction for i in items], dtype=np.float64),
+        "activity_count_today": np.array([i.activity_count_today for i in items], dtype=np.float64),
+        "cost_level": np.array([i.cost_level for i in items], dtype=np.float64),
+        "is_late_night": np.array([i.is_late_night for i in items], dtype=bool),
+        "bad_weather_today": np.array([i.bad_weather_today is True for i in items], dtype=bool),
+        "previous_day_end_hour": np.array(
+            [nan if c is None or c.previous_day_end_hour is None else c.previous_day_end_hour for c in ctxs],
+            dtype=np.float64,
+        ),
+    }
+
+
+def walk_over_tolerance_km(walk_km: np.ndarray, walking_effort: np.ndarray) -> np.ndarray:
+    """The walk_over_tolerance_km column (rounded); its comfort range is engine-specific config."""
+    comfort_km = WALK_COMFORT_KM_MIN + walking_effort * (WALK_COMFORT_KM_MAX - WALK_COMFORT_KM_MIN)
+    walk_over = np.maximum(0.0, walk_km - comfort_km)
+    return _round6(np.minimum(1.0, walk_over / 10.0))
+
+
+def feature_matrix_from_arrays(
+    prefs: dict,
+    start_hour: np.ndarray,
+    walk_km: np.ndarray,
+    crowd_level: np.ndarray,
+    outdoor_fraction: np.ndarray,
+    activity_count_today: np.ndarray,
+    cost_level: np.ndarray,
+    is_late_night: np.ndarray,
+    bad_weather_today: np.ndarray,
+    previous_day_end_hour: np.ndarray,
+) -> np.ndarray:
+    """N x len(FEATURE_COLUMNS) float64 matrix; row i equals build_features(...) for item i, bit for bit.
+
+    prefs is preference_arrays() of one user (broadcast over every item) or of one user per item. Every
+    expression keeps the operation order of build_features so the floating-point results are identical.
+    """
+    pace = prefs["pace"]
+    activities_norm = np.minimum(1.0, activity_count_today / 10.0)
+    early_penalty = (1.0 - prefs["morning_tolerance"]) * np.maximum(0.0, EARLY_START_HOUR - start_hour) / 4.0
+    bad_weather = prefs["dislikes_weather"] & bad_weather_today
+    prev_early = previous_day_end_hour >= LATE_NIGHT_HOUR  # NaN (unknown) compares False
+    early_today = start_hour < EARLY_START_HOUR + 1.0
+    spontaneity_mismatch = np.maximum(0.0, activities_norm - (1.0 - prefs["planning_vs_spontaneity"]))
+
+    rounded = np.broadcast_arrays(
+        np.maximum(0.0, activities_norm - pace),
+        np.minimum(1.0, early_penalty),
+        crowd_level * (1.0 - prefs["crowd_comfort"]),
+        np.maximum(0.0, cost_level - prefs["budget_comfort"]),
+        np.where(bad_weather, 1.0, 0.0) * outdoor_fraction,
+        np.where(is_late_night & (early_today | prev_early), 1.0, 0.0),
+        crowd_level * (1.0 - prefs["noise_sensitivity"]),
+        np.minimum(1.0, spontaneity_mismatch),
+    )
+    raw = np.broadcast_arrays(
+        start_hour / 24.0,
+        np.minimum(1.0, walk_km / 15.0),
+        activities_norm,
+        pace,
+        prefs["crowd_comfort"],
+        prefs["morning_tolerance"],
+        prefs["budget_comfort"],
+    )
+    X = np.empty((len(start_hour), len(FEATURE_COLUMNS)), dtype=np.float64)
+    X[:, _ROUNDED_INDEX] = _round6(np.array(rounded, dtype=np.float64)).T
+    X[:, _RAW_INDEX] = np.array(raw, dtype=np.float64).T
+    X[:, _WALK_INDEX] = walk_over_tolerance_km(walk_km, prefs["walking_effort"])
+    return X
+
+
+def build_feature_matrix(
+    prefs: UserPreferences | Sequence[UserPreferences],
+    items: Sequence[ItineraryItem],
+    ctxs: Optional[Sequence[Optional[Context]]] = None,
+) -> np.ndarray:
+    """Columnar build_features for a whole batch: one N x 16 float64 matrix in FEATURE_COLUMNS order.
+
+    prefs is one user for every item, or one per item; ctxs (optional) is one context per item.
+    """
+    users = prefs if isinstance(prefs, (list, tuple)) else [prefs]
+    return feature_matrix_from_arrays(preference_arrays(users), **item_arrays(items, ctxs))
+
+
+def _item_end_hour(item: ItineraryItem) -> float:
+    if item.end_hour is not None:
+        return item.end_hour
+    if item.duration_hours is not None:
+        return min(24.0, item.start_hour + item.duration_hours)
+    return item.start_hour
+
+
+def chain_day(
+    items: Sequence[ItineraryItem],
+    day_number: int,
+    ctx: Context,
+) -> list[tuple[ItineraryItem, Context]]:
+    """One day of chain_itinerary: each item with the day's running quantities filled in, paired with ctx."""
+    walked = np.cumsum([item.walking_km for item in items], dtype=np.float64)
+    return [
+        (
+            item.model_copy(
+                update={
+                    "walking_km_cumulative_day": float(walked[i]),
+                    "activity_count_today": i + 1,
+                    "day_number": day_number,
+                }
+            ),
+            ctx,
+        )
+        for i, item in enumerate(items)
+    ]
+
+
+def next_day_context(ctx: Context, items: Sequence[ItineraryItem]) -> Context:
+    """ctx for the day after the one with these items: its latest end and total walk, other fields carried over."""
+    walked = np.cumsum([item.walking_km for item in items], dtype=np.float64)
+    return ctx.model_copy(
+        update={
+            "previous_day_end_hour": max((_item_end_hour(item) for item in items), default=None),
+            "previous_day_walking_km": float(walked[-1]) if len(items) else 0.0,
+        }
+    )
+
+
+def chain_itinerary(
+    days: list[list[ItineraryItem]],
+    ctx: Optional[Context] = None,
+) -> list[list[tuple[ItineraryItem, Context]]]:
+    """Each item with its day's running quantities filled in, paired with the context chained from the day before.
+
+    Items are in visiting order. Within a day, walking_km_cumulative_day is the cumulative sum of walking_km,
+    activity_count_today is the item's 1-based position and day_number is the day's position. Day 1 uses ctx as
+    given; each later day gets previous_day_end_hour (latest end of the day before) and previous_day_walking_km
+    (its total walk), other ctx fields carried over. Values sent for these fields are overwritten.
+    """
+    ctx = ctx or Context()
+    out = []
+    for day_number, items in enumerate(days, start=1):
+        out.append(chain_day(items, day_number, ctx))
+        ctx = next_day_context(ctx, items)
+    return out
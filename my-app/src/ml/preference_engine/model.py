@@ -4,33 +4,53 @@ import pickle
 from pathlib import Path
 from typing import Any, Optional
 
-import pandas as pd
+import numpy as np
 
+from ..serving.metrics import stage
 from .config.defaults import (
+    ARRAY_MODEL_PATH,
     DEFAULT_MODEL_PATH,
     FEATURE_COLUMNS,
     RISK_LOW_MAX,
     RISK_MEDIUM_MAX,
 )
-from .explanations import get_reasons
-from .features import build_features
-from .schemas import Context, ItineraryItem, RegretPrediction, UserPreferences
+from .explanations import ReasonWeights, get_reasons_batch
+from .features import build_feature_matrix, build_features, chain_itinerary
+from .linear import LinearModel, load_linear
+from .schemas import Context, DayPrediction, ItineraryItem, RegretPrediction, UserPreferences
 
 PACKAGE_DIR = Path(__file__).resolve().parent
+PICKLE_MODEL_PATH = PACKAGE_DIR / DEFAULT_MODEL_PATH
 
 
 def _resolve_model_path(path: Optional[Path | str] = None) -> Path:
     if path is None:
-        path = PACKAGE_DIR / DEFAULT_MODEL_PATH
+        array_path = PACKAGE_DIR / ARRAY_MODEL_PATH
+        path = array_path if array_path.exists() else PICKLE_MODEL_PATH
     return Path(path).resolve()
 
 
 def load_model(path: Optional[Path | str] = None) -> Any:
+    """LinearModel from the .npz export (NumPy only) or, for a .pkl path, the pickled sklearn model."""
     p = _resolve_model_path(path)
     if not p.exists():
         raise FileNotFoundError(f"Model not found: {p}. Run: python -m ml.preference_engine.train")
-    with open(p, "rb") as f:
-        return pickle.load(f)
+    if p.suffix == ".npz":
+        model = load_linear(p)
+    else:
+        with open(p, "rb") as f:
+            model = pickle.load(f)
+    model.reason_weights = ReasonWeights(model, FEATURE_COLUMNS)
+    return model
+
+
+def _design_matrix(model: Any, X: np.ndarray) -> Any:
+    """X as is for LinearModel; a DataFrame with the training column names for a sklearn model."""
+    if isinstance(model, LinearModel):
+        return X
+    import pandas as pd
+
+    return pd.DataFrame(X, columns=FEATURE_COLUMNS)
 
 
 def _probability_to_bucket(prob: float) -> str:
@@ -50,14 +70,78 @@ def predict(
 ) -> RegretPrediction:
     if model is None:
         model = load_model(model_path)
-    feats = build_features(prefs, item, ctx)
-    X = pd.DataFrame([[feats.get(c, 0.0) for c in FEATURE_COLUMNS]], columns=FEATURE_COLUMNS)
-    proba = model.predict_proba(X)[0, 1]
-    proba = float(max(0.0, min(1.0, proba)))
-    risk_bucket = _probability_to_bucket(proba)
-    reasons = get_reasons(model, feats, FEATURE_COLUMNS)
-    return RegretPrediction(
-        regret_probability=round(proba, 4),
-        risk_bucket=risk_bucket,
-        reasons=reasons,
-    )
+    with stage("features"):
+        # One row: the scalar build_features has less fixed cost than the batch kernel (same values)
+        feats = build_features(prefs, item, ctx)
+        X = np.array([[feats[c] for c in FEATURE_COLUMNS]], dtype=np.float64)
+    return _predictions(model, X)[0]
+
+
+def predict_batch(
+    prefs: UserPreferences,
+    rows: list[tuple[ItineraryItem, Optional[Context]]],
+    model: Optional[Any] = None,
+    model_path: Optional[Path | str] = None,
+) -> list[RegretPrediction]:
+    """predict() for many (item, context) pairs of one user: one feature matrix, one predict_proba call."""
+    if model is None:
+        model = load_model(model_path)
+    if not rows:
+        return []
+    with stage("features"):
+        X = build_feature_matrix(prefs, [item for item, _ in rows], [ctx for _, ctx in rows])
+    return _predictions(model, X)
+
+
+def _predictions(model: Any, X: np.ndarray) -> list[RegretPrediction]:
+    with stage("inference"):
+        probas = model.predict_proba(_design_matrix(model, X))[:, 1]
+    return predictions_from_probabilities(model, X, probas)
+
+
+def predictions_from_probabilities(model: Any, X: np.ndarray, probas: np.ndarray) -> list[RegretPrediction]:
+    """One RegretPrediction per row of X (this engine's rounding, risk buckets and reasons)."""
+    with stage("explain"):
+        reasons = get_reasons_batch(model, X, FEATURE_COLUMNS)
+    predictions = []
+    for proba, row_reasons in zip(probas.tolist(), reasons):
+        proba = max(0.0, min(1.0, proba))
+        predictions.append(
+            RegretPrediction(
+                regret_probability=round(proba, 4),
+                risk_bucket=_probability_to_bucket(proba),
+                reasons=row_reasons,
+            )
+        )
+    return predictions
+
+
+def predict_itinerary(
+    prefs: UserPreferences,
+    days: list[list[ItineraryItem]],
+    ctx: Optional[Context] = None,
+    model: Optional[Any] = None,
+    model_path: Optional[Path | str] = None,
+) -> list[DayPrediction]:
+    """Score a whole trip: day context chained by features.chain_itinerary, every item in one model call."""
+    chained = chain_itinerary(days, ctx)
+    flat = predict_batch(prefs, [row for day in chained for row in day], model=model, model_path=model_path)
+    out = []
+    start = 0
+    for day_number, day in enumerate(chained, start=1):
+        preds = flat[start : start + len(day)]
+        start += len(day)
+        out.append(DayPrediction(day_number=day_number, predictions=preds, **riskiest(preds)))
+    return out
+
+
+def riskiest(preds: list[RegretPrediction]) -> dict:
+    """The max_* fields of DayPrediction for one day's predictions (empty for a rest day)."""
+    if not preds:
+        return {}
+    worst = max(range(len(preds)), key=lambda i: preds[i].regret_probability)
+    return {
+        "max_regret_probability": preds[worst].regret_probability,
+        "max_risk_bucket": preds[worst].risk_bucket,
+        "max_risk_index": worst,
+    }
@@ -0,0 +1,253 @@
+# Stateful itinerary scoring: an edit re-scores only the items it touches.
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+
+from ..serving.metrics import stage
+from .config.defaults import FEATURE_COLUMNS, SESSION_MAX_ENTRIES, SESSION_TTL_SECONDS
+from .features import build_feature_matrix, chain_day, next_day_context
+from .model import _predictions, load_model, riskiest
+from .schemas import (
+    MAX_ITEMS_PER_DAY,
+    Context,
+    DayDelta,
+    DayPrediction,
+    ItineraryDelta,
+    ItineraryEdit,
+    ItineraryItem,
+    PredictionChange,
+    RegretPrediction,
+    UserPreferences,
+)
+
+
+class ItinerarySession:
+    """A scored trip kept in memory and re-scored incrementally as it is edited.
+
+    Per day it keeps the items (as given), the chained context, the feature rows and the predictions. An edit
+    re-chains the edited days from the first position it touched, plus the next day when its previous_day_* context
+    changed. Those feature rows are rebuilt, and the model runs only on rows whose features changed. The state always
+    matches predict_itinerary on the edited trip.
+
+    Edits return an ItineraryDelta, relative to the previous predictions with the same edit applied: an inserted
+    item is always listed, a removed one is just gone. Not thread-safe on its own; SessionStore users hold .lock.
+    """
+
+    def __init__(
+        self,
+        prefs: UserPreferences,
+        days: Sequence[Sequence[ItineraryItem]],
+        ctx: Optional[Context] = None,
+        model: Optional[Any] = None,
+        model_path: Optional[Path | str] = None,
+    ):
+        self.prefs = prefs
+        self.model = model if model is not None else load_model(model_path)
+        self.lock = threading.Lock()
+        # Set when the model changed since the last scoring: the next _rescore re-scores every item
+        self._stale = False
+        self._items = [list(items) for items in days]
+        self._ctx = []
+        ctx = ctx or Context()
+        for items in self._items:
+            self._ctx.append(ctx)
+            ctx = next_day_context(ctx, items)
+        # NaN rows never equal a rebuilt row, so every item is scored once here
+        self._X = [np.full((len(items), len(FEATURE_COLUMNS)), np.nan) for items in self._items]
+        self._preds: list[list[Optional[RegretPrediction]]] = [[None] * len(items) for items in self._items]
+        self._rescore({d: 0 for d in range(len(self._items))})
+
+    def days(self) -> list[DayPrediction]:
+        """The whole trip, as predict_itinerary returns it."""
+        return [
+            DayPrediction(day_number=d + 1, predictions=list(preds), **riskiest(preds))
+            for d, preds in enumerate(self._preds)
+        ]
+
+    def set_model(self, model: Any) -> ItineraryDelta:
+        """Re-score every item with another model (e.g. after a hot reload); unchanged predictions are left out."""
+        self._use(model)
+        return self._rescore({})
+
+    def apply(self, edit: ItineraryEdit, model: Optional[Any] = None) -> ItineraryDelta:
+        """One edit. With a model other than the session's, every item is re-scored with it in the same delta."""
+        if model is not None:
+            self._use(model)
+        if edit.op in ("insert", "modify") and edit.item is None:
+            raise ValueError(f"{edit.op} needs an item")
+        if edit.op == "insert":
+            return self.insert(edit.day_number, edit.index, edit.item)
+        if edit.op == "remove":
+            return self.remove(edit.day_number, edit.index)
+        if edit.op == "modify":
+            return self.modify(edit.day_number, edit.index, edit.item)
+        if edit.to_index is None:
+            raise ValueError("move needs to_index")
+        to_day_number = edit.to_day_number if edit.to_day_number is not None else edit.day_number
+        return self.move(edit.day_number, edit.index, to_day_number, edit.to_index)
+
+    def insert(self, day_number: int, index: int, item: ItineraryItem) -> ItineraryDelta:
+        d = self._day(day_number)
+        self._check_index(d, index, insert=True)
+        self._insert(d, index, item, np.nan, None)
+        return self._rescore({d: index})
+
+    def remove(self, day_number: int, index: int) -> ItineraryDelta:
+        d = self._day(day_number)
+        self._check_index(d, index)
+        self._pop(d, index)
+        return self._rescore({d: index})
+
+    def modify(self, day_number: int, index: int, item: ItineraryItem) -> ItineraryDelta:
+        d = self._day(day_number)
+        self._check_index(d, index)
+        self._items[d][index] = item
+        return self._rescore({d: index})
+
+    def move(self, day_number: int, index: int, to_day_number: int, to_index: int) -> ItineraryDelta:
+        """Move one item; to_index is its position in the target day after the move."""
+        d, to_d = self._day(day_number), self._day(to_day_number)
+        self._check_index(d, index)
+        if to_d != d:
+            self._check_index(to_d, to_index, insert=True)
+        elif to_index >= len(self._items[d]):
+            raise ValueError(f"to_index {to_index} out of range for day {day_number} ({len(self._items[d])} items)")
+        self._insert(to_d, to_index, *self._pop(d, index))
+        if to_d == d:
+            return self._rescore({d: min(index, to_index)})
+        return self._rescore({d: index, to_d: to_index})
+
+    def _use(self, model: Any) -> None:
+        if model is not self.model:
+            self.model = model
+            self._stale = True
+
+    def _day(self, day_number: int) -> int:
+        if not 1 <= day_number <= len(self._items):
+            raise ValueError(f"day_number {day_number} out of range 1..{len(self._items)}")
+        return day_number - 1
+
+    def _check_index(self, d: int, index: int, insert: bool = False) -> None:
+        n = len(self._items[d])
+        if insert and n >= MAX_ITEMS_PER_DAY:
+            raise ValueError(f"Day {d + 1} already has {MAX_ITEMS_PER_DAY} items")
+        if not 0 <= index < n + insert:
+            raise ValueError(f"index {index} out of range for day {d + 1} ({n} items)")
+
+    def _insert(self, d: int, index: int, item: ItineraryItem, row: Any, pred: Optional[RegretPrediction]) -> None:
+        self._items[d].insert(index, item)
+        self._X[d] = np.insert(self._X[d], index, row, axis=0)
+        self._preds[d].insert(index, pred)
+
+    def _pop(self, d: int, index: int) -> tuple:
+        row = self._X[d][index].copy()
+        self._X[d] = np.delete(self._X[d], index, axis=0)
+        return self._items[d].pop(index), row, self._preds[d].pop(index)
+
+    def _rescore(self, edited: dict[int, int]) -> ItineraryDelta:
+        """Rebuild the feature rows of each edited day from its first edited position, and all of the next day's
+        rows when its chained context changed; run the model on the rows that differ from before."""
+        rescore_all = self._stale
+        start = {d: 0 for d in range(len(self._items))} if rescore_all else dict(edited)
+        for d in sorted(edited):
+            if d + 1 < len(self._items):
+                ctx = next_day_context(self._ctx[d], self._items[d])
+                if ctx != self._ctx[d + 1]:
+                    self._ctx[d + 1] = ctx
+                    start[d + 1] = 0
+        touched = sorted(start)
+        rows = [row for d in touched for row in chain_day(self._items[d], d + 1, self._ctx[d])[start[d] :]]
+        changed: dict[int, list[int]] = {}
+        if rows:
+            with stage("features"):
+                X = build_feature_matrix(self.prefs, [item for item, _ in rows], [ctx for _, ctx in rows])
+            offset = 0
+            for d in touched:
+                new = X[offset : offset + len(self._items[d]) - start[d]]
+                offset += len(new)
+                old = self._X[d][start[d] :]
+                diff = np.ones(len(new), dtype=bool) if rescore_all else ~(new == old).all(axis=1)
+                old[:] = new
+                changed[d] = (start[d] + np.flatnonzero(diff)).tolist()
+        positions = [(d, i) for d in touched for i in changed.get(d, [])]
+        fresh = _predictions(self.model, np.array([self._X[d][i] for d, i in positions])) if positions else []
+        changes: dict[int, list[PredictionChange]] = {d: [] for d in touched}
+        for (d, i), pred in zip(positions, fresh):
+            if pred != self._preds[d][i]:
+                self._preds[d][i] = pred
+                changes[d].append(PredictionChange(index=i, prediction=pred))
+        self._stale = False
+        return ItineraryDelta(
+            days=[
+                DayDelta(
+                    day_number=d + 1,
+                    n_items=len(self._items[d]),
+                    changes=changes[d],
+                    **riskiest(self._preds[d]),
+                )
+                for d in touched
+                if changes[d] or d in edited
+            ]
+        )
+
+
+class SessionStore:
+    """Thread-safe LRU of ItinerarySessions by id; a session expires ttl_seconds after it was last used."""
+
+    def __init__(
+        self,
+        max_entries: int = SESSION_MAX_ENTRIES,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, ItinerarySession]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evictions = 0
+
+    def add(self, session: ItinerarySession) -> str:
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[session_id] = (self._clock() + self.ttl_seconds, session)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return session_id
+
+    def get(self, session_id: str) -> Optional[ItinerarySession]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[session_id]
+                self.expired += 1
+                return None
+            self._entries[session_id] = (now + self.ttl_seconds, entry[1])
+            self._entries.move_to_end(session_id)
+            return entry[1]
+
+    def remove(self, session_id: str) -> bool:
+        with self._lock:
+            return self._entries.pop(session_id, None) is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
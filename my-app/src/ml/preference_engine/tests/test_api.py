@@ -18,9 +18,13 @@ def client():
 
 
 def test_health(client: TestClient) -> None:
-    r = client.get("/health")
+    with client:  # runs lifespan, which loads the model
+        r = client.get("/health")
     assert r.status_code == 200
-    assert r.json() == {"status": "ok"}
+    data = r.json()
+    assert data["status"] == "ok"
+    assert data["model"]["loaded"] is True
+    assert data["model"]["version"]
 
 
 def test_predict_request_response(client: TestClient) -> None:
@@ -52,6 +56,8 @@ def test_predict_request_response(client: TestClient) -> None:
     }
     r = client.post("/predict", json=body)
     assert r.status_code == 200
+    stages = {part.split(";")[0] for part in r.headers["server-timing"].split(", ")}
+    assert {"validate", "features", "inference", "explain", "serialize", "total"} <= stages
     data = r.json()
     assert "prediction" in data
     p = data["prediction"]
@@ -61,3 +67,53 @@ def test_predict_request_response(client: TestClient) -> None:
     assert 0 <= p["regret_probability"] <= 1
     assert p["risk_bucket"] in ("low", "medium", "high")
     assert isinstance(p["reasons"], list)
+
+
+def test_predict_itinerary(client: TestClient) -> None:
+    body = {
+        "user_preferences": {"pace": 0.3, "walking_effort": 0.2},
+        "days": [
+            {"items": [{"start_hour": 9.0, "walking_km": 4.0}, {"start_hour": 20.0, "walking_km": 5.0}]},
+            {"items": []},
+            {"items": [{"start_hour": 7.0, "walking_km": 1.0, "is_late_night": True}]},
+        ],
+    }
+    r = client.post("/predict_itinerary", json=body)
+    assert r.status_code == 200
+    days = r.json()["days"]
+    assert [len(d["predictions"]) for d in days] == [2, 0, 1]
+    assert days[0]["max_regret_probability"] == max(p["regret_probability"] for p in days[0]["predictions"])
+    assert days[1]["max_risk_bucket"] is None
+    # Same score as /predict with the running quantities filled in by hand
+    item = {"start_hour": 20.0, "walking_km": 5.0, "walking_km_cumulative_day": 9.0, "activity_count_today": 2}
+    single = client.post("/predict", json={"user_preferences": body["user_preferences"], "itinerary_item": item})
+    assert days[0]["predictions"][1] == single.json()["prediction"]
+
+
+def test_predict_itinerary_rejects_empty_trip(client: TestClient) -> None:
+    r = client.post("/predict_itinerary", json={"user_preferences": {}, "days": []})
+    assert r.status_code == 422
+
+
+def test_itinerary_session_edits(client: TestClient) -> None:
+    body = {
+        "user_preferences": {"pace": 0.3, "walking_effort": 0.2},
+        "days": [{"items": [{"start_hour": 9.0, "walking_km": 4.0}]}, {"items": [{"start_hour": 7.0}]}],
+    }
+    r = client.post("/itinerary_sessions", json=body)
+    assert r.status_code == 200
+    session_id = r.json()["session_id"]
+    assert r.json()["days"] == client.post("/predict_itinerary", json=body).json()["days"]
+    edit = {"op": "insert", "day_number": 1, "index": 1, "item": {"start_hour": 14.0, "walking_km": 6.0}}
+    r = client.post(f"/itinerary_sessions/{session_id}/edits", json=edit)
+    assert r.status_code == 200
+    (day,) = r.json()["days"]
+    assert day["day_number"] == 1 and day["n_items"] == 2
+    body["days"][0]["items"].append(edit["item"])
+    expected = client.post("/predict_itinerary", json=body).json()["days"][0]["predictions"][1]
+    assert day["changes"] == [{"index": 1, "prediction": expected}]
+    r = client.post(f"/itinerary_sessions/{session_id}/edits", json={"op": "remove", "day_number": 3, "index": 0})
+    assert r.status_code == 422
+    assert client.delete(f"/itinerary_sessions/{session_id}").status_code == 200
+    r = client.post(f"/itinerary_sessions/{session_id}/edits", json={"op": "remove", "day_number": 1, "index": 0})
+    assert r.status_code == 404
@@ -0,0 +1,77 @@
+# Tests for reason extraction.
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ml.preference_engine.config.defaults import FEATURE_COLUMNS, FEATURE_NAMES_MISMATCH, REASON_MESSAGES
+from ml.preference_engine.explanations import ReasonWeights, get_reasons, get_reasons_batch
+from ml.preference_engine.model import load_model
+from ml.preference_engine.schemas import RegretReason
+
+
+def _reference_reasons(model, features: dict[str, float], top_k: int = 4) -> list[RegretReason]:
+    """The per-row loop get_reasons_batch replaces."""
+    coef = model.coef_[0]
+    idx = {c: i for i, c in enumerate(FEATURE_COLUMNS)}
+    contributions = []
+    for name in FEATURE_NAMES_MISMATCH:
+        contrib = features.get(name, 0.0) * coef[idx[name]]
+        if contrib > 1e-6:
+            contributions.append((name, contrib))
+    contributions.sort(key=lambda x: -x[1])
+    reasons = []
+    for name, strength in contributions[:top_k]:
+        code, message = REASON_MESSAGES[name]
+        reasons.append(RegretReason(code=code, message=message, strength=round(min(1.0, strength), 4)))
+    return reasons
+
+
+def _random_features(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, len(FEATURE_COLUMNS)))
+    X[rng.random(X.shape) < 0.3] = 0.0  # many features are zero in practice
+    return X
+
+
+def test_batch_matches_per_row_loop() -> None:
+    try:
+        model = load_model()
+    except FileNotFoundError:
+        pytest.skip("Model not trained. Run: python -m ml.preference_engine.train")
+    X = _random_features(500)
+    batch = get_reasons_batch(model, X)
+    for row, reasons in zip(X, batch):
+        assert reasons == _reference_reasons(model, dict(zip(FEATURE_COLUMNS, row.tolist())))
+
+
+def test_ties_keep_feature_order_and_negative_coefficients_never_explain() -> None:
+    coef = np.zeros((1, len(FEATURE_COLUMNS)))
+    coef[0, : len(FEATURE_NAMES_MISMATCH)] = 1.0
+    coef[0, FEATURE_COLUMNS.index("crowd_mismatch")] = -2.0
+    model = SimpleNamespace(coef_=coef)
+    X = np.zeros((1, len(FEATURE_COLUMNS)))
+    X[0, : len(FEATURE_NAMES_MISMATCH)] = 0.5
+    (reasons,) = get_reasons_batch(model, X)
+    assert [r.code for r in reasons] == ["too_packed", "too_much_walking", "too_early", "over_budget"]
+    assert reasons == _reference_reasons(model, dict(zip(FEATURE_COLUMNS, X[0].tolist())))
+
+
+def test_get_reasons_single_row_and_model_without_coefficients() -> None:
+    model = SimpleNamespace(coef_=np.ones((1, len(FEATURE_COLUMNS))))
+    feats = {"walk_over_tolerance_km": 0.9, "budget_overrun": 2.0}
+    assert [(r.code, r.strength) for r in get_reasons(model, feats, FEATURE_COLUMNS)] == [
+        ("over_budget", 1.0),
+        ("too_much_walking", 0.9),
+    ]
+    assert get_reasons_batch(object(), np.ones((2, len(FEATURE_COLUMNS)))) == [[], []]
+
+
+def test_load_model_precomputes_reason_weights() -> None:
+    try:
+        model = load_model()
+    except FileNotFoundError:
+        pytest.skip("Model not trained. Run: python -m ml.preference_engine.train")
+    assert isinstance(model.reason_weights, ReasonWeights)
+    assert model.reason_weights.columns.tolist() == [FEATURE_COLUMNS.index(n) for n in FEATURE_NAMES_MISMATCH]
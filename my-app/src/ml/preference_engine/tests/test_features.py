@@ -1,7 +1,11 @@
 # Tests for feature extraction and monotonicity.
 
+import random
+
+import numpy as np
+
 from ml.preference_engine.config.defaults import FEATURE_COLUMNS
-from ml.preference_engine.features import build_features
+from ml.preference_engine.features import _round6, build_feature_matrix, build_features, chain_itinerary
 from ml.preference_engine.schemas import Context, ItineraryItem, UserPreferences
 
 
@@ -64,3 +68,83 @@ def test_late_night_after_early_with_context() -> None:
     ctx = Context(previous_day_end_hour=23.0)
     feats = build_features(prefs, item, ctx)
     assert "late_night_after_early" in feats
+
+
+def test_chain_itinerary_fills_running_day_quantities() -> None:
+    days = [
+        [ItineraryItem(start_hour=9.0, walking_km=2.0), ItineraryItem(start_hour=20.0, end_hour=23.5, walking_km=1.5)],
+        [],
+        [ItineraryItem(start_hour=7.0, duration_hours=2.0, walking_km=4.0, activity_count_today=9)],
+    ]
+    chained = chain_itinerary(days, Context(previous_day_end_hour=21.0, recent_pace_score=0.4))
+    (a, ctx_a), (b, ctx_b) = chained[0]
+    assert (a.walking_km_cumulative_day, a.activity_count_today, a.day_number) == (2.0, 1, 1)
+    assert (b.walking_km_cumulative_day, b.activity_count_today) == (3.5, 2)
+    assert ctx_a.previous_day_end_hour == ctx_b.previous_day_end_hour == 21.0
+    assert chained[1] == []
+    (c, ctx_c), = chained[2]
+    assert (c.walking_km_cumulative_day, c.activity_count_today, c.day_number) == (4.0, 1, 3)
+    # Day 2 was a rest day: no end hour, no walking; other context fields carry over
+    assert ctx_c.previous_day_end_hour is None and ctx_c.previous_day_walking_km == 0.0
+    assert ctx_c.recent_pace_score == 0.4
+    assert days[0][0].walking_km_cumulative_day is None  # inputs are not modified
+
+
+def test_chain_itinerary_previous_day_end_is_latest_item_end() -> None:
+    days = [[ItineraryItem(start_hour=18.0, duration_hours=5.0), ItineraryItem(start_hour=14.0)], [ItineraryItem()]]
+    (_, ctx), = chain_itinerary(days)[1]
+    assert ctx.previous_day_end_hour == 23.0
+    assert build_features(UserPreferences(), ItineraryItem(is_late_night=True), ctx)["late_night_after_early"] == 1.0
+
+
+def _random_case(rng: random.Random) -> tuple[UserPreferences, ItineraryItem, Context | None]:
+    def level() -> float:
+        # Mix grid values (exact thresholds, 0 and 1) with arbitrary floats
+        return rng.choice([0.0, 0.25, 0.5, 1.0, rng.random()])
+
+    prefs = UserPreferences(
+        pace=level(),
+        crowd_comfort=level(),
+        morning_tolerance=level(),
+        walking_effort=level(),
+        budget_comfort=level(),
+        planning_vs_spontaneity=level(),
+        noise_sensitivity=level(),
+        dislike_heat=rng.random() < 0.2,
+        dislike_rain=rng.random() < 0.2,
+    )
+    item = ItineraryItem(
+        start_hour=rng.choice([8.0, 9.0, rng.uniform(0, 24)]),
+        walking_km=rng.uniform(0, 20),
+        walking_km_cumulative_day=rng.choice([None, 10.0, rng.uniform(0, 50)]),
+        crowd_level=level(),
+        outdoor_fraction=level(),
+        activity_count_today=rng.randint(0, 20),
+        cost_level=level(),
+        is_late_night=rng.random() < 0.5,
+        bad_weather_today=rng.choice([None, True, False]),
+    )
+    ctx = rng.choice([None, Context(), Context(previous_day_end_hour=rng.choice([22.0, rng.uniform(0, 24)]))])
+    return prefs, item, ctx
+
+
+def test_build_feature_matrix_matches_scalar_build_features_exactly() -> None:
+    rng = random.Random(0)
+    cases = [_random_case(rng) for _ in range(2000)]
+    X = build_feature_matrix([p for p, _, _ in cases], [i for _, i, _ in cases], [c for _, _, c in cases])
+    expected = np.array([[build_features(p, i, c)[col] for col in FEATURE_COLUMNS] for p, i, c in cases])
+    assert X.shape == (len(cases), len(FEATURE_COLUMNS)) and X.dtype == np.float64
+    np.testing.assert_array_equal(X, expected)
+
+
+def test_build_feature_matrix_broadcasts_one_user() -> None:
+    prefs = UserPreferences(pace=0.2, walking_effort=0.7)
+    items = [ItineraryItem(start_hour=h, walking_km=h / 2.0) for h in (6.0, 12.0, 23.0)]
+    X = build_feature_matrix(prefs, items)
+    for row, item in zip(X, items):
+        assert row.tolist() == [build_features(prefs, item)[c] for c in FEATURE_COLUMNS]
+
+
+def test_round6_matches_python_round_on_ties() -> None:
+    values = np.array([0.0000005, 0.0000015, 0.1234565, 0.2500005, 0.9999995, 1.0, 0.0])
+    assert _round6(values).tolist() == [round(float(v), 6) for v in values]
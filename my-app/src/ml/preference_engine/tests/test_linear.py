@@ -0,0 +1,94 @@
+# Tests for the NumPy array export of the logistic model.
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ml.preference_engine.config.defaults import FEATURE_COLUMNS
+from ml.preference_engine.linear import LinearModel, export_linear, load_linear
+from ml.preference_engine.model import load_model, predict
+from ml.preference_engine.schemas import ItineraryItem, UserPreferences
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+PICKLE_PATH = PACKAGE_DIR / "data" / "model.pkl"
+ARRAY_PATH = PACKAGE_DIR / "data" / "model.npz"
+SRC_DIR = PACKAGE_DIR.parents[1]
+
+
+def _training_data(n: int = 400, seed: int = 0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((n, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    y = (X.iloc[:, 0] + X.iloc[:, 3] + rng.normal(0, 0.3, n) > 1.0).astype(int)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def sklearn_model():
+    if not PICKLE_PATH.exists():
+        pytest.skip("Model not trained. Run: python -m ml.preference_engine.train")
+    return load_model(PICKLE_PATH)
+
+
+def test_export_matches_sklearn_predict_proba(sklearn_model, tmp_path) -> None:
+    import pandas as pd
+
+    linear = load_linear(export_linear(sklearn_model, tmp_path / "model.npz"))
+    X = np.random.default_rng(1).random((500, len(FEATURE_COLUMNS)))
+    expected = sklearn_model.predict_proba(pd.DataFrame(X, columns=FEATURE_COLUMNS))
+    np.testing.assert_allclose(linear.predict_proba(X), expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["sigmoid", "isotonic"])
+def test_calibrated_model_round_trip(method, tmp_path) -> None:
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.linear_model import LogisticRegression
+
+    X, y = _training_data()
+    model = CalibratedClassifierCV(LogisticRegression(max_iter=500), method=method, cv=3).fit(X, y)
+    linear = load_linear(export_linear(model, tmp_path / "model.npz"))
+    assert linear.coef.shape == (3, len(FEATURE_COLUMNS))
+    np.testing.assert_allclose(linear.predict_proba(X.to_numpy()), model.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def test_predict_same_for_pickle_and_array_artifacts(sklearn_model) -> None:
+    if not ARRAY_PATH.exists():
+        pytest.skip("No array export. Run: python -m ml.preference_engine.linear")
+    linear = load_model(ARRAY_PATH)
+    assert isinstance(linear, LinearModel)
+    prefs = UserPreferences(pace=0.2, walking_effort=0.2, noise_sensitivity=0.9)
+    for item in (ItineraryItem(), ItineraryItem(start_hour=6.0, walking_km=8.0, activity_count_today=8)):
+        assert predict(prefs, item, model=linear) == predict(prefs, item, model=sklearn_model)
+
+
+def test_load_rejects_feature_mismatch(tmp_path) -> None:
+    path = tmp_path / "model.npz"
+    np.savez(
+        path,
+        feature_columns=np.array(FEATURE_COLUMNS[::-1]),
+        coef=np.zeros((1, len(FEATURE_COLUMNS))),
+        intercept=np.zeros(1),
+        calibration=np.array(["none"]),
+        calibration_a_0=np.empty(0),
+        calibration_b_0=np.empty(0),
+    )
+    with pytest.raises(ValueError, match="feature columns"):
+        load_linear(path)
+
+
+def test_array_load_imports_neither_pandas_nor_sklearn() -> None:
+    if not ARRAY_PATH.exists():
+        pytest.skip("No array export. Run: python -m ml.preference_engine.linear")
+    script = (
+        "import sys\n"
+        "from ml.preference_engine.model import load_model, predict\n"
+        "from ml.preference_engine.schemas import ItineraryItem, UserPreferences\n"
+        "predict(UserPreferences(), ItineraryItem(), model=load_model())\n"
+        "print(sorted(m for m in ('pandas', 'sklearn') if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,158 @@
+# Tests for incremental itinerary re-scoring: same state as predict_itinerary after every edit.
+
+import random
+
+import pytest
+
+from ml.preference_engine.config.defaults import FEATURE_COLUMNS
+from ml.preference_engine.linear import LinearModel
+from ml.preference_engine.model import load_model, predict_itinerary
+from ml.preference_engine.schemas import Context, ItineraryEdit, ItineraryItem, UserPreferences
+from ml.preference_engine.session import ItinerarySession, SessionStore
+
+PREFS = UserPreferences(pace=0.4, walking_effort=0.3, morning_tolerance=0.3)
+
+
+@pytest.fixture(scope="module")
+def model():
+    try:
+        return load_model()
+    except FileNotFoundError:
+        pytest.skip("Model not trained. Run: python -m ml.preference_engine.train")
+
+
+def _item(rng: random.Random) -> ItineraryItem:
+    return ItineraryItem(
+        start_hour=rng.uniform(5.0, 23.0),
+        duration_hours=rng.uniform(0.5, 4.0),
+        walking_km=rng.uniform(0.0, 6.0),
+        crowd_level=rng.random(),
+        cost_level=rng.random(),
+        is_late_night=rng.random() < 0.3,
+    )
+
+
+def _random_edit(rng: random.Random, days: list[list[ItineraryItem]]) -> ItineraryEdit | None:
+    """A random valid edit, already applied to days (the caller's copy of the trip)."""
+    op = rng.choice(["insert", "remove", "move", "modify"])
+    d = rng.randrange(len(days))
+    n = len(days[d])
+    if op == "insert":
+        edit = ItineraryEdit(op=op, day_number=d + 1, index=rng.randint(0, n), item=_item(rng))
+        days[d].insert(edit.index, edit.item)
+        return edit
+    if n == 0:
+        return None
+    index = rng.randrange(n)
+    if op == "remove":
+        days[d].pop(index)
+        return ItineraryEdit(op=op, day_number=d + 1, index=index)
+    if op == "modify":
+        days[d][index] = _item(rng)
+        return ItineraryEdit(op=op, day_number=d + 1, index=index, item=days[d][index])
+    to_d = rng.randrange(len(days))
+    item = days[d].pop(index)
+    to_index = rng.randint(0, len(days[to_d]))
+    days[to_d].insert(to_index, item)
+    return ItineraryEdit(op=op, day_number=d + 1, index=index, to_day_number=to_d + 1, to_index=to_index)
+
+
+def test_random_edits_match_full_rescore(model) -> None:
+    rng = random.Random(0)
+    ctx = Context(previous_day_end_hour=23.0)
+    days = [[_item(rng) for _ in range(rng.randint(0, 6))] for _ in range(8)]
+    session = ItinerarySession(PREFS, days, ctx, model=model)
+    assert session.days() == predict_itinerary(PREFS, days, ctx, model=model)
+    # What a client holds: the last predictions, edited like the trip, then patched with each delta
+    mirror = [day.predictions for day in session.days()]
+    for _ in range(150):
+        before = [list(day) for day in days]
+        edit = _random_edit(rng, days)
+        if edit is None:
+            continue
+        if edit.op == "insert":
+            mirror[edit.day_number - 1].insert(edit.index, None)
+        elif edit.op == "remove":
+            mirror[edit.day_number - 1].pop(edit.index)
+        elif edit.op == "move":
+            moved = mirror[edit.day_number - 1].pop(edit.index)
+            mirror[edit.to_day_number - 1].insert(edit.to_index, moved)
+        delta = session.apply(edit)
+        for day in delta.days:
+            assert day.n_items == len(days[day.day_number - 1])
+            for change in day.changes:
+                mirror[day.day_number - 1][change.index] = change.prediction
+        expected = predict_itinerary(PREFS, days, ctx, model=model)
+        assert session.days() == expected, (edit, before)
+        assert mirror == [day.predictions for day in expected]
+
+
+def test_edit_leaves_other_days_out_of_the_delta(model) -> None:
+    # The trained model may barely weigh late_night_after_early, the one feature the chained context feeds
+    coef = model.coef.copy()
+    coef[:, FEATURE_COLUMNS.index("late_night_after_early")] = 2.0
+    model = LinearModel(coef, model.intercept, model.feature_columns, model.calibrations)
+    days = [[ItineraryItem(start_hour=10.0, walking_km=2.0)] * 3 for _ in range(5)]
+    session = ItinerarySession(PREFS, days, model=model)
+    delta = session.modify(2, 2, ItineraryItem(start_hour=10.0, walking_km=9.0))
+    # Same end hour, so day 3's context only changes in previous_day_walking_km, which no feature reads
+    assert [day.day_number for day in delta.days] == [2]
+    assert [change.index for change in delta.days[0].changes] == [2]
+    # A change in the latest end of day 2 is only seen by day 3
+    late = ItineraryItem(start_hour=21.0, duration_hours=2.0, is_late_night=True)
+    session.insert(3, 0, late)
+    delta = session.modify(2, 0, ItineraryItem(start_hour=22.0, duration_hours=1.5))
+    assert [day.day_number for day in delta.days] == [2, 3]
+    assert [change.index for change in delta.days[1].changes] == [0]
+
+
+def test_unchanged_item_gives_empty_delta(model) -> None:
+    item = ItineraryItem(start_hour=9.0, walking_km=3.0)
+    session = ItinerarySession(PREFS, [[item, item]], model=model)
+    delta = session.modify(1, 0, item.model_copy())
+    assert len(delta.days) == 1
+    assert delta.days[0].changes == []
+    assert delta.days[0].max_regret_probability == session.days()[0].max_regret_probability
+
+
+def test_invalid_edits_leave_session_unchanged(model) -> None:
+    session = ItinerarySession(PREFS, [[ItineraryItem()], []], model=model)
+    before = session.days()
+    for edit in (
+        ItineraryEdit(op="remove", day_number=3, index=0),
+        ItineraryEdit(op="remove", day_number=2, index=0),
+        ItineraryEdit(op="insert", day_number=1, index=2, item=ItineraryItem()),
+        ItineraryEdit(op="modify", day_number=1, index=0),
+        ItineraryEdit(op="move", day_number=1, index=0, to_index=1),
+        ItineraryEdit(op="move", day_number=1, index=0, to_day_number=2, to_index=1),
+    ):
+        with pytest.raises(ValueError):
+            session.apply(edit)
+    assert session.days() == before
+
+
+def test_model_swap_rescores_every_item(model) -> None:
+    days = [[ItineraryItem(walking_km=k) for k in (1.0, 4.0)], [ItineraryItem(start_hour=7.0)]]
+    session = ItinerarySession(PREFS, days, model=model)
+    other = load_model()
+    other.intercept = other.intercept + 1.0
+    delta = session.apply(ItineraryEdit(op="remove", day_number=1, index=1), model=other)
+    assert [len(day.changes) for day in delta.days] == [1, 1]
+    assert session.days() == predict_itinerary(PREFS, [days[0][:1], days[1]], model=other)
+
+
+def test_store_expires_and_evicts() -> None:
+    now = [0.0]
+    store = SessionStore(max_entries=2, ttl_seconds=10.0, clock=lambda: now[0])
+    a, b = object(), object()
+    a_id, b_id = store.add(a), store.add(b)
+    now[0] = 8.0
+    assert store.get(a_id) is a
+    now[0] = 15.0
+    assert store.get(b_id) is None
+    assert store.get(a_id) is a
+    store.add(object())
+    store.add(object())
+    assert store.get(a_id) is None
+    assert store.stats()["expired"] == 1 and store.stats()["evictions"] == 1
+    assert not store.remove(a_id)
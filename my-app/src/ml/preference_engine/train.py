@@ -16,11 +16,13 @@ if __name__ == "__main__":
         sys.path.insert(0, str(src))
 
 from ml.preference_engine.config.defaults import FEATURE_COLUMNS
+from ml.preference_engine.linear import export_linear
 from ml.preference_engine.synthetic_data import generate_dataset, save_dataset
 
 PACKAGE_DIR = Path(__file__).resolve().parent
 DATA_DIR = PACKAGE_DIR / "data"
 MODEL_PATH = DATA_DIR / "model.pkl"
+ARRAY_MODEL_PATH = DATA_DIR / "model.npz"
 METADATA_PATH = DATA_DIR / "model_metadata.json"
 DATASET_PATH = DATA_DIR / "synthetic_data.csv"
 
@@ -59,6 +61,7 @@ def main() -> None:
     import pickle
     with open(MODEL_PATH, "wb") as f:
         pickle.dump(model, f)
+    export_linear(model, ARRAY_MODEL_PATH)
     metadata = {
         "feature_columns": FEATURE_COLUMNS,
         "n_samples": N_SAMPLES,
@@ -67,7 +70,7 @@ def main() -> None:
     }
     with open(METADATA_PATH, "w") as f:
         json.dump(metadata, f, indent=2)
-    print(f"Saved model to {MODEL_PATH}, metadata to {METADATA_PATH}")
+    print(f"Saved model to {MODEL_PATH} (arrays: {ARRAY_MODEL_PATH}), metadata to {METADATA_PATH}")
 
 
 if __name__ == "__main__":
@@ -1,30 +1,96 @@
-# FastAPI: /score, /batch_score, /health
+# FastAPI: /score, /batch_score, /batch_score_columnar, /batch_score_arrow, /batch_score_stream, /rank, /matrix_score,
+# /health, /admin/reload
 
+import json
 from contextlib import asynccontextmanager
 from typing import Optional
 
-from fastapi import FastAPI
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
 
-from .model import load_model, predict_batch, predict_regret_probability
-from .schemas import BatchScoreRequest, BatchScoreResponse, ScoreRequest, ScoreResponse
+from ..serving import executor
+from ..serving.admin import admin_router
+from ..serving.admission import ADMISSION, BULK, INTERACTIVE, lane_for
+from ..serving.metrics import instrument, record_batch_size, timed
+from ..serving.registry import ModelRegistry
+from .arrow import ARROW_STREAM, ArrowRequest, write_scores
+from .batching import MicroBatcher
+from .cache import ScoreCache, cached_predict_batch, score_keys
+from .config.defaults import CACHE_MAX_ENTRIES, SCORE_BATCH_MAX_SIZE, STREAM_CHUNK_SIZE
+from .inference import AUTO_NUMPY_MAX_ROWS
+from .model import (
+    iter_batch_chunks,
+    load_model,
+    model_files,
+    predict_batch,
+    predict_batch_arrays,
+    predict_matrix,
+    predict_regret_arrays,
+    predict_regret_probability,
+    rank_top_k,
+    score_requests,
+)
+from .ndjson import NDJSON, DuplexStreamingResponse, iter_lines, parse_activities
+from .schemas import (
+    ActivityInput,
+    BatchScoreRequest,
+    BatchScoreResponse,
+    BatchScoreStreamHeader,
+    ColumnarBatchScoreRequest,
+    MatrixScoreRequest,
+    MatrixScoreResponse,
+    RankRequest,
+    RankResponse,
+    ScoreRequest,
+    ScoreResponse,
+    TravelPreferencesInput,
+)
+
+_cache: Optional[ScoreCache] = ScoreCache() if CACHE_MAX_ENTRIES > 0 else None
+
+
+def _warmup(model) -> None:
+    """Run the single-row and the large-batch inference paths (scores alone and explained) once so the first real
+    request is warm."""
+    score_requests([(TravelPreferencesInput(), [], ActivityInput())], model=model)
+    for explain in (False, True):
+        predict_batch(
+            TravelPreferencesInput(), ["museum"], [ActivityInput()] * (AUTO_NUMPY_MAX_ROWS + 1), model=model, explain=explain
+        )
 
-_model: Optional[object] = None
+
+# load_model picks the joblib model or its native export on every load, so both files are watched
+_files = model_files()
+_registry = ModelRegistry("preference_engine_XGBoost", load_model, _files[0], warmup=_warmup, watch=_files[1:])
+if _cache is not None:
+    # Cached scores belong to the model that produced them
+    _registry.on_swap(lambda version: _cache.clear())
 
 
 def get_model():
-    global _model
-    if _model is None:
-        _model = load_model()
-    return _model
+    return _registry.get()
+
+
+def _score_items(items: list) -> list[ScoreResponse]:
+    return score_requests(items, model=get_model())
+
+
+_batcher: Optional[MicroBatcher] = (
+    MicroBatcher(_score_items, engine="preference_engine_XGBoost", admission=ADMISSION) if SCORE_BATCH_MAX_SIZE > 1 else None
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
         get_model()
+        _registry.start_watching()
         yield
     finally:
-        pass
+        _registry.stop_watching()
 
 
 app = FastAPI(
@@ -32,11 +98,40 @@ app = FastAPI(
     description="Fit score and regret risk for activities (travel sliders + liked attraction types)",
     lifespan=lifespan,
 )
+app.include_router(admin_router(_registry))
+instrument(app, "preference_engine_XGBoost", _registry)
+
+
+def _scorer(model, explain: bool = True):
+    return lambda travel, interests, activities: predict_batch(
+        travel, interests, activities, model=model, explain=explain
+    )
 
 
 @app.post("/score", response_model=ScoreResponse)
-def score(body: ScoreRequest) -> ScoreResponse:
+@timed
+async def score(body: ScoreRequest) -> ScoreResponse:
+    if _batcher is None:
+        return await ADMISSION.run(INTERACTIVE, _score_one, body)
+    keys = None
+    if _cache is not None:
+        keys = score_keys(body.travel, body.interests, [body.activity])
+        generation = _cache.generation
+        hit = _cache.get_many(keys)[0]
+        if hit is not None:
+            return hit
+    result = await _batcher.submit((body.travel, body.interests, body.activity))
+    if keys is not None:
+        _cache.put_many(keys, [result], generation=generation)
+    return result
+
+
+def _score_one(body: ScoreRequest) -> ScoreResponse:
     model = get_model()
+    if _cache is not None:
+        return cached_predict_batch(
+            _cache, body.travel, body.interests, [body.activity], _scorer(model)
+        )[0]
     reg, _, explanation = predict_regret_probability(
         travel=body.travel,
         interests=body.interests,
@@ -51,17 +146,236 @@ def score(body: ScoreRequest) -> ScoreResponse:
 
 
 @app.post("/batch_score", response_model=BatchScoreResponse)
-def batch_score(body: BatchScoreRequest) -> BatchScoreResponse:
+@timed
+async def batch_score(body: BatchScoreRequest) -> BatchScoreResponse:
+    record_batch_size(len(body.activities))
+    return await ADMISSION.run(lane_for(len(body.activities)), _batch_score, body)
+
+
+def _batch_score(body: BatchScoreRequest) -> BatchScoreResponse:
     model = get_model()
+    if _cache is not None:
+        scores = cached_predict_batch(
+            _cache, body.travel, body.interests, body.activities, _scorer(model, body.explain), body.explain
+        )
+        return BatchScoreResponse(scores=scores)
     scores = predict_batch(
         travel=body.travel,
         interests=body.interests,
         activities=body.activities,
         model=model,
+        explain=body.explain,
+    )
+    return BatchScoreResponse(scores=scores)
+
+
+@app.post("/batch_score_columnar", response_model=BatchScoreResponse)
+@timed
+async def batch_score_columnar(body: ColumnarBatchScoreRequest) -> BatchScoreResponse:
+    """/batch_score with activities as parallel arrays; columns go straight into feature building (no cache)."""
+    record_batch_size(len(body.activities))
+    return await ADMISSION.run(lane_for(len(body.activities)), _batch_score_columnar, body)
+
+
+def _batch_score_columnar(body: ColumnarBatchScoreRequest) -> BatchScoreResponse:
+    scores = predict_batch_arrays(
+        travel=body.travel,
+        interests=body.interests,
+        arrays=body.activities.arrays(),
+        model=get_model(),
+        explain=body.explain,
     )
     return BatchScoreResponse(scores=scores)
 
 
+@app.post("/batch_score_arrow", response_class=Response)
+@timed
+async def batch_score_arrow(request: Request) -> Response:
+    """/batch_score over Arrow IPC: record batches of activity columns (travel / interests as JSON in the schema
+    metadata) in, one (fit_score, regret_probability) batch per input batch out. Scores only; not cached."""
+    body = await request.body()
+    try:
+        # The row count is only known once the stream is read, so Arrow requests (a bulk transport) use the bulk lane
+        # and the parse runs on the inference pool with the scoring
+        content = await ADMISSION.run(BULK, _batch_score_arrow, body)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return Response(content=content, media_type=ARROW_STREAM)
+
+
+def _batch_score_arrow(body: bytes) -> bytes:
+    # Zero-copy parse of the body; columns are only viewed (or cast / null-filled) when scored
+    parsed = ArrowRequest(body)
+    record_batch_size(parsed.num_rows)
+    model = get_model()
+    regret = [predict_regret_arrays(parsed.travel, parsed.interests, arrays, model=model) for arrays in parsed.arrays()]
+    return write_scores(regret)
+
+
+@app.post("/batch_score_stream")
+@timed
+async def batch_score_stream(request: Request) -> StreamingResponse:
+    """Same scores as /batch_score, streamed as NDJSON (one ScoreResponse per line, request order).
+
+    The body is either a BatchScoreRequest (JSON, parsed whole) or NDJSON: a BatchScoreStreamHeader line, then one
+    ActivityInput per line. NDJSON is read, validated and scored one chunk at a time, so memory stays flat however
+    many activities are sent.
+    """
+    if request.headers.get("content-type", "").split(";")[0].strip() == NDJSON:
+        return await _batch_score_ndjson(request)
+    try:
+        body = BatchScoreRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False, include_context=False)]
+        )
+    record_batch_size(len(body.activities))
+    lane = lane_for(len(body.activities))
+    model = await executor.run_inference(get_model)  # loads on first use only; scoring is admitted below
+    chunks = iter_batch_chunks(body.travel, body.interests, body.activities, score=_chunk_scorer(model, body.explain))
+
+    def next_lines() -> Optional[str]:
+        chunk = next(chunks, None)
+        return None if chunk is None else _ndjson_lines(chunk)
+
+    # The first chunk is admitted (or shed with 503) before the response starts; later chunks only queue
+    first = await ADMISSION.run(lane, next_lines)
+
+    async def lines():
+        # Each chunk is scored on the inference pool; the event loop only forwards the bytes
+        text = first
+        while text is not None:
+            yield text
+            text = await ADMISSION.run_queued(lane, next_lines)
+
+    return StreamingResponse(lines(), media_type=NDJSON)
+
+
+async def _batch_score_ndjson(request: Request) -> StreamingResponse:
+    lines = iter_lines(request.stream())
+
+    async def next_chunk() -> list[bytes]:
+        chunk = []
+        while len(chunk) < STREAM_CHUNK_SIZE:
+            line = await anext(lines, None)
+            if line is None:
+                break
+            chunk.append(line)
+        return chunk
+
+    try:
+        header_line = await anext(lines, None)
+        if header_line is None:
+            raise ValueError("NDJSON body needs a header line (travel, interests, explain)")
+        try:
+            header = BatchScoreStreamHeader.model_validate_json(header_line)
+        except ValidationError as e:
+            raise ValueError(f"header: {e}") from None
+        model = await executor.run_inference(get_model)
+        score = _chunk_scorer(model, header.explain)
+        chunk = await next_chunk()
+        # A body that ended within the first chunk has a known size; anything longer is bulk
+        lane = lane_for(len(chunk)) if len(chunk) < STREAM_CHUNK_SIZE else BULK
+        # Validation and scoring of the first chunk happen before the response starts: errors are a 422, shedding a 503
+        first = await ADMISSION.run(lane, _score_ndjson_chunk, score, header, chunk, 0)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def body(text: str, scored: int):
+        try:
+            while text:
+                yield text
+                rest = await next_chunk()
+                text = await ADMISSION.run_queued(lane, _score_ndjson_chunk, score, header, rest, scored)
+                scored += len(rest)
+        except ValueError as e:
+            # The 200 is already sent: a bad line further down ends the stream with an error line
+            yield json.dumps({"error": str(e)}) + "\n"
+        record_batch_size(scored)
+
+    return DuplexStreamingResponse(body(first, len(chunk)), media_type=NDJSON)
+
+
+def _score_ndjson_chunk(score, header: BatchScoreStreamHeader, lines: list[bytes], first_index: int) -> str:
+    if not lines:
+        return ""
+    return _ndjson_lines(score(header.travel, header.interests, parse_activities(lines, first_index)))
+
+
+def _chunk_scorer(model, explain: bool):
+    if _cache is None:
+        return _scorer(model, explain)
+    return lambda travel, interests, activities: cached_predict_batch(
+        _cache, travel, interests, activities, _scorer(model, explain), explain
+    )
+
+
+def _ndjson_lines(scores: list[ScoreResponse]) -> str:
+    return "".join(s.model_dump_json() + "\n" for s in scores)
+
+
+@app.post("/rank", response_model=RankResponse)
+@timed
+async def rank(body: RankRequest) -> RankResponse:
+    record_batch_size(len(body.activities))
+    return await ADMISSION.run(lane_for(len(body.activities)), _rank, body)
+
+
+def _rank(body: RankRequest) -> RankResponse:
+    model = get_model()
+    ranked = rank_top_k(
+        travel=body.travel,
+        interests=body.interests,
+        activities=body.activities,
+        k=body.k,
+        tie_break=body.tie_break,
+        min_fit=body.min_fit,
+        model=model,
+        explain=body.explain,
+    )
+    return RankResponse(ranked=ranked)
+
+
+@app.post("/matrix_score", response_model=MatrixScoreResponse)
+@timed
+async def matrix_score(body: MatrixScoreRequest) -> MatrixScoreResponse:
+    record_batch_size(len(body.users) * len(body.activities))
+    return await ADMISSION.run(lane_for(len(body.users) * len(body.activities)), _matrix_score, body)
+
+
+def _matrix_score(body: MatrixScoreRequest) -> MatrixScoreResponse:
+    model = get_model()
+    fit, top_indices, top_scores = predict_matrix(
+        travels=[u.travel for u in body.users],
+        interests_list=[u.interests for u in body.users],
+        activities=body.activities,
+        model=model,
+        top_k=body.top_k,
+    )
+    return MatrixScoreResponse(
+        user_ids=[u.user_id for u in body.users],
+        fit_scores=_round4(fit) if body.return_matrix else None,
+        top_indices=top_indices.tolist() if top_indices is not None else None,
+        top_scores=_round4(top_scores) if top_scores is not None else None,
+    )
+
+
+def _round4(values: np.ndarray) -> list:
+    return np.round(values.astype(np.float64), 4).tolist()
+
+
 @app.get("/health")
 def health() -> dict:
-    return {"status": "ok", "engine": "preference_engine_XGBoost"}
+    out = {"status": "ok", "engine": "preference_engine_XGBoost", "model": _registry.info()}
+    if out["model"]["loaded"]:
+        out["model"]["artifact"] = getattr(_registry.get(), "load_info", None)
+    startup = getattr(app.state, "startup", None)
+    if startup is not None:
+        out["startup"] = startup
+    if _cache is not None:
+        out["cache"] = _cache.stats()
+    if _batcher is not None:
+        out["batching"] = _batcher.stats()
+    out["executor"] = executor.info()
+    out["admission"] = ADMISSION.stats()
+    return out
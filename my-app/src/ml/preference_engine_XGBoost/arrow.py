@@ -0,0 +1,140 @@
+# Arrow IPC batch scoring: a stream of activity record batches in, a stream of fit_score / regret_probability out.
+# Requires pyarrow (optional; only /batch_score_arrow uses it).
+
+import json
+from typing import Any, Iterator
+
+import numpy as np
+
+from .schemas import ACTIVITY_COLUMNS, TravelPreferencesInput, check_activity_column
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+# Schema metadata keys carrying the request-level parameters (JSON-encoded)
+TRAVEL_KEY = b"travel"
+INTERESTS_KEY = b"interests"
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError("pyarrow required for Arrow IPC scoring. pip install pyarrow")
+    return pa
+
+
+class ArrowRequest:
+    """A parsed IPC stream: request parameters from the schema metadata, record batches still in the request bytes."""
+
+    def __init__(self, body: bytes):
+        pa = _pyarrow()
+        try:
+            # py_buffer wraps the bytes without copying; batches reference slices of it
+            table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"Body is not an Arrow IPC stream: {e}")
+        meta = table.schema.metadata or {}
+        if "category" not in table.schema.names:
+            raise ValueError("Arrow stream needs a 'category' column")
+        unknown = set(table.schema.names) - {"category", "id", *ACTIVITY_COLUMNS}
+        if unknown:
+            raise ValueError(f"Unknown activity columns: {sorted(unknown)}")
+        _check_types(table.schema)
+        self.travel = TravelPreferencesInput.model_validate_json(meta.get(TRAVEL_KEY, b"{}"))
+        interests = json.loads(meta.get(INTERESTS_KEY, b"[]"))
+        if not isinstance(interests, list) or not all(isinstance(i, str) for i in interests):
+            raise ValueError("schema metadata 'interests' must be a JSON list of strings")
+        self.interests = interests
+        self.batches = table.to_batches()
+        self.num_rows = table.num_rows
+
+    def arrays(self) -> Iterator[dict]:
+        """Keyword arguments for features.feature_matrix_from_arrays, one dict per record batch."""
+        for batch in self.batches:
+            yield batch_arrays(batch)
+
+
+def _check_types(schema: Any) -> None:
+    """Raise ValueError for a column the scorer cannot read: category must hold strings (plain or dictionary-encoded),
+    activity columns numbers; all-null columns are fine."""
+    pa = _pyarrow()
+    for field in schema:
+        t = field.type
+        if field.name == "category":
+            values = t.value_type if pa.types.is_dictionary(t) else t
+            ok = pa.types.is_string(values) or pa.types.is_large_string(values) or pa.types.is_null(values)
+            expected = "strings"
+        elif field.name in ACTIVITY_COLUMNS:
+            ok = pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_null(t)
+            expected = "numbers"
+        else:
+            continue
+        if not ok:
+            raise ValueError(f"Column '{field.name}' is {t}, expected {expected}")
+
+
+def _float_column(batch: Any, name: str) -> np.ndarray:
+    """float64 view of a column: zero-copy for a float64 column without nulls; nulls become the column default."""
+    pa = _pyarrow()
+    default = ACTIVITY_COLUMNS[name][0]
+    if name not in batch.schema.names:
+        return np.full(batch.num_rows, default, dtype=np.float64)
+    col = batch.column(name)
+    if col.type != pa.float64():
+        col = col.cast(pa.float64())
+    if col.null_count:
+        col = col.fill_null(default)
+    arr = col.to_numpy(zero_copy_only=True)
+    check_activity_column(name, arr)
+    return arr
+
+
+def _categories(batch: Any) -> list:
+    col = batch.column("category")
+    pa = _pyarrow()
+    if pa.types.is_dictionary(col.type):
+        # Normalize each distinct category once, then gather by index
+        values = np.array(col.dictionary.to_pylist() + [None], dtype=object)
+        indices = col.indices.fill_null(len(col.dictionary)).to_numpy(zero_copy_only=False)
+        return values[indices].tolist()
+    return col.to_pylist()
+
+
+def batch_arrays(batch: Any) -> dict:
+    out = {"categories": _categories(batch)}
+    out.update((name, _float_column(batch, name)) for name in ACTIVITY_COLUMNS)
+    return out
+
+
+def write_scores(regret_batches: list[np.ndarray]) -> bytes:
+    """IPC stream with one record batch (fit_score, regret_probability; float64, 4 decimals) per input batch."""
+    pa = _pyarrow()
+    schema = pa.schema([("fit_score", pa.float64()), ("regret_probability", pa.float64())])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for regret in regret_batches:
+            # Same rounding as the JSON endpoints, so both return identical numbers
+            writer.write_batch(
+                pa.record_batch([pa.array(np.round(1.0 - regret, 4)), pa.array(np.round(regret, 4))], schema=schema)
+            )
+    return sink.getvalue().to_pybytes()
+
+
+def read_scores(body: bytes) -> dict[str, np.ndarray]:
+    """Client-side helper: the response stream as NumPy columns."""
+    pa = _pyarrow()
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    return {name: table.column(name).to_numpy() for name in table.schema.names}
+
+
+def write_activities(travel: dict, interests: list[str], columns: dict, batch_size: int = 65536) -> bytes:
+    """Client-side helper: activity columns (category + ACTIVITY_COLUMNS) as an IPC stream for /batch_score_arrow."""
+    pa = _pyarrow()
+    table = pa.table(columns).replace_schema_metadata(
+        {TRAVEL_KEY: json.dumps(travel), INTERESTS_KEY: json.dumps(interests)}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_size):
+            writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,130 @@
+# Micro-batching: coalesce concurrent /score calls into one vectorized model call.
+
+import asyncio
+import contextvars
+import threading
+import time
+from typing import Any, Callable, Optional, Sequence
+
+from ..serving.admission import INTERACTIVE
+from ..serving.executor import get_executor
+from ..serving.metrics import METRICS, SIZE_BUCKETS, add_stage
+from .config.defaults import SCORE_BATCH_MAX_SIZE, SCORE_BATCH_MAX_WAIT_MS
+
+
+class _Batch:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.items: list[Any] = []
+        self.futures: list[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.opened = time.perf_counter()
+        self.started = self.finished = 0.0
+
+
+class MicroBatcher:
+    """Collect items submitted within max_wait_ms (or until max_batch_size) and score them together.
+
+    The first submit opens a batch and arms a timer; the batch is flushed when the timer fires or it is full.
+    score_batch(items) -> results (same order) runs on the inference pool (ml.serving.executor), through the
+    admission controller's interactive lane when one is given, so the event loop keeps accepting requests; each
+    caller awaits only its own result. Exceptions from score_batch (or a 503 from admission) go to every caller in
+    the batch.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[list[Any]], Sequence[Any]],
+        max_batch_size: int = SCORE_BATCH_MAX_SIZE,
+        max_wait_ms: float = SCORE_BATCH_MAX_WAIT_MS,
+        engine: Optional[str] = None,
+        admission: Optional[Any] = None,
+    ):
+        self.score_batch = score_batch
+        self.admission = admission  # AdmissionController: batches then run in its interactive lane
+        self.engine = engine  # labels the micro-batch size histogram on /metrics
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self._pending: Optional[_Batch] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_seen = 0
+        self.errors = 0
+        self._wait_ms_total = 0.0
+        self._score_ms_total = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending
+        if batch is None or batch.loop is not loop:
+            batch = self._pending = _Batch(loop)
+            batch.timer = loop.call_later(self.max_wait_ms / 1000.0, self._flush, batch)
+        batch.items.append(item)
+        batch.futures.append(future)
+        if len(batch.items) >= self.max_batch_size:
+            batch.timer.cancel()
+            self._flush(batch)
+        try:
+            return await future
+        finally:
+            if batch.finished:
+                # Charge this request with its share of the batch: time spent waiting + the shared model call
+                add_stage("batch_wait", batch.started - batch.opened)
+                add_stage("batch_score", batch.finished - batch.started)
+
+    def _flush(self, batch: _Batch) -> None:
+        if self._pending is batch:
+            self._pending = None
+        # Fresh context: the batch belongs to no single request, so per-request stage timers must not see it
+        task = batch.loop.create_task(self._run(batch), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        started = batch.started = time.perf_counter()
+        try:
+            if self.admission is not None:
+                results = await self.admission.run(INTERACTIVE, self.score_batch, batch.items)
+            else:
+                results = await batch.loop.run_in_executor(get_executor(), self.score_batch, batch.items)
+        except Exception as e:
+            self._record(batch, started, error=True)
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self._record(batch, started)
+        for future, result in zip(batch.futures, results):
+            if not future.done():  # caller may have gone away (client disconnect)
+                future.set_result(result)
+
+    def _record(self, batch: _Batch, started: float, error: bool = False) -> None:
+        now = batch.finished = time.perf_counter()
+        if self.engine is not None:
+            labels = (("engine", self.engine), ("endpoint", "micro_batch"))
+            METRICS.observe("ml_batch_size", len(batch.items), labels, buckets=SIZE_BUCKETS)
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch.items)
+            self.max_seen = max(self.max_seen, len(batch.items))
+            self.errors += int(error)
+            self._wait_ms_total += (started - batch.opened) * 1000.0
+            self._score_ms_total += (now - started) * 1000.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = self.batches
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": batches,
+                "items": self.items,
+                "errors": self.errors,
+                "max_batch_seen": self.max_seen,
+                "mean_batch_size": round(self.items / batches, 2) if batches else 0.0,
+                "mean_wait_ms": round(self._wait_ms_total / batches, 3) if batches else 0.0,
+                "mean_score_ms": round(self._score_ms_total / batches, 3) if batches else 0.0,
+            }
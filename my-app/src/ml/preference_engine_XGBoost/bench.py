@@ -0,0 +1,227 @@
+# Latency benchmark for the inference backends, load time / memory per artifact format, JSON vs Arrow transport,
+# and /batch_score with and without explanations.
+# Usage: from src/ run: python -m ml.preference_engine_XGBoost.bench [--load | --arrow | --explain]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+if __name__ == "__main__":
+    src = Path(__file__).resolve().parents[2]
+    if str(src) not in sys.path:
+        sys.path.insert(0, str(src))
+
+from ml.preference_engine_XGBoost.features import FEATURE_NAMES
+from ml.preference_engine_XGBoost.inference import BACKENDS
+from ml.preference_engine_XGBoost.model import load_model, predict_batch
+from ml.preference_engine_XGBoost.schemas import ActivityInput, TravelPreferencesInput
+
+BATCH_SIZES = (1, 10, 100, 1000)
+REPEATS = 200
+LOAD_RUNS = 5
+ARROW_SIZES = (10_000, 100_000)
+ARROW_REPEATS = 3
+EXPLAIN_SIZES = (10, 100, 1000, 10_000)
+
+# Runs in a fresh interpreter per measurement so imports and RSS are not shared between formats
+_LOAD_SCRIPT = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+from ml.preference_engine_XGBoost.model import load_model, predict_batch
+from ml.preference_engine_XGBoost.schemas import ActivityInput, TravelPreferencesInput
+import xgboost
+t1 = time.perf_counter()
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+model = load_model(backend="booster")
+print(json.dumps({
+    "format": model.load_info["format"],
+    "import_ms": (t1 - t0) * 1000.0,
+    "load_ms": model.load_info["load_ms"],
+    "load_rss_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024.0,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    "sklearn_imported": "sklearn" in sys.modules,
+}))
+"""
+
+
+def _median_ms(fn, repeats: int) -> float:
+    fn()  # warm-up
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000.0
+
+
+def bench_backends(batch_sizes=BATCH_SIZES, repeats: int = REPEATS) -> dict[str, dict[int, float]]:
+    """Median predict_proba latency (ms) per backend and batch size."""
+    rng = np.random.default_rng(0)
+    X = rng.random((max(batch_sizes), len(FEATURE_NAMES)), dtype=np.float32)
+    results: dict[str, dict[int, float]] = {}
+    for backend in BACKENDS:
+        model = load_model(backend=backend)
+        results[backend] = {
+            n: _median_ms(lambda: model.predict_proba(X[:n]), max(10, repeats // max(1, n // 100)))
+            for n in batch_sizes
+        }
+    return results
+
+
+def bench_load(fmt: str, runs: int = LOAD_RUNS) -> dict:
+    """Median import time (engine + xgboost), artifact load time and RSS of a fresh process per format."""
+    src = Path(__file__).resolve().parents[2]
+    env = {**os.environ, "PREFERENCE_ENGINE_XGBOOST_MODEL_FORMAT": fmt}
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _LOAD_SCRIPT], cwd=src, env=env, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "format": samples[0]["format"],
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "load_ms": statistics.median(s["load_ms"] for s in samples),
+        "load_rss_mb": statistics.median(s["load_rss_mb"] for s in samples),
+        "peak_rss_mb": statistics.median(s["peak_rss_mb"] for s in samples),
+        "sklearn_imported": samples[0]["sklearn_imported"],
+    }
+
+
+def main_load() -> None:
+    print(f"model load, median of {LOAD_RUNS} fresh processes")
+    print(f"{'format':>8}{'import ms':>12}{'load ms':>10}{'load RSS MB':>14}{'peak RSS MB':>14}{'sklearn':>10}")
+    for fmt in ("joblib", "native"):
+        r = bench_load(fmt)
+        print(
+            f"{r['format']:>8}{r['import_ms']:>12.1f}{r['load_ms']:>10.1f}"
+            f"{r['load_rss_mb']:>14.1f}{r['peak_rss_mb']:>14.1f}{str(r['sklearn_imported']):>10}"
+        )
+
+
+def _activity_columns(n: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    categories = np.array(["museum", "culture", "outdoor", "nature", "food", "nightlife", "wellness", "beach", "ski"])
+    return {
+        "category": categories[rng.integers(0, len(categories), n)].tolist(),
+        "duration_hours": np.round(rng.uniform(0.5, 8.0, n), 2),
+        "emission_kg": np.round(rng.uniform(0.0, 20.0, n), 2),
+        "price_usd": np.round(rng.uniform(0.0, 200.0, n), 2),
+        "typical_start_hour": np.round(rng.uniform(6.0, 23.0, n), 1),
+        "typical_crowd_level": np.round(rng.uniform(0.0, 1.0, n), 2),
+    }
+
+
+def bench_transports(sizes=ARROW_SIZES, repeats: int = ARROW_REPEATS) -> dict[str, dict[int, float]]:
+    """Median client-observed ms (encode request, score, decode response) per endpoint and activity count.
+
+    In-process (httpx ASGI transport), result cache off. /batch_score also builds explanations, as it does in
+    production; /batch_score_columnar is JSON without them.
+    """
+    os.environ["PREFERENCE_ENGINE_XGBOOST_CACHE_MAX_ENTRIES"] = "0"
+    from fastapi.testclient import TestClient
+
+    from ml.preference_engine_XGBoost.api import app
+    from ml.preference_engine_XGBoost.arrow import ARROW_STREAM, read_scores, write_activities
+
+    travel, interests = {"trip_pace": 0.4, "eco_preference": 0.8}, ["museum", "food"]
+    client = TestClient(app)
+    results: dict[str, dict[int, float]] = {"json": {}, "json_columnar": {}, "arrow": {}}
+    for n in sizes:
+        cols = _activity_columns(n)
+        rows = [dict(zip(cols, values)) for values in zip(*(np.asarray(v).tolist() for v in cols.values()))]
+        json_cols = {k: np.asarray(v).tolist() for k, v in cols.items()}
+
+        def via_json():
+            r = client.post("/batch_score", json={"travel": travel, "interests": interests, "activities": rows})
+            return [s["fit_score"] for s in r.json()["scores"]]
+
+        def via_columnar():
+            r = client.post(
+                "/batch_score_columnar", json={"travel": travel, "interests": interests, "activities": json_cols}
+            )
+            return [s["fit_score"] for s in r.json()["scores"]]
+
+        def via_arrow():
+            body = write_activities(travel, interests, cols)
+            r = client.post("/batch_score_arrow", content=body, headers={"Content-Type": ARROW_STREAM})
+            return read_scores(r.content)["fit_score"]
+
+        for name, fn in (("json", via_json), ("json_columnar", via_columnar), ("arrow", via_arrow)):
+            results[name][n] = _median_ms(fn, repeats)
+    return results
+
+
+def main_arrow() -> None:
+    results = bench_transports()
+    print(f"batch scoring, client encode -> response decoded, median of {ARROW_REPEATS} (ms)")
+    print(f"{'activities':>12}" + "".join(f"{name:>16}" for name in results))
+    for n in ARROW_SIZES:
+        print(f"{n:>12}" + "".join(f"{results[name][n]:>16.1f}" for name in results))
+
+
+def bench_explain(sizes=EXPLAIN_SIZES, repeats: int = REPEATS) -> dict[str, dict[int, tuple[float, float, float]]]:
+    """Median ms per backend and batch size: (predict_proba alone, /batch_score with "explain": false, /batch_score).
+
+    The /batch_score path is predict_batch (features + scores + response objects); it explains unless told not to.
+    """
+    cols = _activity_columns(max(sizes))
+    activities = [
+        ActivityInput(**dict(zip(cols, values))) for values in zip(*(np.asarray(v).tolist() for v in cols.values()))
+    ]
+    travel, interests = TravelPreferencesInput(eco_preference=0.8), ["museum", "food"]
+    rng = np.random.default_rng(0)
+    X = rng.random((max(sizes), len(FEATURE_NAMES)), dtype=np.float32)
+    results: dict[str, dict[int, tuple[float, float, float]]] = {}
+    for backend in BACKENDS:
+        model = load_model(backend=backend)
+        results[backend] = {}
+        for n in sizes:
+            r = max(3, repeats // max(1, n // 50))
+            results[backend][n] = (
+                _median_ms(lambda: model.predict_proba(X[:n]), r),
+                _median_ms(lambda: predict_batch(travel, interests, activities[:n], model=model, explain=False), r),
+                _median_ms(lambda: predict_batch(travel, interests, activities[:n], model=model, explain=True), r),
+            )
+    return results
+
+
+def main_explain() -> None:
+    results = bench_explain()
+    print("median latency (ms): predict_proba / /batch_score explain=false / /batch_score")
+    print(f"{'batch':>8}" + "".join(f"{b:>26}" for b in results))
+    for n in EXPLAIN_SIZES:
+        print(f"{n:>8}" + "".join("{:>8.2f}{:>9.2f}{:>9.2f}".format(*results[b][n]) for b in results))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inference backend latency / artifact load / transport benchmark")
+    parser.add_argument("--load", action="store_true", help="compare load time and RSS of joblib vs native")
+    parser.add_argument("--arrow", action="store_true", help="compare JSON and Arrow IPC batch scoring")
+    parser.add_argument("--explain", action="store_true", help="cost of explanations on the /batch_score path")
+    args = parser.parse_args()
+    if args.load:
+        main_load()
+        return
+    if args.arrow:
+        main_arrow()
+        return
+    if args.explain:
+        main_explain()
+        return
+    results = bench_backends()
+    print("predict_proba median latency (ms)")
+    print(f"{'batch':>8}" + "".join(f"{b:>12}" for b in results))
+    for n in BATCH_SIZES:
+        print(f"{n:>8}" + "".join(f"{results[b][n]:>12.3f}" for b in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# Bounded LRU + TTL cache of per-activity scores for /score and /batch_score.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Sequence
+
+from .config.defaults import CACHE_MAX_ENTRIES, CACHE_TRAVEL_DECIMALS, CACHE_TTL_SECONDS
+from .schemas import ActivityInput, ScoreResponse, TravelPreferencesInput
+
+
+def request_key(travel: TravelPreferencesInput, interests: list[str]) -> str:
+    """Canonical form of the per-request part of the key: quantized sliders + normalized interest set."""
+    sliders = tuple(round(float(v), CACHE_TRAVEL_DECIMALS) for v in travel.model_dump().values())
+    liked = tuple(sorted({s.strip().lower() for s in interests if s}))
+    return repr((sliders, liked))
+
+
+def activity_key(activity: ActivityInput) -> tuple:
+    """Only the fields that feed build_features (id, name, activity_density do not change the score)."""
+    return (
+        (activity.category or "outdoor").strip().lower(),
+        activity.duration_hours or 1.0,
+        activity.emission_kg or 0.0,
+        activity.price_usd or 0.0,
+        activity.typical_start_hour,
+        activity.typical_crowd_level,
+    )
+
+
+def score_keys(
+    travel: TravelPreferencesInput,
+    interests: list[str],
+    activities: Sequence[ActivityInput],
+    explain: bool = True,
+) -> list[bytes]:
+    # Scores without explanations are cached apart from explained ones
+    prefix = request_key(travel, interests) + ("|explain" if explain else "")
+    return [
+        hashlib.blake2b(f"{prefix}|{activity_key(a)!r}".encode(), digest_size=16).digest()
+        for a in activities
+    ]
+
+
+class ScoreCache:
+    """Thread-safe LRU with per-entry TTL; counts hits and misses per activity."""
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped by clear(); put_many with an older generation is dropped (results from a replaced model)
+        self.generation = 0
+
+    def get_many(self, keys: Sequence[bytes]) -> list[Optional[Any]]:
+        now = self._clock()
+        out: list[Optional[Any]] = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] <= now:
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    out.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    out.append(entry[1])
+        return out
+
+    def put_many(self, keys: Sequence[bytes], values: Sequence[Any], generation: Optional[int] = None) -> None:
+        expires = self._clock() + self.ttl_seconds
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            for key, value in zip(keys, values):
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def cached_predict_batch(
+    cache: ScoreCache,
+    travel: TravelPreferencesInput,
+    interests: list[str],
+    activities: list[ActivityInput],
+    score: Callable[[TravelPreferencesInput, list[str], list[ActivityInput]], list[ScoreResponse]],
+    explain: bool = True,
+) -> list[ScoreResponse]:
+    """Serve hits from the cache, score only the misses in one call, and merge back in input order.
+
+    explain says whether score returns explanations; it keys the cache, so both kinds never mix.
+    """
+    keys = score_keys(travel, interests, activities, explain)
+    generation = cache.generation
+    results = cache.get_many(keys)
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        fresh = score(travel, interests, [activities[i] for i in missing])
+        cache.put_many([keys[i] for i in missing], fresh, generation=generation)
+        for i, r in zip(missing, fresh):
+            results[i] = r
+    return results
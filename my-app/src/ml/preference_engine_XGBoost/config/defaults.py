@@ -7,6 +7,26 @@ _ENGINE_DIR = Path(__file__).resolve().parent.parent
 _DEFAULT = _ENGINE_DIR / "artifacts" / "model.joblib"
 # Modal sets PREFERENCE_ENGINE_XGBOOST_MODEL_PATH so the container finds the model
 DEFAULT_MODEL_PATH = Path(os.environ.get("PREFERENCE_ENGINE_XGBOOST_MODEL_PATH", str(_DEFAULT)))
+# Artifact to load: "auto" (native UBJSON + sidecar when present, else joblib), "native" or "joblib"
+MODEL_FORMAT = os.environ.get("PREFERENCE_ENGINE_XGBOOST_MODEL_FORMAT", "auto")
+# Inference backend: "booster" (Booster.inplace_predict, calibration in NumPy), "numpy" (flattened trees),
+# "auto" (numpy for small batches, booster for large) or "sklearn" (predict_proba)
+DEFAULT_BACKEND = os.environ.get("PREFERENCE_ENGINE_XGBOOST_BACKEND", "auto")
+# XGBoost threads per predict call; 0 = CPU count / inference pool size (ML_INFERENCE_WORKERS), so concurrent
+# requests on the pool do not over-subscribe the cores
+NTHREAD = int(os.environ.get("PREFERENCE_ENGINE_XGBOOST_NTHREAD", "0"))
+# Per-activity result cache for /score and /batch_score (0 entries disables it)
+CACHE_MAX_ENTRIES = int(os.environ.get("PREFERENCE_ENGINE_XGBOOST_CACHE_MAX_ENTRIES", "50000"))
+CACHE_TTL_SECONDS = float(os.environ.get("PREFERENCE_ENGINE_XGBOOST_CACHE_TTL_SECONDS", "600"))
+# Travel sliders are rounded to this many decimals before keying the cache
+CACHE_TRAVEL_DECIMALS = 3
+# Upper bound on the float32 feature block built per chunk by /matrix_score (users x activities x 19)
+MATRIX_CHUNK_BYTES = int(os.environ.get("PREFERENCE_ENGINE_XGBOOST_MATRIX_CHUNK_BYTES", str(32 * 1024 * 1024)))
+# Activities scored per model call (and per flushed batch of NDJSON lines) by /batch_score_stream
+STREAM_CHUNK_SIZE = int(os.environ.get("PREFERENCE_ENGINE_XGBOOST_STREAM_CHUNK_SIZE", "512"))
+# Micro-batching of concurrent /score calls: flush after this many requests or this many ms (size 1 disables)
+SCORE_BATCH_MAX_SIZE = int(os.environ.get("PREFERENCE_ENGINE_XGBOOST_SCORE_BATCH_MAX_SIZE", "64"))
+SCORE_BATCH_MAX_WAIT_MS = float(os.environ.get("PREFERENCE_ENGINE_XGBOOST_SCORE_BATCH_MAX_WAIT_MS", "2"))
 DEFAULT_TRAIN_SAMPLES = 100_000
 DEFAULT_RANDOM_STATE = 42
 DEFAULT_CLASSIFIER = "xgboost"
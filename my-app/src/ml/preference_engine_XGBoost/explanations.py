@@ -1,39 +1,32 @@
-# Explain scores using XGBoost feature importances (top features for this prediction).
+# Explain scores from per-row feature contributions (top features for each prediction).
 
-from typing import Any
+import numpy as np
 
 MAX_REASONS = 3
 
 
-def get_explanation(
-    model: Any,
-    features: dict[str, float],
+def get_explanations(
+    contribs: np.ndarray,
     feature_columns: list[str],
     top_k: int = MAX_REASONS,
-) -> list[str]:
-    """Return a short list of human-readable explanation strings from top feature contributions."""
-    base = model
-    if hasattr(model, "calibrated_classifiers_"):
-        base = model.calibrated_classifiers_[0].estimator
-    if not hasattr(base, "feature_importances_"):
-        return []
-    importances = base.feature_importances_
-    try:
-        idx = {c: i for i, c in enumerate(feature_columns)}
-    except Exception:
-        return []
-    # Weight importance by feature value so we highlight what mattered for this instance
-    contributions: list[tuple[str, float]] = []
-    for name, i in idx.items():
-        if i >= len(importances):
-            continue
-        val = features.get(name, 0.0)
-        imp = float(importances[i])
-        contrib = imp * (1.0 + abs(val))
-        contributions.append((name, contrib))
-    contributions.sort(key=lambda x: -x[1])
-    top = contributions[:top_k]
-    return [_format(name) for name, _ in top if name]
+) -> list[list[str]]:
+    """Top-k features per row by |contribution| (N x (F + 1) contributions, last column = bias)."""
+    n_rows = contribs.shape[0]
+    n_cols = min(len(feature_columns), contribs.shape[1])
+    if n_rows == 0 or n_cols == 0 or top_k <= 0:
+        return [[] for _ in range(n_rows)]
+    magnitude = np.abs(contribs[:, :n_cols])
+    k = min(top_k, n_cols)
+    top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+    top_mag = np.take_along_axis(magnitude, top, axis=1)
+    order = np.argsort(-top_mag, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    top_mag = np.take_along_axis(top_mag, order, axis=1)
+    names = [_format(c) for c in feature_columns[:n_cols]]
+    return [
+        [names[j] for j, m in zip(row, mags) if m > 0.0]
+        for row, mags in zip(top.tolist(), top_mag.tolist())
+    ]
 
 
 def _format(name: str) -> str:
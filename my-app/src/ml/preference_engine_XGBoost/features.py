@@ -1,6 +1,8 @@
 # Feature extraction: travel + interests + activity -> fixed vector
 
-from typing import Optional
+from typing import Optional, Sequence
+
+import numpy as np
 
 from .schemas import ActivityInput, TravelPreferencesInput
 
@@ -71,6 +73,9 @@ FEATURE_NAMES = [
     "pace_duration_mismatch",
 ]
 
+# Slider values copied straight into the feature vector
+TRAVEL_FEATURES = FEATURE_NAMES[1:10]
+
 
 def category_similarity(interest: str, category: str) -> float:
     """Continuous similarity in [0, 1] from predefined matrix; 0 if either not in ATTRACTION_TYPES."""
@@ -80,13 +85,65 @@ def category_similarity(interest: str, category: str) -> float:
     return _CAT_SIM.get(_sim_key(a, b), 0.0)
 
 
+_TYPE_INDEX = {c: i for i, c in enumerate(ATTRACTION_TYPES)}
+
+
+def _build_interest_match_table() -> np.ndarray:
+    """Row = bitmask over ATTRACTION_TYPES (user interests), column = activity category: max similarity."""
+    n = len(ATTRACTION_TYPES)
+    sim = np.array([[category_similarity(a, b) for b in ATTRACTION_TYPES] for a in ATTRACTION_TYPES])
+    table = np.zeros((1 << n, n), dtype=np.float64)
+    for mask in range(1, 1 << n):
+        low = mask & -mask
+        table[mask] = np.maximum(table[mask ^ low], sim[low.bit_length() - 1])
+    return np.vectorize(lambda v: round(float(v), 6))(table)
+
+
+# 512 x 9 for the current ATTRACTION_TYPES; row 0 = only unknown interests (no similarity to any known type)
+INTEREST_MATCH_TABLE = _build_interest_match_table()
+
+
+def interest_mask(interests: list[str]) -> int:
+    """Encode interests as a bitmask over ATTRACTION_TYPES; unknown interests set no bit."""
+    mask = 0
+    for s in interests:
+        i = _TYPE_INDEX.get((s or "").strip().lower())
+        if i is not None:
+            mask |= 1 << i
+    return mask
+
+
 def interest_match(interests: list[str], category: str) -> float:
     """Continuous match in [0, 1]: max similarity between activity category and any user interest."""
     cat = (category or "").strip().lower()
     if not interests:
         return NEUTRAL_NO_INTERESTS
-    normalized = [s.strip().lower() for s in interests if s]
-    return max(category_similarity(i, cat) for i in normalized)
+    j = _TYPE_INDEX.get(cat)
+    if j is None:
+        # Unknown category: only an identical interest string matches
+        normalized = [s.strip().lower() for s in interests if s]
+        return max(category_similarity(i, cat) for i in normalized)
+    return float(INTEREST_MATCH_TABLE[interest_mask(interests), j])
+
+
+def interest_match_grid(interests_list: Sequence[list[str]], categories: Sequence[str]) -> np.ndarray:
+    """U x A interest_match for every (user interests, normalized category) pair in one table gather."""
+    idx = np.fromiter((_TYPE_INDEX.get(c, -1) for c in categories), dtype=np.intp, count=len(categories))
+    masks = np.array([interest_mask(i) for i in interests_list], dtype=np.intp)
+    out = INTEREST_MATCH_TABLE[masks[:, None], idx[None, :]]
+    unknown = np.flatnonzero(idx < 0)
+    for u, interests in enumerate(interests_list):
+        if not interests:
+            out[u] = NEUTRAL_NO_INTERESTS
+        elif unknown.size:
+            normalized = {s.strip().lower() for s in interests if s}
+            out[u, unknown] = [1.0 if categories[i] in normalized else 0.0 for i in unknown]
+    return out
+
+
+def interest_match_column(interests: list[str], categories: Sequence[str]) -> np.ndarray:
+    """interest_match for normalized categories in one gather from INTEREST_MATCH_TABLE."""
+    return interest_match_grid([interests], categories)[0]
 
 
 def build_features(
@@ -138,3 +195,128 @@ def build_features(
 
 def features_to_vector(feats: dict[str, float]) -> list[float]:
     return [feats.get(name, 0.0) for name in FEATURE_NAMES]
+
+
+def _round6(values: np.ndarray) -> np.ndarray:
+    """Vectorized round(x, 6) that agrees with Python's round() (ties at exact halves included)."""
+    scaled = values * 1e6
+    out = np.rint(scaled) / 1e6
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        out[near_half] = [round(float(v), 6) for v in values[near_half]]
+    return out
+
+
+def activity_arrays(activities: Sequence[ActivityInput]) -> dict:
+    """Per-activity fields as columns; missing start/crowd become NaN (defaulted in feature_matrix_from_arrays)."""
+    nan = float("nan")
+    return {
+        "categories": [a.category for a in activities],
+        "duration_hours": np.array([a.duration_hours or 1.0 for a in activities], dtype=np.float64),
+        "emission_kg": np.array([a.emission_kg or 0.0 for a in activities], dtype=np.float64),
+        "price_usd": np.array([a.price_usd or 0.0 for a in activities], dtype=np.float64),
+        "typical_start_hour": np.array(
+            [nan if a.typical_start_hour is None else a.typical_start_hour for a in activities],
+            dtype=np.float64,
+        ),
+        "typical_crowd_level": np.array(
+            [nan if a.typical_crowd_level is None else a.typical_crowd_level for a in activities],
+            dtype=np.float64,
+        ),
+    }
+
+
+def prepare_activities(
+    categories: Sequence[Optional[str]],
+    duration_hours: np.ndarray,
+    emission_kg: np.ndarray,
+    price_usd: np.ndarray,
+    typical_start_hour: np.ndarray,
+    typical_crowd_level: np.ndarray,
+) -> dict:
+    """Activity-only terms of build_features (normalized category, defaults filled, norms), computed once."""
+    duration = np.where(duration_hours == 0.0, 1.0, duration_hours)
+    return {
+        "categories": [(c or "outdoor").strip().lower() for c in categories],
+        "crowd": np.where(np.isnan(typical_crowd_level), 0.5, typical_crowd_level),
+        "start": np.where(np.isnan(typical_start_hour), 12.0, typical_start_hour),
+        "duration_norm": np.minimum(1.0, duration / 8.0),
+        "emission_norm": np.minimum(1.0, emission_kg / 50.0),
+        "price_norm": np.minimum(1.0, price_usd / 200.0),
+    }
+
+
+def travel_matrix(travels: Sequence[TravelPreferencesInput]) -> np.ndarray:
+    """U x 9 slider values in FEATURE_NAMES[1:10] order."""
+    return np.array([[getattr(t, f) for f in TRAVEL_FEATURES] for t in travels], dtype=np.float64).reshape(-1, len(TRAVEL_FEATURES))
+
+
+def _assemble(travel: np.ndarray, im: np.ndarray, acts: dict) -> np.ndarray:
+    """Broadcast travel (..., 9) against prepared activity columns; returns (..., 19) float32 in FEATURE_NAMES order."""
+    trip_pace, crowd_comfort, morning_tolerance, late_night_tolerance = (travel[..., i] for i in range(4))
+    budget_level, eco = travel[..., 5], travel[..., 8]
+    start = acts["start"]
+
+    crowd_mismatch = acts["crowd"] * (1.0 - crowd_comfort)
+    early_start_mismatch = np.minimum(1.0, (1.0 - morning_tolerance) * np.maximum(0.0, 9.0 - start) / 9.0)
+    late_night_mismatch = np.minimum(1.0, (1.0 - late_night_tolerance) * np.maximum(0.0, start - 21.0) / 3.0)
+    budget_mismatch = np.maximum(0.0, acts["price_norm"] - budget_level)
+    pace_duration_mismatch = np.minimum(1.0, np.maximum(0.0, acts["duration_norm"] - trip_pace))
+    emission_fit = 1.0 - np.minimum(1.0, eco * acts["emission_norm"] * 1.15)
+
+    X = np.empty(im.shape + (len(FEATURE_NAMES),), dtype=np.float32)
+    X[..., 0] = im
+    X[..., 1:10] = travel
+    for j, col in enumerate(
+        (
+            acts["duration_norm"],
+            acts["emission_norm"],
+            acts["price_norm"],
+            emission_fit,
+            crowd_mismatch,
+            early_start_mismatch,
+            late_night_mismatch,
+            budget_mismatch,
+            pace_duration_mismatch,
+        ),
+        start=10,
+    ):
+        X[..., j] = _round6(np.asarray(col, dtype=np.float64))
+    return X
+
+
+def feature_matrix_from_arrays(
+    travel: TravelPreferencesInput,
+    interests: list[str],
+    categories: Sequence[Optional[str]],
+    duration_hours: np.ndarray,
+    emission_kg: np.ndarray,
+    price_usd: np.ndarray,
+    typical_start_hour: np.ndarray,
+    typical_crowd_level: np.ndarray,
+) -> np.ndarray:
+    """N x len(FEATURE_NAMES) float32 matrix; row i equals features_to_vector(build_features(...)) for activity i."""
+    acts = prepare_activities(
+        categories, duration_hours, emission_kg, price_usd, typical_start_hour, typical_crowd_level
+    )
+    im = interest_match_column(interests, acts["categories"])
+    return _assemble(travel_matrix([travel])[0], im, acts)
+
+
+def feature_tensor(
+    travels: Sequence[TravelPreferencesInput],
+    interests_list: Sequence[list[str]],
+    acts: dict,
+) -> np.ndarray:
+    """U x A x 19 float32 features for every (user, activity) pair; acts from prepare_activities."""
+    im = interest_match_grid(interests_list, acts["categories"])
+    return _assemble(travel_matrix(travels)[:, None, :], im, acts)
+
+
+def build_feature_matrix(
+    travel: TravelPreferencesInput,
+    interests: list[str],
+    activities: Sequence[ActivityInput],
+) -> np.ndarray:
+    """Columnar build_features for a whole batch: one N x 19 float32 matrix in FEATURE_NAMES order."""
+    return feature_matrix_from_arrays(travel, interests, **activity_arrays(activities))
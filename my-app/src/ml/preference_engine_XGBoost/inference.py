@@ -0,0 +1,390 @@
+# Inference backends: same predict_proba / feature_importances_ surface as the sklearn model, less overhead.
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+BACKENDS = ("sklearn", "booster", "numpy", "auto")
+# "auto" uses the NumPy evaluator up to this many rows, the Booster above it
+AUTO_NUMPY_MAX_ROWS = 64
+
+
+def _unwrap_estimator(estimator: Any) -> Any:
+    """Strip wrappers such as FrozenEstimator until we reach the XGBClassifier."""
+    while not hasattr(estimator, "get_booster") and hasattr(estimator, "estimator"):
+        estimator = estimator.estimator
+    return estimator
+
+
+def calibration_params(calibrator: Any) -> dict:
+    """JSON-serializable parameters of a fitted sklearn calibrator (sigmoid or isotonic)."""
+    if hasattr(calibrator, "a_") and hasattr(calibrator, "b_"):
+        return {"method": "sigmoid", "a": float(calibrator.a_), "b": float(calibrator.b_)}
+    if hasattr(calibrator, "X_thresholds_") and hasattr(calibrator, "y_thresholds_"):
+        return {
+            "method": "isotonic",
+            "x": np.asarray(calibrator.X_thresholds_, dtype=np.float64).tolist(),
+            "y": np.asarray(calibrator.y_thresholds_, dtype=np.float64).tolist(),
+        }
+    raise ValueError(f"Unsupported calibrator {type(calibrator).__name__}; use the sklearn backend")
+
+
+def calibration_from_params(params: dict) -> Callable[[np.ndarray], np.ndarray]:
+    """Plain NumPy calibration map from calibration_params()."""
+    if params["method"] == "sigmoid":
+        a, b = float(params["a"]), float(params["b"])
+        return lambda p: 1.0 / (1.0 + np.exp(a * p + b))
+    if params["method"] == "isotonic":
+        xs = np.asarray(params["x"], dtype=np.float64)
+        ys = np.asarray(params["y"], dtype=np.float64)
+        # np.interp clamps outside [xs[0], xs[-1]], matching out_of_bounds="clip"
+        return lambda p: np.interp(p, xs, ys)
+    raise ValueError(f"Unsupported calibration method {params['method']!r}")
+
+
+def _calibration_map(calibrator: Any) -> Callable[[np.ndarray], np.ndarray]:
+    """Plain NumPy version of a fitted sklearn calibrator (sigmoid or isotonic)."""
+    return calibration_from_params(calibration_params(calibrator))
+
+
+def _iteration_range(booster: Any) -> tuple[int, int]:
+    best = booster.attributes().get("best_iteration")
+    return (0, int(best) + 1) if best is not None else (0, 0)
+
+
+def _sigmoid(margin: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-margin))
+
+
+def _booster_contribs(booster: Any, X: np.ndarray, iteration_range: tuple[int, int] = (0, 0)) -> np.ndarray:
+    """Per-row path-attribution contributions (N x (F + 1), last column = bias) in margin space."""
+    import xgboost as xgb
+
+    return booster.predict(
+        xgb.DMatrix(X),
+        pred_contribs=True,
+        approx_contribs=True,
+        iteration_range=iteration_range,
+        validate_features=False,
+    )
+
+
+class NativeEstimator:
+    """The part of XGBClassifier the backends use (get_booster, feature_importances_), around a bare Booster."""
+
+    def __init__(self, booster: Any):
+        self._booster = booster
+
+    def get_booster(self) -> Any:
+        return self._booster
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        # Same definition as XGBClassifier: normalized total gain per feature, 0 for unused features
+        score = self._booster.get_score(importance_type="gain")
+        names = self._booster.feature_names or [f"f{i}" for i in range(self._booster.num_features())]
+        values = np.array([score.get(f, 0.0) for f in names], dtype=np.float32)
+        total = values.sum()
+        return values / total if total else values
+
+
+class NativeModel:
+    """Model loaded from XGBoost's own format: one Booster per ensemble member plus NumPy calibration maps."""
+
+    def __init__(self, members: list[tuple[Any, Optional[dict]]]):
+        self.members = [
+            (NativeEstimator(booster), calibration_from_params(cal) if cal is not None else None)
+            for booster, cal in members
+        ]
+
+
+def model_members(model: Any) -> list[tuple[Any, Callable[[np.ndarray], np.ndarray] | None]]:
+    """(XGBClassifier, calibration map or None) per ensemble member; one member for an uncalibrated model."""
+    if isinstance(model, NativeModel):
+        return model.members
+    if hasattr(model, "calibrated_classifiers_"):
+        members = []
+        for cc in model.calibrated_classifiers_:
+            if getattr(cc, "method", "sigmoid") not in ("sigmoid", "isotonic"):
+                raise ValueError(f"Unsupported calibration method {cc.method!r}; use the sklearn backend")
+            members.append((_unwrap_estimator(cc.estimator), _calibration_map(cc.calibrators[0])))
+        return members
+    return [(_unwrap_estimator(model), None)]
+
+
+class _EnsembleBackend(ABC):
+    """Averages calibrated member probabilities like CalibratedClassifierCV (one member when uncalibrated).
+
+    Subclasses compile each member once and implement the per-member predict and contributions hooks.
+    """
+
+    def __init__(self, model: Any):
+        members = model_members(model)
+        self.feature_importances_ = np.asarray(members[0][0].feature_importances_)
+        self._members = [(self._compile(estimator), calibrate) for estimator, calibrate in members]
+
+    @abstractmethod
+    def _compile(self, estimator: Any) -> Any:
+        """Per-member state the other hooks receive as `compiled`."""
+
+    @abstractmethod
+    def _predict_member(self, compiled: Any, X: np.ndarray) -> np.ndarray:
+        """Uncalibrated positive-class probability per row."""
+
+    @abstractmethod
+    def _contribs_member(self, compiled: Any, X: np.ndarray) -> np.ndarray:
+        """N x (F + 1) contributions in margin space, last column = bias."""
+
+    def _predict_and_contribs_member(self, compiled: Any, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """_predict_member and _contribs_member together; backends that can share the tree walk override this."""
+        return self._predict_member(compiled, X), self._contribs_member(compiled, X)
+
+    def predict_with_contribs(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Positive-class probability (identical to predict_positive) and per-feature contributions."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        total_p, total_c = None, None
+        for compiled, calibrate in self._members:
+            # The probability comes from the normal predict: the float32 contributions do not sum back to the
+            # margin exactly, which could move a 4-decimal score depending on whether explanations were asked for
+            p, contribs = self._predict_and_contribs_member(compiled, X)
+            if calibrate is not None:
+                p = calibrate(p)
+            total_p = p if total_p is None else total_p + p
+            total_c = contribs if total_c is None else total_c + contribs
+        if len(self._members) > 1:
+            total_p = total_p / len(self._members)
+            total_c = total_c / len(self._members)
+        return total_p, total_c
+
+    def predict_positive(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        total = None
+        for compiled, calibrate in self._members:
+            p = self._predict_member(compiled, X)
+            if calibrate is not None:
+                p = calibrate(p)
+            total = p if total is None else total + p
+        if len(self._members) > 1:
+            total = total / len(self._members)
+        return total
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        p = self.predict_positive(X)
+        return np.column_stack((1.0 - p, p))
+
+
+class BoosterModel(_EnsembleBackend):
+    """Calls Booster.inplace_predict directly (no sklearn validation / DMatrix) and calibrates in NumPy."""
+
+    def _compile(self, estimator: Any) -> Any:
+        booster = estimator.get_booster()
+        return booster, _iteration_range(booster)
+
+    def _predict_member(self, compiled: Any, X: np.ndarray) -> np.ndarray:
+        booster, iteration_range = compiled
+        return booster.inplace_predict(X, iteration_range=iteration_range, validate_features=False)
+
+    def _contribs_member(self, compiled: Any, X: np.ndarray) -> np.ndarray:
+        booster, iteration_range = compiled
+        return _booster_contribs(booster, X, iteration_range)
+
+
+class FlatTrees:
+    """All trees of one booster as flat node arrays; leaves point to themselves so every row walks max_depth levels."""
+
+    def __init__(self, booster: Any):
+        learner = json.loads(booster.save_raw("json"))["learner"]
+        if learner["objective"]["name"] != "binary:logistic":
+            raise ValueError(f"numpy backend supports binary:logistic only, got {learner['objective']['name']}")
+        model = learner["gradient_booster"]["model"]
+        start, stop = _iteration_range(booster)
+        indptr = model["iteration_indptr"]
+        stop = stop or len(indptr) - 1
+        trees = model["trees"][indptr[start]:indptr[stop]]
+
+        feature, threshold, left, right, default_left, value, mean, roots = [], [], [], [], [], [], [], []
+        depth = 0
+        offset = 0
+        for tree in trees:
+            if any(tree["split_type"]):
+                raise ValueError("numpy backend does not support categorical splits")
+            lc, rc = tree["left_children"], tree["right_children"]
+            n = len(lc)
+            roots.append(offset)
+            for i in range(n):
+                if lc[i] == -1:
+                    feature.append(0)
+                    left.append(offset + i)
+                    right.append(offset + i)
+                    value.append(tree["split_conditions"][i])
+                else:
+                    feature.append(tree["split_indices"][i])
+                    left.append(offset + lc[i])
+                    right.append(offset + rc[i])
+                    value.append(0.0)
+            mean.extend(_node_means(lc, rc, tree["split_conditions"], tree["sum_hessian"]))
+            threshold.extend(tree["split_conditions"])
+            default_left.extend(tree["default_left"])
+            depth = max(depth, _tree_depth(lc, rc))
+            offset += n
+
+        self.feature = np.array(feature, dtype=np.intp)
+        self.threshold = np.array(threshold, dtype=np.float32)
+        # children[2 * i] = left child of node i, children[2 * i + 1] = right child
+        self.children = np.empty(2 * len(left), dtype=np.intp)
+        self.children[0::2] = left
+        self.children[1::2] = right
+        self.default_left = np.array(default_left, dtype=bool)
+        self.value = np.array(value, dtype=np.float32)
+        # Cover-weighted mean leaf value below each node (what XGBoost uses for approx_contribs)
+        self.mean = np.array(mean, dtype=np.float64)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.depth = depth
+        self.n_features = int(learner["learner_model_param"]["num_feature"])
+        base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+        self.base_margin = float(np.log(base_score / (1.0 - base_score)))
+        self.bias = self.base_margin + float(self.mean[self.roots].sum())
+
+    def leaves(self, X: np.ndarray, contribs: Optional[np.ndarray] = None) -> np.ndarray:
+        """Leaf node index per (row, tree), walking all trees for the whole batch one level at a time.
+
+        If contribs (N x F float64) is given, each step adds mean(child) - mean(node) to the split feature.
+        """
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_base = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+        node = np.broadcast_to(self.roots, (n_rows, self.roots.size)).copy()
+        has_nan = bool(np.isnan(X).any())
+        for _ in range(self.depth):
+            x = flat[row_base + self.feature[node]]
+            go_right = ~(x < self.threshold[node])
+            if has_nan:
+                go_right = np.where(np.isnan(x), ~self.default_left[node], go_right)
+            child = self.children[2 * node + go_right]
+            if contribs is not None:
+                slots = row_base + self.feature[node]
+                contribs += np.bincount(
+                    slots.ravel(), weights=(self.mean[child] - self.mean[node]).ravel(), minlength=contribs.size
+                ).reshape(contribs.shape)
+            node = child
+        return node
+
+    def margin(self, X: np.ndarray) -> np.ndarray:
+        return self._margin(self.leaves(X))
+
+    def _margin(self, leaves: np.ndarray) -> np.ndarray:
+        return self.value[leaves].sum(axis=1, dtype=np.float64) + self.base_margin
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """Same layout and values as Booster.predict(pred_contribs=True, approx_contribs=True)."""
+        return self.margin_and_contributions(X)[1]
+
+    def margin_and_contributions(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """margin(X) and contributions(X) from one walk over the trees."""
+        out = np.zeros((X.shape[0], self.n_features + 1), dtype=np.float64)
+        contribs = np.zeros((X.shape[0], X.shape[1]), dtype=np.float64)
+        leaves = self.leaves(X, contribs)
+        out[:, : X.shape[1]] = contribs
+        out[:, -1] = self.bias
+        return self._margin(leaves), out
+
+
+def _node_means(left_children: list[int], right_children: list[int], values: list[float], cover: list[float]) -> list[float]:
+    means = [0.0] * len(left_children)
+
+    def fill(i: int) -> float:
+        if left_children[i] == -1:
+            means[i] = float(values[i])
+        else:
+            lc, rc = left_children[i], right_children[i]
+            means[i] = (fill(lc) * cover[lc] + fill(rc) * cover[rc]) / cover[i]
+        return means[i]
+
+    fill(0)
+    return means
+
+
+def _tree_depth(left_children: list[int], right_children: list[int]) -> int:
+    depth, frontier = 0, [0]
+    while True:
+        frontier = [c for i in frontier if left_children[i] != -1 for c in (left_children[i], right_children[i])]
+        if not frontier:
+            return depth
+        depth += 1
+
+
+class FlatTreeModel(_EnsembleBackend):
+    """Pure NumPy tree-ensemble evaluation; no XGBoost call at predict time (lowest fixed cost for small batches)."""
+
+    def _compile(self, estimator: Any) -> Any:
+        return FlatTrees(estimator.get_booster())
+
+    def _predict_member(self, compiled: Any, X: np.ndarray) -> np.ndarray:
+        return _sigmoid(compiled.margin(X))
+
+    def _contribs_member(self, compiled: Any, X: np.ndarray) -> np.ndarray:
+        return compiled.contributions(X)
+
+    def _predict_and_contribs_member(self, compiled: Any, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        margin, contribs = compiled.margin_and_contributions(X)
+        return _sigmoid(margin), contribs
+
+
+class AutoModel:
+    """NumPy evaluator for small batches (fixed cost dominates), Booster.inplace_predict for large ones."""
+
+    def __init__(self, model: Any, numpy_max_rows: int = AUTO_NUMPY_MAX_ROWS):
+        self._small = FlatTreeModel(model)
+        self._large = BoosterModel(model)
+        self._numpy_max_rows = numpy_max_rows
+        self.feature_importances_ = self._small.feature_importances_
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if len(X) <= self._numpy_max_rows:
+            return self._small.predict_proba(X)
+        return self._large.predict_proba(X)
+
+    def predict_with_contribs(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        if len(X) <= self._numpy_max_rows:
+            return self._small.predict_with_contribs(X)
+        return self._large.predict_with_contribs(X)
+
+
+def predict_with_contribs(model: Any, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(positive-class probability, N x (F + 1) contributions) for any backend, including a raw sklearn model."""
+    if hasattr(model, "predict_with_contribs"):
+        return model.predict_with_contribs(X)
+    # sklearn backend: reference probabilities from predict_proba, contributions from the booster(s)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    contribs = [_booster_contribs(est.get_booster(), X) for est, _ in model_members(model)]
+    return model.predict_proba(X)[:, 1], np.mean(contribs, axis=0)
+
+
+def set_nthread(model: Any, nthread: int) -> None:
+    """Threads XGBoost may use per predict call, on every member (sklearn n_jobs and the underlying Booster)."""
+    for estimator, _ in model_members(model):
+        if hasattr(estimator, "set_params"):
+            estimator.set_params(n_jobs=nthread)
+        estimator.get_booster().set_param({"nthread": nthread})
+
+
+def make_backend(model: Any, backend: str, nthread: Optional[int] = None) -> Any:
+    """Wrap a loaded sklearn-style model for the requested backend ("sklearn" returns it unchanged).
+
+    nthread (> 0) caps XGBoost's threads per call; None keeps the library default (all cores).
+    """
+    if nthread:
+        set_nthread(model, nthread)
+    if backend == "sklearn":
+        if isinstance(model, NativeModel):
+            raise ValueError("The sklearn backend needs the joblib artifact; use booster, numpy or auto")
+        return model
+    if backend == "booster":
+        return BoosterModel(model)
+    if backend == "numpy":
+        return FlatTreeModel(model)
+    if backend == "auto":
+        return AutoModel(model)
+    raise ValueError(f"Unknown inference backend {backend!r}; expected one of {BACKENDS}")
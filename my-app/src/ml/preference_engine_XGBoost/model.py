@@ -1,16 +1,41 @@
 # XGBoost model: load, predict regret_probability, fit_score = 1 - regret.
 
+import logging
+import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 import numpy as np
 
-from .config.defaults import DEFAULT_MODEL_PATH
-from .explanations import get_explanation
-from .features import FEATURE_NAMES, build_features, features_to_vector
-from .schemas import ActivityInput, ScoreResponse, TravelPreferencesInput
+from ..serving.executor import threads_per_worker
+from ..serving.metrics import stage
+from .config.defaults import (
+    DEFAULT_BACKEND,
+    DEFAULT_MODEL_PATH,
+    MATRIX_CHUNK_BYTES,
+    MODEL_FORMAT,
+    NTHREAD,
+    STREAM_CHUNK_SIZE,
+)
+from .explanations import get_explanations
+from .features import (
+    FEATURE_NAMES,
+    activity_arrays,
+    build_feature_matrix,
+    build_features,
+    feature_matrix_from_arrays,
+    feature_tensor,
+    features_to_vector,
+    prepare_activities,
+)
+from .inference import make_backend, predict_with_contribs
+from .native import SIDECAR_SUFFIX, artifact_checksum, load_native, sidecar_matches, sidecar_path
+from .schemas import ActivityInput, RankedScore, ScoreResponse, TravelPreferencesInput
+
+logger = logging.getLogger(__name__)
 
 PACKAGE_DIR = Path(__file__).resolve().parent
+_REEXPORT = "Re-export: python -m ml.preference_engine_XGBoost.native"
 
 
 def _resolve_model_path(path: Optional[Path | str] = None) -> Path:
@@ -19,8 +44,63 @@ def _resolve_model_path(path: Optional[Path | str] = None) -> Path:
     return Path(path).resolve()
 
 
-def load_model(path: Optional[Path | str] = None) -> Any:
-    return _load_joblib_model(path)
+def artifact_path(path: Optional[Path | str] = None, backend: Optional[str] = None, fmt: str = MODEL_FORMAT) -> Path:
+    """The file load_model reads: the native sidecar when it exists (and is allowed), else the joblib model.
+
+    The sklearn backend needs the sklearn objects, so it always uses joblib. A sidecar exported from another version
+    of the joblib model (replaced without re-exporting) is skipped with a warning, or raises ValueError when
+    fmt="native" asks for it explicitly.
+    """
+    p = _resolve_model_path(path)
+    if p.name.endswith(SIDECAR_SUFFIX) or fmt == "joblib" or (backend or DEFAULT_BACKEND) == "sklearn":
+        return p
+    sidecar = sidecar_path(p)
+    current = not sidecar.exists() or sidecar_matches(sidecar, p)
+    if fmt == "native":
+        if not current:
+            raise ValueError(f"{sidecar} was not exported from the current {p}; {_REEXPORT}")
+        return sidecar
+    if sidecar.exists():
+        if current:
+            return sidecar
+        logger.warning(
+            "preference_engine_XGBoost: %s was not exported from the current %s; loading the joblib model. %s",
+            sidecar,
+            p,
+            _REEXPORT,
+        )
+    return p
+
+
+def model_files(path: Optional[Path | str] = None) -> list[Path]:
+    """The files load_model(path) may read (joblib model first, then its native sidecar), for a registry to watch."""
+    p = _resolve_model_path(path)
+    return [p] if p.name.endswith(SIDECAR_SUFFIX) else [p, sidecar_path(p)]
+
+
+def load_model(
+    path: Optional[Path | str] = None, backend: Optional[str] = None, nthread: Optional[int] = None
+) -> Any:
+    """Load the trained model wrapped for the inference backend (config DEFAULT_BACKEND / NTHREAD unless given).
+
+    Prefers the native XGBoost artifact (see artifact_path); the wrapped model's load_info reports the format,
+    file, checksum and load time.
+    """
+    p = artifact_path(path, backend)
+    t0 = time.perf_counter()
+    if p.name.endswith(SIDECAR_SUFFIX):
+        if not p.exists():
+            raise FileNotFoundError(
+                f"Native model not found: {p}. Run: python -m ml.preference_engine_XGBoost.native"
+            )
+        raw, fmt, checksum = load_native(p), "native", artifact_checksum(p)
+    else:
+        raw, fmt, checksum = _load_joblib_model(p), "joblib", None
+    load_ms = (time.perf_counter() - t0) * 1000.0
+    model = make_backend(raw, backend or DEFAULT_BACKEND, nthread or NTHREAD or threads_per_worker())
+    model.load_info = {"format": fmt, "path": str(p), "checksum": checksum, "load_ms": round(load_ms, 2)}
+    logger.info("preference_engine_XGBoost: loaded %s model from %s in %.1f ms", fmt, p, load_ms)
+    return model
 
 
 def _load_joblib_model(path: Optional[Path | str] = None) -> Any:
@@ -47,13 +127,15 @@ def predict_regret_probability(
     """Returns (regret_probability, features_dict, explanation_list)."""
     if model is None:
         model = _load_joblib_model(model_path)
-    feats = build_features(travel, interests, activity)
-    vec = features_to_vector(feats)
-    X = np.array([vec], dtype=np.float32)
-    # sklearn API
-    proba = model.predict_proba(X)[0, 1]
-    proba = float(np.clip(proba, 0.0, 1.0))
-    explanation = get_explanation(model, feats, FEATURE_NAMES)
+    with stage("features"):
+        feats = build_features(travel, interests, activity)
+        vec = features_to_vector(feats)
+        X = np.array([vec], dtype=np.float32)
+    with stage("inference"):
+        proba, contribs = predict_with_contribs(model, X)
+    proba = float(np.clip(proba[0], 0.0, 1.0))
+    with stage("explain"):
+        explanation = get_explanations(contribs, FEATURE_NAMES)[0]
     return round(proba, 4), feats, explanation
 
 
@@ -63,28 +145,225 @@ def predict_batch(
     activities: list[ActivityInput],
     model: Optional[Any] = None,
     model_path: Optional[Path | str] = None,
+    explain: bool = True,
 ) -> list[ScoreResponse]:
     if model is None:
         model = _load_joblib_model(model_path)
     if not activities:
         return []
-    rows = [
-        features_to_vector(build_features(travel, interests, a))
-        for a in activities
-    ]
-    X = np.array(rows, dtype=np.float32)
-    proba = model.predict_proba(X)[:, 1]
+    with stage("features"):
+        X = build_feature_matrix(travel, interests, activities)
+    return _score_matrix(X, model, explain)
+
+
+def score_requests(
+    items: list[tuple[TravelPreferencesInput, list[str], ActivityInput]],
+    model: Optional[Any] = None,
+    model_path: Optional[Path | str] = None,
+) -> list[ScoreResponse]:
+    """Score independent (travel, interests, activity) requests in one model call (micro-batched /score)."""
+    if model is None:
+        model = _load_joblib_model(model_path)
+    if not items:
+        return []
+    with stage("features"):
+        X = np.array(
+            [features_to_vector(build_features(travel, interests, activity)) for travel, interests, activity in items],
+            dtype=np.float32,
+        )
+    return _score_matrix(X, model)
+
+
+def predict_batch_arrays(
+    travel: TravelPreferencesInput,
+    interests: list[str],
+    arrays: dict,
+    model: Optional[Any] = None,
+    model_path: Optional[Path | str] = None,
+    explain: bool = True,
+) -> list[ScoreResponse]:
+    """predict_batch for activities given as columns (ActivityColumns.arrays() / features.activity_arrays)."""
+    if model is None:
+        model = _load_joblib_model(model_path)
+    if not arrays["categories"]:
+        return []
+    with stage("features"):
+        X = feature_matrix_from_arrays(travel, interests, **arrays)
+    return _score_matrix(X, model, explain)
+
+
+def predict_regret_arrays(
+    travel: TravelPreferencesInput,
+    interests: list[str],
+    arrays: dict,
+    model: Optional[Any] = None,
+    model_path: Optional[Path | str] = None,
+) -> np.ndarray:
+    """Regret probability (float64, clipped to [0, 1]) per activity column entry; scores only, no explanations."""
+    if model is None:
+        model = _load_joblib_model(model_path)
+    if not len(arrays["categories"]):
+        return np.empty(0, dtype=np.float64)
+    with stage("features"):
+        X = feature_matrix_from_arrays(travel, interests, **arrays)
+    with stage("inference"):
+        return np.clip(model.predict_proba(X)[:, 1], 0.0, 1.0).astype(np.float64)
+
+
+def iter_batch_chunks(
+    travel: TravelPreferencesInput,
+    interests: list[str],
+    activities: list[ActivityInput],
+    model: Optional[Any] = None,
+    model_path: Optional[Path | str] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    score: Optional[Any] = None,
+) -> Iterator[list[ScoreResponse]]:
+    """Yield predict_batch results chunk by chunk (request order), one model call per chunk.
+
+    Only one chunk's feature matrix and results are alive at a time. `score` overrides how a chunk is
+    scored (same signature as predict_batch without the model), e.g. to go through the result cache.
+    """
+    if score is None:
+        if model is None:
+            model = _load_joblib_model(model_path)
+        score = lambda t, i, acts: predict_batch(t, i, acts, model=model)
+    step = max(1, chunk_size)
+    for start in range(0, len(activities), step):
+        yield score(travel, interests, activities[start:start + step])
+
+
+def _score_matrix(X: np.ndarray, model: Any, explain: bool = True) -> list[ScoreResponse]:
+    """Score a prebuilt feature matrix. With explain, probabilities and per-row contributions come from one
+    contributions pass; without it, only predict_proba runs (no DMatrix, no contribution bookkeeping)."""
+    with stage("inference"):
+        if explain:
+            proba, contribs = predict_with_contribs(model, X)
+        else:
+            proba = model.predict_proba(X)[:, 1]
+    proba = np.clip(proba, 0.0, 1.0)
+    if explain:
+        with stage("explain"):
+            explanations = get_explanations(contribs, FEATURE_NAMES)
+    else:
+        explanations = [None] * len(proba)
     out = []
-    for i, act in enumerate(activities):
-        reg = float(np.clip(proba[i], 0.0, 1.0))
-        fit = round(1.0 - reg, 4)
-        feats = build_features(travel, interests, act)
-        explanation = get_explanation(model, feats, FEATURE_NAMES)
+    for reg, explanation in zip(proba.tolist(), explanations):
         out.append(
             ScoreResponse(
-                fit_score=fit,
+                fit_score=round(1.0 - reg, 4),
                 regret_probability=round(reg, 4),
                 explanation=explanation or None,
             )
         )
     return out
+
+
+def rank_top_k(
+    travel: TravelPreferencesInput,
+    interests: list[str],
+    activities: list[ActivityInput],
+    k: int,
+    tie_break: Optional[str] = None,
+    min_fit: Optional[float] = None,
+    model: Optional[Any] = None,
+    model_path: Optional[Path | str] = None,
+    explain: bool = True,
+) -> list[RankedScore]:
+    """Top-k activities by fit_score (desc), then tie_break column (asc), then request order.
+
+    Same order as sorting every /batch_score result; explanations are computed for the k winners only.
+    """
+    if model is None:
+        model = _load_joblib_model(model_path)
+    if not activities or k <= 0:
+        return []
+    with stage("features"):
+        arrays = activity_arrays(activities)
+        X = feature_matrix_from_arrays(travel, interests, **arrays)
+    with stage("inference"):
+        regret = np.clip(model.predict_proba(X)[:, 1], 0.0, 1.0).astype(np.float64)
+    fit = np.round(1.0 - regret, 4)
+
+    candidates = np.arange(len(activities))
+    if min_fit is not None:
+        candidates = candidates[fit >= min_fit]
+    if k < candidates.size:
+        top = candidates[np.argpartition(-fit[candidates], k - 1)[:k]]
+        # Keep everything tied with the k-th score so the tie-break decides, not argpartition
+        candidates = candidates[fit[candidates] >= fit[top].min()]
+    if tie_break == "emission":
+        secondary = arrays["emission_kg"][candidates]
+    elif tie_break == "price":
+        secondary = arrays["price_usd"][candidates]
+    else:
+        secondary = np.zeros(candidates.size)
+    winners = candidates[np.lexsort((candidates, secondary, -fit[candidates]))[:k]]
+    if winners.size == 0:
+        return []
+
+    explanations = [None] * winners.size
+    if explain:
+        with stage("explain"):
+            _, contribs = predict_with_contribs(model, X[winners])
+            explanations = get_explanations(contribs, FEATURE_NAMES)
+    return [
+        RankedScore(
+            index=int(i),
+            id=activities[i].id,
+            fit_score=float(fit[i]),
+            regret_probability=round(float(regret[i]), 4),
+            explanation=explanation or None,
+        )
+        for i, explanation in zip(winners.tolist(), explanations)
+    ]
+
+
+def predict_matrix(
+    travels: list[TravelPreferencesInput],
+    interests_list: list[list[str]],
+    activities: list[ActivityInput],
+    model: Optional[Any] = None,
+    model_path: Optional[Path | str] = None,
+    top_k: Optional[int] = None,
+    max_chunk_bytes: int = MATRIX_CHUNK_BYTES,
+) -> tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """Fit scores for every (user, activity) pair: U x A float32, plus optional per-user top-k.
+
+    The U x A x 19 feature tensor is built by broadcasting user sliders against activity columns and
+    scored in chunks whose feature block stays under max_chunk_bytes. Returns (fit, top_indices, top_scores);
+    top rows are sorted by fit desc, ties by activity index.
+    """
+    if model is None:
+        model = _load_joblib_model(model_path)
+    n_users, n_acts = len(travels), len(activities)
+    fit = np.empty((n_users, n_acts), dtype=np.float32)
+    if n_users and n_acts:
+        with stage("features"):
+            acts = prepare_activities(**activity_arrays(activities))
+        row_bytes = len(FEATURE_NAMES) * np.dtype(np.float32).itemsize
+        act_step = max(1, min(n_acts, max_chunk_bytes // row_bytes))
+        user_step = max(1, max_chunk_bytes // (act_step * row_bytes))
+        for a0 in range(0, n_acts, act_step):
+            a1 = min(n_acts, a0 + act_step)
+            chunk_acts = acts if (a0, a1) == (0, n_acts) else _slice_activities(acts, a0, a1)
+            for u0 in range(0, n_users, user_step):
+                u1 = min(n_users, u0 + user_step)
+                with stage("features"):
+                    X = feature_tensor(travels[u0:u1], interests_list[u0:u1], chunk_acts)
+                with stage("inference"):
+                    regret = model.predict_proba(X.reshape(-1, X.shape[-1]))[:, 1]
+                fit[u0:u1, a0:a1] = (1.0 - np.clip(regret, 0.0, 1.0)).reshape(u1 - u0, a1 - a0)
+    if top_k is None:
+        return fit, None, None
+    k = min(top_k, n_acts)
+    if k == 0:
+        empty = np.empty((n_users, 0))
+        return fit, empty.astype(np.intp), empty.astype(np.float32)
+    # A stable sort keeps equal scores in activity order, so ties at the k-th place go to the lower index
+    top = np.argsort(-fit, axis=1, kind="stable")[:, :k]
+    return fit, top, np.take_along_axis(fit, top, axis=1)
+
+
+def _slice_activities(acts: dict, start: int, stop: int) -> dict:
+    return {k: v[start:stop] for k, v in acts.items()}
@@ -0,0 +1,135 @@
+# Native XGBoost artifact: one UBJSON booster per ensemble member + a JSON sidecar (feature names, calibration,
+# checksums). Loads with xgboost alone -- no unpickling, no sklearn -- and is stable across library versions.
+# Convert an existing joblib model: from src/ run: python -m ml.preference_engine_XGBoost.native [model.joblib]
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+if __name__ == "__main__":
+    src = Path(__file__).resolve().parents[2]
+    if str(src) not in sys.path:
+        sys.path.insert(0, str(src))
+
+from ml.preference_engine_XGBoost.features import FEATURE_NAMES
+from ml.preference_engine_XGBoost.inference import NativeModel, calibration_params, model_members
+
+FORMAT = "xgboost-ubjson"
+SIDECAR_SUFFIX = ".native.json"
+
+
+def sidecar_path(model_path: Path | str) -> Path:
+    """artifacts/model.joblib -> artifacts/model.native.json"""
+    p = Path(model_path)
+    return p.with_name(p.stem + SIDECAR_SUFFIX)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def export_native(model: Any, model_path: Path | str) -> Path:
+    """Write the booster(s) of a fitted sklearn-style model as UBJSON next to model_path; returns the sidecar path.
+
+    Calibrators are stored as parameters (sigmoid a/b or isotonic thresholds). When model_path exists, its sha256,
+    mtime and size are recorded, so a joblib model replaced later is not shadowed by this export (sidecar_matches).
+    The sidecar is written last, so a reader never sees it pointing at booster files that are not there yet.
+    """
+    import xgboost as xgb
+
+    sidecar = sidecar_path(model_path)
+    members = []
+    estimators = model_members(model)
+    for i, (estimator, _) in enumerate(estimators):
+        booster_path = sidecar.with_name(
+            f"{Path(model_path).stem}.ubj" if len(estimators) == 1 else f"{Path(model_path).stem}.{i}.ubj"
+        )
+        raw = bytes(estimator.get_booster().save_raw("ubj"))
+        booster_path.write_bytes(raw)
+        members.append({"file": booster_path.name, "sha256": _sha256(raw), "calibration": None})
+    if hasattr(model, "calibrated_classifiers_"):
+        for member, cc in zip(members, model.calibrated_classifiers_):
+            member["calibration"] = calibration_params(cc.calibrators[0])
+    meta = {
+        "format": FORMAT,
+        "xgboost_version": xgb.__version__,
+        "feature_names": list(FEATURE_NAMES),
+        "members": members,
+        "source": _source(Path(model_path)),
+    }
+    tmp = sidecar.with_name(sidecar.name + ".tmp")
+    tmp.write_text(json.dumps(meta, indent=2))
+    tmp.replace(sidecar)
+    return sidecar
+
+
+def _source(model_path: Path) -> Optional[dict]:
+    if not model_path.exists():
+        return None
+    st = model_path.stat()
+    return {
+        "file": model_path.name,
+        "sha256": _sha256(model_path.read_bytes()),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+    }
+
+
+def sidecar_matches(sidecar: Path | str, model_path: Path | str) -> bool:
+    """Whether the sidecar was exported from model_path as it is now (trivially true when model_path is absent).
+
+    Same mtime and size is enough; otherwise (e.g. after a checkout) the joblib file's sha256 must match. A sidecar
+    without a recorded source cannot be checked and does not match.
+    """
+    model_path = Path(model_path)
+    if not model_path.exists():
+        return True
+    source = json.loads(Path(sidecar).read_text()).get("source")
+    if source is None:
+        return False
+    st = model_path.stat()
+    if (st.st_mtime_ns, st.st_size) == (source["mtime_ns"], source["size"]):
+        return True
+    return st.st_size == source["size"] and _sha256(model_path.read_bytes()) == source["sha256"]
+
+
+def load_native(sidecar: Path | str) -> NativeModel:
+    """Load the boosters listed in the sidecar, verifying each file's sha256 and the feature names."""
+    import xgboost as xgb
+
+    sidecar = Path(sidecar)
+    meta = json.loads(sidecar.read_text())
+    if meta.get("format") != FORMAT:
+        raise ValueError(f"{sidecar}: unsupported format {meta.get('format')!r}, expected {FORMAT!r}")
+    if meta["feature_names"] != list(FEATURE_NAMES):
+        raise ValueError(f"{sidecar}: feature names do not match features.FEATURE_NAMES; retrain or re-export")
+    members = []
+    for member in meta["members"]:
+        raw = (sidecar.parent / member["file"]).read_bytes()
+        if _sha256(raw) != member["sha256"]:
+            raise ValueError(f"{sidecar.parent / member['file']}: checksum mismatch (corrupt or partial write)")
+        booster = xgb.Booster()
+        booster.load_model(bytearray(raw))
+        members.append((booster, member["calibration"]))
+    return NativeModel(members)
+
+
+def artifact_checksum(sidecar: Path | str) -> str:
+    """One checksum over every booster file of the artifact (sha256 of the member checksums, 12 hex chars)."""
+    meta = json.loads(Path(sidecar).read_text())
+    return _sha256("".join(m["sha256"] for m in meta["members"]).encode())[:12]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    from ml.preference_engine_XGBoost.model import _load_joblib_model, _resolve_model_path
+
+    argv = sys.argv[1:] if argv is None else argv
+    path = _resolve_model_path(argv[0] if argv else None)
+    sidecar = export_native(_load_joblib_model(path), path)
+    print(f"Exported {path} -> {sidecar} ({artifact_checksum(sidecar)})")
+
+
+if __name__ == "__main__":
+    main()
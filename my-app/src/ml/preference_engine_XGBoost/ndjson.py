@@ -0,0 +1,63 @@
+# NDJSON input for /batch_score_stream: a header line, then one activity per line, read and scored chunk by chunk.
+
+import json
+from typing import Any, AsyncIterator, Iterable
+
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from .schemas import ActivityInput
+
+NDJSON = "application/x-ndjson"
+# One activity is a few hundred bytes; a longer line is not an activity (e.g. a whole JSON array on one line)
+MAX_LINE_BYTES = 1 << 16
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[bytes]:
+    """Non-blank lines of a body as its chunks arrive; only the current partial line is buffered."""
+    pending = b""
+    async for data in chunks:
+        pending += data
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+        if len(pending) > max_line_bytes:
+            raise ValueError(f"NDJSON line longer than {max_line_bytes} bytes")
+    if pending.strip():
+        yield pending
+
+
+def parse_activities(lines: Iterable[bytes], first_index: int) -> list[ActivityInput]:
+    """Validate one chunk of activity lines; errors name the activity's index in the request (0-based)."""
+    activities = []
+    for index, line in enumerate(lines, start=first_index):
+        try:
+            activities.append(ActivityInput.model_validate_json(line))
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'line'}: {err['msg']}" for err in e.errors())
+            raise ValueError(f"activities[{index}]: {errors}") from None
+    return activities
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body iterator may still be reading the request body.
+
+    StreamingResponse (for ASGI servers before spec 2.4) listens for a disconnect in parallel, and that listener
+    would consume the request's remaining body messages. Here a disconnect surfaces as ClientDisconnect while the
+    body is read, or as an OSError on send, as with spec 2.4 servers.
+    """
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+def write_request(travel: dict, interests: list[str], activities: Iterable[dict], explain: bool = True) -> Iterable[bytes]:
+    """Client-side helper: an NDJSON /batch_score_stream body, line by line (pass it as a streaming request body)."""
+    yield (json.dumps({"travel": travel, "interests": interests, "explain": explain}) + "\n").encode()
+    for activity in activities:
+        yield (json.dumps(activity) + "\n").encode()
@@ -1,7 +1,9 @@
 # Request/response schemas (aligned with app: travel sliders + interests)
 
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 
 
 class TravelPreferencesInput(BaseModel):
@@ -44,7 +46,123 @@ class BatchScoreRequest(BaseModel):
     travel: TravelPreferencesInput = Field(default_factory=TravelPreferencesInput)
     interests: list[str] = Field(default_factory=list)
     activities: list[ActivityInput]
+    # Per-activity explanations need a feature-contribution pass (2-4x the cost of scoring alone); bulk callers
+    # that only need the scores can turn them off
+    explain: bool = True
+
+
+class BatchScoreStreamHeader(BaseModel):
+    """First line of an NDJSON /batch_score_stream body; every following line is one ActivityInput."""
+
+    travel: TravelPreferencesInput = Field(default_factory=TravelPreferencesInput)
+    interests: list[str] = Field(default_factory=list)
+    explain: bool = True
 
 
 class BatchScoreResponse(BaseModel):
     scores: list[ScoreResponse]
+
+
+# Numeric activity columns: name -> (default when the column is absent, lower bound, upper bound, lower bound open).
+# Same defaults and ranges as ActivityInput; NaN defaults mark optional fields, whose entries may be null.
+ACTIVITY_COLUMNS: dict[str, tuple[float, float, float, bool]] = {
+    "duration_hours": (1.0, 0.0, 24.0, True),
+    "emission_kg": (0.0, 0.0, np.inf, False),
+    "price_usd": (0.0, 0.0, np.inf, False),
+    "typical_start_hour": (float("nan"), 0.0, 24.0, False),
+    "typical_crowd_level": (float("nan"), 0.0, 1.0, False),
+}
+
+
+def check_activity_column(name: str, arr: np.ndarray) -> None:
+    """Raise ValueError naming the first entry of a float64 column outside its ACTIVITY_COLUMNS range."""
+    default, lo, hi, lo_open = ACTIVITY_COLUMNS[name]
+    ok = (arr > lo if lo_open else arr >= lo) & (arr <= hi)
+    if np.isnan(default):
+        ok |= np.isnan(arr)
+    if not ok.all():
+        i = int(np.flatnonzero(~ok)[0])
+        raise ValueError(f"{name}[{i}] = {arr[i]} out of range")
+
+
+class ActivityColumns(BaseModel):
+    """Activities as parallel arrays; same fields, defaults and ranges as ActivityInput, checked per column."""
+
+    category: list[Optional[str]]
+    duration_hours: Optional[list[float]] = None  # None = 1.0 for every activity
+    emission_kg: Optional[list[float]] = None  # None = 0.0
+    price_usd: Optional[list[float]] = None  # None = 0.0
+    typical_start_hour: Optional[list[Optional[float]]] = None
+    typical_crowd_level: Optional[list[Optional[float]]] = None
+
+    _arrays: dict = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="after")
+    def _check_columns(self) -> "ActivityColumns":
+        n = len(self.category)
+
+        def column(name: str) -> np.ndarray:
+            values = getattr(self, name)
+            if values is None:
+                return np.full(n, ACTIVITY_COLUMNS[name][0], dtype=np.float64)
+            if len(values) != n:
+                raise ValueError(f"{name} has {len(values)} values, expected {n} (one per category)")
+            # None entries (optional columns only) become NaN = "not given", like a missing ActivityInput field
+            arr = np.array(values, dtype=np.float64)
+            check_activity_column(name, arr)
+            return arr
+
+        self._arrays = {"categories": [c or "outdoor" for c in self.category]}
+        self._arrays.update((name, column(name)) for name in ACTIVITY_COLUMNS)
+        return self
+
+    def __len__(self) -> int:
+        return len(self.category)
+
+    def arrays(self) -> dict:
+        """Keyword arguments for features.feature_matrix_from_arrays."""
+        return self._arrays
+
+
+class ColumnarBatchScoreRequest(BaseModel):
+    travel: TravelPreferencesInput = Field(default_factory=TravelPreferencesInput)
+    interests: list[str] = Field(default_factory=list)
+    activities: ActivityColumns
+    explain: bool = True
+
+
+class RankRequest(BatchScoreRequest):
+    k: int = Field(10, ge=1, le=1000)
+    # Among equal fit scores, prefer lower emission_kg / price_usd (None keeps request order)
+    tie_break: Optional[Literal["emission", "price"]] = None
+    min_fit: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+
+class RankedScore(ScoreResponse):
+    index: int = Field(..., ge=0)  # position in the request's activities
+    id: Optional[str] = None
+
+
+class RankResponse(BaseModel):
+    ranked: list[RankedScore]
+
+
+class UserProfile(BaseModel):
+    user_id: Optional[str] = None
+    travel: TravelPreferencesInput = Field(default_factory=TravelPreferencesInput)
+    interests: list[str] = Field(default_factory=list)
+
+
+class MatrixScoreRequest(BaseModel):
+    users: list[UserProfile] = Field(..., min_length=1)
+    activities: list[ActivityInput]
+    top_k: Optional[int] = Field(None, ge=1)
+    # Set False with top_k to receive only the per-user top-k
+    return_matrix: bool = True
+
+
+class MatrixScoreResponse(BaseModel):
+    user_ids: list[Optional[str]]
+    fit_scores: Optional[list[list[float]]] = None  # users x activities, request order
+    top_indices: Optional[list[list[int]]] = None
+    top_scores: Optional[list[list[float]]] = None
@@ -0,0 +1,333 @@
+# Tests for API contract.
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+MODEL_PATH = PACKAGE_DIR / "artifacts" / "model.joblib"
+
+BODY = {
+    "travel": {"trip_pace": 0.4, "crowd_comfort": 0.3, "eco_preference": 0.8},
+    "interests": ["museum", "food"],
+    "activities": [
+        {"id": "a", "category": "museum", "duration_hours": 2.0, "emission_kg": 2.5, "price_usd": 20.0},
+        {"id": "b", "category": "nightlife", "duration_hours": 3.0, "price_usd": 60.0, "typical_start_hour": 22.0},
+        {"id": "c", "category": "ski", "duration_hours": 6.0, "emission_kg": 18.0, "price_usd": 120.0},
+    ],
+}
+
+
+@pytest.fixture
+def client():
+    if not MODEL_PATH.exists():
+        pytest.skip("Model not trained. Run: python -m ml.preference_engine_XGBoost.train")
+    from ml.preference_engine_XGBoost.api import app
+    return TestClient(app)
+
+
+def test_health(client: TestClient) -> None:
+    with client:  # runs lifespan, which loads the model
+        r = client.get("/health")
+    assert r.status_code == 200
+    assert r.json()["status"] == "ok"
+    assert r.json()["engine"] == "preference_engine_XGBoost"
+    assert r.json()["model"]["loaded"] is True
+
+
+def test_score_matches_batch_score(client: TestClient) -> None:
+    r = client.post("/batch_score", json=BODY)
+    assert r.status_code == 200
+    scores = r.json()["scores"]
+    assert len(scores) == len(BODY["activities"])
+    for act, s in zip(BODY["activities"], scores):
+        assert 0 <= s["fit_score"] <= 1
+        assert 0 <= s["regret_probability"] <= 1
+        single = client.post(
+            "/score", json={"travel": BODY["travel"], "interests": BODY["interests"], "activity": act}
+        )
+        assert single.status_code == 200
+        assert single.json() == s
+
+
+def test_batch_score_explains_unless_turned_off(client: TestClient) -> None:
+    explained = client.post("/batch_score", json=BODY).json()["scores"]
+    plain = client.post("/batch_score", json={**BODY, "explain": False}).json()["scores"]
+    assert any(s["explanation"] for s in explained)
+    assert all(s["explanation"] is None for s in plain)
+    assert [s["fit_score"] for s in plain] == [s["fit_score"] for s in explained]
+
+
+def test_repeat_batch_hits_cache(client: TestClient) -> None:
+    from ml.preference_engine_XGBoost import api
+
+    if api._cache is None:
+        pytest.skip("Result cache disabled")
+    api._cache.clear()
+    before = client.get("/health").json()["cache"]
+    first = client.post("/batch_score", json=BODY).json()
+    second = client.post("/batch_score", json=BODY).json()
+    after = client.get("/health").json()["cache"]
+    assert first == second
+    assert after["hits"] - before["hits"] == len(BODY["activities"])
+
+
+def test_rank_returns_top_k(client: TestClient) -> None:
+    batch = client.post("/batch_score", json=BODY).json()["scores"]
+    r = client.post("/rank", json={**BODY, "k": 2, "tie_break": "emission"})
+    assert r.status_code == 200
+    ranked = r.json()["ranked"]
+    assert len(ranked) == 2
+    best = max(range(len(batch)), key=lambda i: batch[i]["fit_score"])
+    assert ranked[0]["index"] == best
+    assert ranked[0]["id"] == BODY["activities"][best]["id"]
+    assert ranked[0]["fit_score"] >= ranked[1]["fit_score"]
+
+
+def test_matrix_score(client: TestClient) -> None:
+    users = [
+        {"user_id": "u1", "travel": BODY["travel"], "interests": BODY["interests"]},
+        {"user_id": "u2", "interests": ["ski"]},
+    ]
+    r = client.post("/matrix_score", json={"users": users, "activities": BODY["activities"], "top_k": 2})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["user_ids"] == ["u1", "u2"]
+    assert len(data["fit_scores"]) == 2 and len(data["fit_scores"][0]) == len(BODY["activities"])
+    batch = client.post("/batch_score", json=BODY).json()["scores"]
+    assert data["fit_scores"][0] == pytest.approx([s["fit_score"] for s in batch], abs=1e-4)
+    assert [len(row) for row in data["top_indices"]] == [2, 2]
+
+
+def test_batch_score_stream_matches_batch_score(client: TestClient) -> None:
+    import json
+
+    body = {**BODY, "activities": BODY["activities"] * 400}
+    r = client.post("/batch_score_stream", json=body)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert lines == client.post("/batch_score", json=body).json()["scores"]
+
+
+def _ndjson_body(activities: list, explain: bool = True) -> bytes:
+    from ml.preference_engine_XGBoost.ndjson import write_request
+
+    return b"".join(write_request(BODY["travel"], BODY["interests"], activities, explain=explain))
+
+
+def test_batch_score_stream_ndjson_input_matches_batch_score(client: TestClient, monkeypatch) -> None:
+    import json
+
+    from ml.preference_engine_XGBoost import api
+    from ml.preference_engine_XGBoost.ndjson import NDJSON
+
+    monkeypatch.setattr(api, "STREAM_CHUNK_SIZE", 4)
+    body = {**BODY, "activities": BODY["activities"] * 5}
+    r = client.post("/batch_score_stream", content=_ndjson_body(body["activities"]), headers={"Content-Type": NDJSON})
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert lines == client.post("/batch_score", json=body).json()["scores"]
+
+
+def test_batch_score_stream_ndjson_bad_lines(client: TestClient, monkeypatch) -> None:
+    import json
+
+    from ml.preference_engine_XGBoost import api
+    from ml.preference_engine_XGBoost.ndjson import NDJSON
+
+    monkeypatch.setattr(api, "STREAM_CHUNK_SIZE", 2)
+    headers = {"Content-Type": NDJSON}
+    assert client.post("/batch_score_stream", content=b"", headers=headers).status_code == 422
+    assert client.post("/batch_score_stream", content=b'{"interests": 3}\n', headers=headers).status_code == 422
+    # A bad activity in the first chunk is a 422 naming it
+    bad = {"category": "museum", "duration_hours": -1.0}
+    r = client.post("/batch_score_stream", content=_ndjson_body([BODY["activities"][0], bad]), headers=headers)
+    assert r.status_code == 422
+    assert "activities[1]" in r.json()["detail"]
+    # Further down, the scored chunks are already sent: the stream ends with an error line
+    r = client.post("/batch_score_stream", content=_ndjson_body(BODY["activities"] + [bad]), headers=headers)
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert len(lines) == 3
+    assert "activities[3]" in lines[-1]["error"]
+
+
+def test_batch_score_stream_ndjson_answers_before_the_body_ends(client: TestClient, monkeypatch) -> None:
+    import asyncio
+
+    from ml.preference_engine_XGBoost import api
+    from ml.preference_engine_XGBoost.ndjson import NDJSON
+
+    monkeypatch.setattr(api, "STREAM_CHUNK_SIZE", 3)
+    pieces = _ndjson_body(BODY["activities"] * 4).splitlines(keepends=True)
+    events = []
+
+    async def main():
+        queue = list(pieces)
+
+        async def receive():
+            if not queue:
+                await asyncio.sleep(3600)  # no disconnect while the response is sent
+            events.append("received")
+            piece = queue.pop(0)
+            return {"type": "http.request", "body": piece, "more_body": bool(queue)}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                events.append("sent")
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/batch_score_stream",
+            "raw_path": b"/batch_score_stream",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"content-type", NDJSON.encode())],
+            "client": ("test", 1),
+            "server": ("test", 80),
+        }
+        await asyncio.wait_for(api.app(scope, receive, send), timeout=30)
+
+    asyncio.run(main())
+    # Header + 12 activity lines, 3 per chunk: the first chunk's scores go out after 4 lines, not after all 13
+    assert events.count("received") == len(pieces)
+    assert events.index("sent") < len(pieces) - 1
+    assert events.count("sent") == 4
+
+
+def test_batch_score_columnar_matches_batch_score(client: TestClient) -> None:
+    acts = BODY["activities"]
+    columns = {
+        "category": [a["category"] for a in acts],
+        "duration_hours": [a["duration_hours"] for a in acts],
+        "emission_kg": [a.get("emission_kg", 0.0) for a in acts],
+        "price_usd": [a.get("price_usd", 0.0) for a in acts],
+        "typical_start_hour": [a.get("typical_start_hour") for a in acts],
+    }
+    body = {"travel": BODY["travel"], "interests": BODY["interests"], "activities": columns}
+    r = client.post("/batch_score_columnar", json=body)
+    assert r.status_code == 200
+    assert r.json() == client.post("/batch_score", json=BODY).json()
+
+
+@pytest.mark.parametrize(
+    "columns",
+    [
+        {"category": ["museum", "zoo"], "price_usd": [1.0]},
+        {"category": ["museum"], "duration_hours": [0.0]},
+        {"category": ["museum"], "typical_crowd_level": [1.5]},
+    ],
+)
+def test_batch_score_columnar_rejects_bad_columns(client: TestClient, columns: dict) -> None:
+    r = client.post("/batch_score_columnar", json={"activities": columns})
+    assert r.status_code == 422
+
+
+def test_concurrent_scores_are_micro_batched(client: TestClient, monkeypatch) -> None:
+    import asyncio
+
+    import httpx
+
+    from ml.preference_engine_XGBoost import api
+
+    if api._batcher is None:
+        pytest.skip("micro-batching disabled")
+    if api._cache is not None:
+        api._cache.clear()
+    bodies = [{"travel": BODY["travel"], "interests": BODY["interests"], "activity": a} for a in BODY["activities"]]
+    monkeypatch.setattr(api._batcher, "max_wait_ms", 100.0)  # wide window so the test is not timing-sensitive
+    before = api._batcher.stats()["batches"]
+
+    async def main():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(*(ac.post("/score", json=b) for b in bodies))
+
+    responses = asyncio.run(main())
+    expected = client.post("/batch_score", json=BODY).json()["scores"]
+    assert [r.json() for r in responses] == expected
+    assert api._batcher.stats()["batches"] == before + 1
+
+
+def test_metrics_and_server_timing(client: TestClient) -> None:
+    r = client.post("/batch_score", json=BODY)
+    stages = {part.split(";")[0] for part in r.headers["server-timing"].split(", ")}
+    # With the cache warm from earlier tests there may be nothing to score; the request-level stages are always there
+    assert {"validate", "handler", "serialize", "total"} <= stages
+    text = client.get("/metrics").text
+    assert 'ml_request_duration_seconds_count{engine="preference_engine_XGBoost",endpoint="/batch_score",status="200"}' in text
+    assert 'ml_batch_size_bucket{engine="preference_engine_XGBoost",endpoint="/batch_score",le="5"}' in text
+
+
+def test_overload_returns_503_with_retry_after(client: TestClient, monkeypatch) -> None:
+    from ml.serving.admission import ADMISSION, BULK, INTERACTIVE
+
+    monkeypatch.setattr(ADMISSION, "enabled", True)
+    monkeypatch.setattr(ADMISSION, "capacity", lambda: 0)  # no free slots: every request has to queue
+    monkeypatch.setattr(ADMISSION, "deadlines_s", {INTERACTIVE: 0.01, BULK: 0.01})
+    r = client.post("/batch_score", json=BODY)
+    assert r.status_code == 503
+    assert int(r.headers["retry-after"]) >= 1
+    assert "interactive lane" in r.json()["detail"]
+    assert ADMISSION.stats()["lanes"][INTERACTIVE]["queued"] == 0
+
+
+def _arrow_body(columns: dict, batch_size: int = 2) -> bytes:
+    from ml.preference_engine_XGBoost.arrow import write_activities
+
+    return write_activities(BODY["travel"], BODY["interests"], columns, batch_size=batch_size)
+
+
+def test_batch_score_arrow_matches_batch_score(client: TestClient) -> None:
+    pa = pytest.importorskip("pyarrow")
+    from ml.preference_engine_XGBoost.arrow import ARROW_STREAM, read_scores
+
+    acts = BODY["activities"]
+    columns = {
+        # Dictionary-encoded categories and nullable start hours, split over two record batches
+        "category": pa.array([a["category"] for a in acts]).dictionary_encode(),
+        "duration_hours": [a["duration_hours"] for a in acts],
+        "emission_kg": [a.get("emission_kg", 0.0) for a in acts],
+        "price_usd": [a["price_usd"] for a in acts],
+        "typical_start_hour": [a.get("typical_start_hour") for a in acts],
+    }
+    r = client.post("/batch_score_arrow", content=_arrow_body(columns), headers={"Content-Type": ARROW_STREAM})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == ARROW_STREAM
+    scores = read_scores(r.content)
+    expected = client.post("/batch_score", json=BODY).json()["scores"]
+    np.testing.assert_allclose(scores["fit_score"], [s["fit_score"] for s in expected], atol=1e-4)
+    np.testing.assert_allclose(scores["regret_probability"], [s["regret_probability"] for s in expected], atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"not arrow",
+        {"duration_hours": [1.0]},  # no category column
+        {"category": ["museum"], "duration_hours": [0.0]},  # out of range
+        {"category": ["museum"], "walking_km": [1.0]},  # unknown column
+        {"category": [3]},  # category not strings
+        {"category": [True]},
+        {"category": ["museum"], "price_usd": ["cheap"]},  # activity column not numeric
+    ],
+)
+def test_batch_score_arrow_rejects_bad_input(client: TestClient, body) -> None:
+    pytest.importorskip("pyarrow")
+    content = body if isinstance(body, bytes) else _arrow_body(body)
+    assert client.post("/batch_score_arrow", content=content).status_code == 422
+
+
+def test_batch_score_arrow_rejects_dictionary_of_non_strings(client: TestClient) -> None:
+    pa = pytest.importorskip("pyarrow")
+    body = _arrow_body({"category": pa.array([1, 2, 1]).dictionary_encode()})
+    r = client.post("/batch_score_arrow", content=body)
+    assert r.status_code == 422
+    assert "category" in r.json()["detail"]
@@ -0,0 +1,67 @@
+# Tests for the /score micro-batcher.
+
+import asyncio
+
+import pytest
+
+from ml.preference_engine_XGBoost.batching import MicroBatcher
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_submits_share_one_batch() -> None:
+    calls = []
+
+    def score(items):
+        calls.append(list(items))
+        return [x * 10 for x in items]
+
+    batcher = MicroBatcher(score, max_batch_size=64, max_wait_ms=20)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert _run(main()) == [0, 10, 20, 30, 40]
+    assert calls == [[0, 1, 2, 3, 4]]
+    stats = batcher.stats()
+    assert stats["batches"] == 1 and stats["items"] == 5 and stats["max_batch_seen"] == 5
+
+
+def test_full_batch_flushes_without_waiting() -> None:
+    calls = []
+
+    def score(items):
+        calls.append(len(items))
+        return list(items)
+
+    # A wait far longer than the test: only the size limit can flush the first two batches
+    batcher = MicroBatcher(score, max_batch_size=4, max_wait_ms=60_000)
+
+    async def main():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(8))), timeout=5)
+
+    assert _run(main()) == list(range(8))
+    assert calls == [4, 4]
+
+
+def test_errors_reach_every_caller() -> None:
+    def score(items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=1)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    results = _run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert batcher.stats()["errors"] == 1
+
+
+@pytest.mark.parametrize("n", [1, 3])
+def test_sequential_batches_on_new_loops(n: int) -> None:
+    batcher = MicroBatcher(lambda items: [x + 1 for x in items], max_batch_size=8, max_wait_ms=0)
+    for i in range(n):
+        assert _run(batcher.submit(i)) == i + 1
@@ -0,0 +1,72 @@
+# Tests for the per-activity score cache.
+
+from ml.preference_engine_XGBoost.cache import ScoreCache, cached_predict_batch, score_keys
+from ml.preference_engine_XGBoost.schemas import ActivityInput, ScoreResponse, TravelPreferencesInput
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _fake_scorer(calls: list):
+    def score(travel, interests, activities):
+        calls.append([a.name for a in activities])
+        return [ScoreResponse(fit_score=a.price_usd / 100.0, regret_probability=1 - a.price_usd / 100.0) for a in activities]
+
+    return score
+
+
+def _acts(*prices: float) -> list[ActivityInput]:
+    return [ActivityInput(name=f"a{p:g}", price_usd=p) for p in prices]
+
+
+def test_partial_hit_scores_only_misses_in_order() -> None:
+    cache = ScoreCache(max_entries=100, ttl_seconds=60)
+    calls: list = []
+    travel = TravelPreferencesInput()
+    first = cached_predict_batch(cache, travel, ["museum"], _acts(10, 20), _fake_scorer(calls))
+    second = cached_predict_batch(cache, travel, ["museum"], _acts(30, 10, 40, 20), _fake_scorer(calls))
+    assert calls == [["a10", "a20"], ["a30", "a40"]]
+    assert [s.fit_score for s in first] == [0.1, 0.2]
+    assert [s.fit_score for s in second] == [0.3, 0.1, 0.4, 0.2]
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 4
+
+
+def test_key_is_canonical() -> None:
+    a = ActivityInput(id="x", name="Louvre", category=" Museum", price_usd=20.0)
+    b = ActivityInput(id="y", name="Other", category="museum", price_usd=20.0)
+    t1 = TravelPreferencesInput(trip_pace=0.50001)
+    t2 = TravelPreferencesInput(trip_pace=0.5)
+    assert score_keys(t1, ["Food", "museum"], [a]) == score_keys(t2, ["museum", "food", "food"], [b])
+    assert score_keys(t2, ["museum"], [a]) != score_keys(t2, ["food"], [a])
+    assert score_keys(TravelPreferencesInput(trip_pace=0.6), ["museum"], [a]) != score_keys(t2, ["museum"], [a])
+    # Explained and plain scores of the same activity are separate entries
+    assert score_keys(t2, ["museum"], [a], explain=False) != score_keys(t2, ["museum"], [a])
+
+
+def test_lru_eviction_and_ttl() -> None:
+    clock = FakeClock()
+    cache = ScoreCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put_many([b"a", b"b"], [1, 2])
+    assert cache.get_many([b"a"]) == [1]  # a is now most recent
+    cache.put_many([b"c"], [3])
+    assert cache.get_many([b"b", b"a", b"c"]) == [None, 1, 3]
+    assert cache.stats()["evictions"] == 1
+    clock.now = 11.0
+    assert cache.get_many([b"a", b"c"]) == [None, None]
+    assert cache.stats()["size"] == 0
+
+
+def test_put_after_clear_from_stale_generation_is_dropped() -> None:
+    cache = ScoreCache(max_entries=10, ttl_seconds=60)
+    generation = cache.generation
+    cache.clear()  # e.g. the model was swapped while a request was scoring
+    cache.put_many([b"k"], ["old-model result"], generation=generation)
+    assert cache.get_many([b"k"]) == [None]
+    cache.put_many([b"k"], ["new"], generation=cache.generation)
+    assert cache.get_many([b"k"]) == ["new"]
@@ -0,0 +1,24 @@
+# Tests for per-row explanations from feature contributions.
+
+import numpy as np
+
+from ml.preference_engine_XGBoost.explanations import get_explanations
+
+COLUMNS = ["interest_match", "trip_pace", "crowd_mismatch", "budget_mismatch"]
+
+
+def test_top_features_ranked_by_magnitude_per_row() -> None:
+    contribs = np.array(
+        [
+            [0.1, -0.9, 0.5, 0.0, 3.0],
+            [-2.0, 0.0, 0.0, 0.3, 3.0],
+        ]
+    )
+    out = get_explanations(contribs, COLUMNS, top_k=3)
+    assert out[0] == ["trip pace", "crowd mismatch", "interest match"]
+    # Zero contributions are never reported; the bias column is ignored
+    assert out[1] == ["interest match", "budget mismatch"]
+
+
+def test_empty_batch() -> None:
+    assert get_explanations(np.zeros((0, len(COLUMNS) + 1)), COLUMNS) == []
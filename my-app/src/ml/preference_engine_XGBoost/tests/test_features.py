@@ -0,0 +1,89 @@
+# Tests for feature extraction (scalar vs columnar parity).
+
+import random
+
+import numpy as np
+
+from ml.preference_engine_XGBoost.features import (
+    ATTRACTION_TYPES,
+    FEATURE_NAMES,
+    INTEREST_MATCH_TABLE,
+    build_feature_matrix,
+    build_features,
+    category_similarity,
+    activity_arrays,
+    feature_tensor,
+    features_to_vector,
+    prepare_activities,
+    interest_mask,
+    interest_match,
+    interest_match_column,
+)
+from ml.preference_engine_XGBoost.schemas import ActivityInput, TravelPreferencesInput
+
+CATEGORIES = ["museum", "Culture ", "outdoor", "nature", "food", "nightlife", "wellness", "beach", "ski", "zoo", ""]
+
+
+def _random_activity(rng: random.Random) -> ActivityInput:
+    return ActivityInput(
+        category=rng.choice(CATEGORIES),
+        duration_hours=rng.choice([rng.uniform(0.1, 12.0), 1.5, 8.0]),
+        emission_kg=rng.choice([rng.uniform(0.0, 80.0), 0.0, 25.0]),
+        price_usd=rng.choice([rng.uniform(0.0, 300.0), 0.0, 20.0]),
+        typical_start_hour=rng.choice([None, rng.uniform(0.0, 24.0), 6.0, 22.5]),
+        typical_crowd_level=rng.choice([None, rng.uniform(0.0, 1.0), 0.5]),
+    )
+
+
+def _random_travel(rng: random.Random) -> TravelPreferencesInput:
+    return TravelPreferencesInput(**{k: rng.choice([rng.random(), 0.5, 0.25]) for k in TravelPreferencesInput.model_fields})
+
+
+def test_build_feature_matrix_matches_build_features() -> None:
+    rng = random.Random(7)
+    for interests in ([], ["museum"], ["Nature", "food", "zoo"], ["beach", "ski", "nightlife", "culture"]):
+        travel = _random_travel(rng)
+        activities = [_random_activity(rng) for _ in range(300)]
+        X = build_feature_matrix(travel, interests, activities)
+        assert X.dtype == np.float32
+        assert X.shape == (len(activities), len(FEATURE_NAMES))
+        expected = np.array(
+            [features_to_vector(build_features(travel, interests, a)) for a in activities],
+            dtype=np.float32,
+        )
+        np.testing.assert_array_equal(X, expected)
+
+
+def test_build_feature_matrix_empty() -> None:
+    X = build_feature_matrix(TravelPreferencesInput(), ["museum"], [])
+    assert X.shape == (0, len(FEATURE_NAMES))
+
+
+def test_interest_match_table_matches_pairwise_max() -> None:
+    assert INTEREST_MATCH_TABLE.shape == (1 << len(ATTRACTION_TYPES), len(ATTRACTION_TYPES))
+    interests = ["Museum", "beach", "zoo"]
+    mask = interest_mask(interests)
+    assert mask == (1 << ATTRACTION_TYPES.index("museum")) | (1 << ATTRACTION_TYPES.index("beach"))
+    for j, cat in enumerate(ATTRACTION_TYPES):
+        expected = max(category_similarity(i, cat) for i in interests)
+        assert INTEREST_MATCH_TABLE[mask, j] == expected
+        assert interest_match(interests, cat) == expected
+
+
+def test_interest_match_unknown_category_fallback() -> None:
+    assert interest_match(["zoo", "museum"], "Zoo") == 1.0
+    assert interest_match(["museum"], "zoo") == 0.0
+    assert interest_match([], "zoo") == 0.5
+    col = interest_match_column(["zoo", "museum"], ["zoo", "aquarium", "culture"])
+    np.testing.assert_array_equal(col, [1.0, 0.0, 0.88])
+
+
+def test_feature_tensor_matches_per_user_matrix() -> None:
+    rng = random.Random(11)
+    travels = [_random_travel(rng) for _ in range(5)]
+    interests_list = [[], ["museum"], ["zoo", "beach"], ["food", "nightlife", "ski"], ["Nature"]]
+    activities = [_random_activity(rng) for _ in range(120)]
+    T = feature_tensor(travels, interests_list, prepare_activities(**activity_arrays(activities)))
+    assert T.shape == (5, 120, len(FEATURE_NAMES))
+    for u in range(5):
+        np.testing.assert_array_equal(T[u], build_feature_matrix(travels[u], interests_list[u], activities))
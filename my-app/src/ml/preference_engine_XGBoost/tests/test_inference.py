@@ -0,0 +1,119 @@
+# Tests for inference backends: probabilities must match the sklearn predict_proba path.
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.calibration import CalibratedClassifierCV
+
+from ml.preference_engine_XGBoost.features import FEATURE_NAMES
+from ml.preference_engine_XGBoost.inference import BoosterModel, FlatTreeModel, make_backend, predict_with_contribs
+from ml.preference_engine_XGBoost.model import load_model
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+MODEL_PATH = PACKAGE_DIR / "artifacts" / "model.joblib"
+
+
+@pytest.fixture(scope="module")
+def sklearn_model():
+    if not MODEL_PATH.exists():
+        pytest.skip("Model not trained. Run: python -m ml.preference_engine_XGBoost.train")
+    return load_model(MODEL_PATH, backend="sklearn")
+
+
+def _random_matrix(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).random((n, len(FEATURE_NAMES)), dtype=np.float32)
+
+
+@pytest.mark.parametrize("backend", ["booster", "numpy", "auto"])
+def test_backend_matches_predict_proba(sklearn_model, backend: str) -> None:
+    X = _random_matrix(500)
+    booster_model = make_backend(sklearn_model, backend)
+    np.testing.assert_allclose(
+        booster_model.predict_proba(X), sklearn_model.predict_proba(X), rtol=0, atol=1e-6
+    )
+    # Single-row (the /score path) and non-contiguous input
+    np.testing.assert_allclose(
+        booster_model.predict_proba(X[:1]), sklearn_model.predict_proba(X[:1]), rtol=0, atol=1e-6
+    )
+    np.testing.assert_allclose(
+        booster_model.predict_proba(X[::3]), sklearn_model.predict_proba(X[::3]), rtol=0, atol=1e-6
+    )
+
+
+def test_numpy_backend_missing_values_follow_default_direction(sklearn_model) -> None:
+    X = _random_matrix(200, seed=3)
+    X[::2, 0] = np.nan
+    X[1::3, 14] = np.nan
+    np.testing.assert_allclose(
+        make_backend(sklearn_model, "numpy").predict_proba(X), sklearn_model.predict_proba(X), rtol=0, atol=1e-6
+    )
+
+
+@pytest.mark.parametrize("backend", ["sklearn", "booster", "numpy", "auto"])
+def test_contributions_match_booster(sklearn_model, backend: str) -> None:
+    X = _random_matrix(300, seed=4)
+    expected = sklearn_model.get_booster().predict(
+        xgb.DMatrix(X), pred_contribs=True, approx_contribs=True, validate_features=False
+    )
+    proba, contribs = predict_with_contribs(make_backend(sklearn_model, backend), X)
+    assert contribs.shape == (len(X), len(FEATURE_NAMES) + 1)
+    np.testing.assert_allclose(contribs, expected, rtol=0, atol=1e-5)
+    np.testing.assert_allclose(proba, sklearn_model.predict_proba(X)[:, 1], rtol=0, atol=1e-6)
+    # Explained scores are exactly the plain ones, not re-derived from the contributions
+    np.testing.assert_array_equal(proba, make_backend(sklearn_model, backend).predict_proba(X)[:, 1])
+    # Single row (the /score path)
+    proba_1, contribs_1 = predict_with_contribs(make_backend(sklearn_model, backend), X[:1])
+    np.testing.assert_allclose(contribs_1, expected[:1], rtol=0, atol=1e-5)
+
+
+@pytest.mark.parametrize("backend", ["booster", "numpy"])
+def test_backend_exposes_importances(sklearn_model, backend: str) -> None:
+    booster_model = make_backend(sklearn_model, backend)
+    np.testing.assert_array_equal(booster_model.feature_importances_, sklearn_model.feature_importances_)
+
+
+@pytest.mark.parametrize("backend_cls", [BoosterModel, FlatTreeModel])
+@pytest.mark.parametrize("method", ["sigmoid", "isotonic"])
+def test_backend_applies_calibration(backend_cls, method: str) -> None:
+    X = _random_matrix(400, seed=1)
+    y = (X[:, 0] + 0.3 * X[:, 5] > 0.7).astype(int)
+    base = xgb.XGBClassifier(n_estimators=10, max_depth=3, random_state=0)
+    calibrated = CalibratedClassifierCV(base, method=method, cv=2).fit(X, y)
+    X_test = _random_matrix(200, seed=2)
+    np.testing.assert_allclose(
+        backend_cls(calibrated).predict_proba(X_test), calibrated.predict_proba(X_test), rtol=0, atol=1e-6
+    )
+
+
+def test_unknown_backend_rejected(sklearn_model) -> None:
+    with pytest.raises(ValueError):
+        make_backend(sklearn_model, "gpu")
+
+
+def test_backend_missing_a_hook_fails_at_construction(sklearn_model) -> None:
+    from ml.preference_engine_XGBoost.inference import _EnsembleBackend
+
+    class PredictOnly(_EnsembleBackend):
+        def _compile(self, estimator):
+            return estimator
+
+        def _predict_member(self, compiled, X):
+            return np.zeros(len(X))
+
+    with pytest.raises(TypeError, match="_contribs_member"):
+        PredictOnly(sklearn_model)
+
+
+def test_make_backend_sets_nthread(sklearn_model) -> None:
+    from ml.preference_engine_XGBoost.inference import model_members
+    from ml.preference_engine_XGBoost.model import _load_joblib_model
+
+    model = _load_joblib_model(MODEL_PATH)
+    backend = make_backend(model, "booster", nthread=1)
+    for estimator, _ in model_members(model):
+        assert estimator.get_params()["n_jobs"] == 1
+        assert '"nthread":"1"' in estimator.get_booster().save_config().replace(" ", "")
+    X = _random_matrix(200)
+    np.testing.assert_allclose(backend.predict_proba(X), sklearn_model.predict_proba(X), rtol=0, atol=1e-6)
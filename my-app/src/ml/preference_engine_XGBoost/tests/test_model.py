@@ -0,0 +1,189 @@
+# Tests for model behavior.
+
+from pathlib import Path
+
+import pytest
+
+from ml.preference_engine_XGBoost.model import load_model, predict_batch, predict_regret_probability
+from ml.preference_engine_XGBoost.schemas import ActivityInput, TravelPreferencesInput
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+MODEL_PATH = PACKAGE_DIR / "artifacts" / "model.joblib"
+
+ACTIVITIES = [
+    ActivityInput(category="museum", duration_hours=2.0, emission_kg=3.0, price_usd=25.0),
+    ActivityInput(category="nightlife", duration_hours=4.0, price_usd=80.0, typical_start_hour=22.5),
+    ActivityInput(category="ski", duration_hours=6.0, emission_kg=40.0, price_usd=150.0, typical_crowd_level=0.9),
+    ActivityInput(category="zoo", duration_hours=1.0),
+]
+
+
+@pytest.fixture(scope="module")
+def model():
+    if not MODEL_PATH.exists():
+        pytest.skip("Model not trained. Run: python -m ml.preference_engine_XGBoost.train")
+    return load_model(MODEL_PATH)
+
+
+def test_predict_batch_matches_single(model) -> None:
+    travel = TravelPreferencesInput(crowd_comfort=0.2, eco_preference=0.9)
+    interests = ["museum", "culture"]
+    batch = predict_batch(travel, interests, ACTIVITIES, model=model)
+    assert len(batch) == len(ACTIVITIES)
+    for act, scored in zip(ACTIVITIES, batch):
+        reg, _, _ = predict_regret_probability(travel, interests, act, model=model)
+        assert scored.regret_probability == pytest.approx(reg, abs=1e-4)
+        assert scored.fit_score == pytest.approx(1.0 - reg, abs=1e-4)
+        assert 0 <= scored.fit_score <= 1
+
+
+def test_predict_batch_empty(model) -> None:
+    assert predict_batch(TravelPreferencesInput(), [], [], model=model) == []
+
+
+def _random_activities(n: int, seed: int) -> list[ActivityInput]:
+    import random
+
+    rng = random.Random(seed)
+    cats = ["museum", "culture", "outdoor", "nature", "food", "nightlife", "wellness", "beach", "ski"]
+    # Few distinct values so equal fit scores (and tie-breaks) actually occur
+    return [
+        ActivityInput(
+            id=f"act-{i}",
+            category=rng.choice(cats),
+            duration_hours=rng.choice([1.0, 2.0, 4.0]),
+            emission_kg=rng.choice([0.0, 5.0, 30.0]),
+            price_usd=rng.choice([0.0, 20.0, 150.0]),
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("tie_break", [None, "emission", "price"])
+def test_rank_top_k_matches_full_sort(model, tie_break) -> None:
+    from ml.preference_engine_XGBoost.model import rank_top_k
+
+    travel = TravelPreferencesInput(eco_preference=0.7)
+    interests = ["nature", "food"]
+    activities = _random_activities(200, seed=3)
+    scores = predict_batch(travel, interests, activities, model=model)
+
+    def secondary(a: ActivityInput) -> float:
+        return {"emission": a.emission_kg, "price": a.price_usd}.get(tie_break, 0.0)
+
+    expected = sorted(range(len(activities)), key=lambda i: (-scores[i].fit_score, secondary(activities[i]), i))
+    ranked = rank_top_k(travel, interests, activities, k=15, tie_break=tie_break, model=model)
+    assert [r.index for r in ranked] == expected[:15]
+    for r in ranked:
+        assert r.id == activities[r.index].id
+        assert r.fit_score == scores[r.index].fit_score
+        assert r.explanation == scores[r.index].explanation
+
+
+def test_rank_min_fit_filters(model) -> None:
+    from ml.preference_engine_XGBoost.model import rank_top_k
+
+    activities = _random_activities(50, seed=4)
+    scores = predict_batch(TravelPreferencesInput(), ["museum"], activities, model=model)
+    threshold = sorted(s.fit_score for s in scores)[25]
+    ranked = rank_top_k(TravelPreferencesInput(), ["museum"], activities, k=50, min_fit=threshold, model=model)
+    assert len(ranked) == sum(s.fit_score >= threshold for s in scores)
+    assert all(r.fit_score >= threshold for r in ranked)
+
+
+def test_predict_matrix_matches_predict_batch(model) -> None:
+    import numpy as np
+
+    from ml.preference_engine_XGBoost.model import predict_matrix
+
+    travels = [TravelPreferencesInput(), TravelPreferencesInput(trip_pace=0.1, eco_preference=0.9)]
+    interests_list = [["museum"], []]
+    activities = _random_activities(40, seed=5)
+    fit, top_idx, top_scores = predict_matrix(travels, interests_list, activities, model=model, top_k=5)
+    assert fit.dtype == np.float32 and fit.shape == (2, 40)
+    for u in range(2):
+        expected = [s.fit_score for s in predict_batch(travels[u], interests_list[u], activities, model=model)]
+        np.testing.assert_allclose(fit[u], expected, atol=1e-4)
+        assert top_idx[u].tolist() == sorted(range(40), key=lambda i: (-fit[u, i], i))[:5]
+        np.testing.assert_array_equal(top_scores[u], fit[u, top_idx[u]])
+    # Tiny chunks (one activity per chunk) give the same matrix
+    chunked, _, _ = predict_matrix(travels, interests_list, activities, model=model, max_chunk_bytes=1)
+    np.testing.assert_allclose(chunked, fit, atol=1e-6)
+
+
+def test_predict_matrix_top_k_breaks_boundary_ties_by_index() -> None:
+    import numpy as np
+
+    from ml.preference_engine_XGBoost.model import predict_matrix
+
+    class Tiered:
+        """Regret 0.0 / 0.1 / 0.2 by row position: many activities share each fit score."""
+
+        def predict_proba(self, X):
+            p = (np.arange(len(X)) % 3) * 0.1
+            return np.column_stack((1.0 - p, p))
+
+    activities = [ActivityInput()] * 10
+    fit, top_idx, top_scores = predict_matrix([TravelPreferencesInput()], [[]], activities, model=Tiered(), top_k=5)
+    # Four activities at fit 1.0 (0, 3, 6, 9), then the 5th place among three tied at 0.9 goes to index 1
+    assert top_idx[0].tolist() == [0, 3, 6, 9, 1]
+    np.testing.assert_array_equal(top_scores[0], fit[0, [0, 3, 6, 9, 1]])
+
+
+def test_iter_batch_chunks_matches_predict_batch(model) -> None:
+    from ml.preference_engine_XGBoost.model import iter_batch_chunks
+
+    travel = TravelPreferencesInput(crowd_comfort=0.2)
+    activities = _random_activities(25, seed=9)
+    chunks = list(iter_batch_chunks(travel, ["food"], activities, model=model, chunk_size=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert [s for c in chunks for s in c] == predict_batch(travel, ["food"], activities, model=model)
+
+
+def test_predict_batch_arrays_matches_predict_batch(model) -> None:
+    from ml.preference_engine_XGBoost.model import predict_batch_arrays
+    from ml.preference_engine_XGBoost.schemas import ActivityColumns
+
+    activities = _random_activities(30, seed=3)
+    columns = ActivityColumns(
+        category=[a.category for a in activities],
+        duration_hours=[a.duration_hours for a in activities],
+        emission_kg=[a.emission_kg for a in activities],
+        price_usd=[a.price_usd for a in activities],
+        typical_start_hour=[a.typical_start_hour for a in activities],
+        typical_crowd_level=[a.typical_crowd_level for a in activities],
+    )
+    travel = TravelPreferencesInput(morning_tolerance=0.9)
+    assert predict_batch_arrays(travel, ["zoo"], columns.arrays(), model=model) == predict_batch(
+        travel, ["zoo"], activities, model=model
+    )
+
+
+@pytest.mark.parametrize("backend", ["booster", "numpy", "auto"])
+def test_explain_does_not_change_scores(backend: str) -> None:
+    import numpy as np
+
+    from ml.preference_engine_XGBoost.inference import AUTO_NUMPY_MAX_ROWS
+
+    if not MODEL_PATH.exists():
+        pytest.skip("Model not trained. Run: python -m ml.preference_engine_XGBoost.train")
+    model = load_model(MODEL_PATH, backend=backend)
+    rng = np.random.default_rng(0)
+    n = 50 * AUTO_NUMPY_MAX_ROWS
+    cats = ["museum", "culture", "outdoor", "nature", "food", "nightlife", "wellness", "beach", "ski"]
+    activities = [
+        ActivityInput(
+            category=cats[i % len(cats)],
+            duration_hours=float(rng.uniform(0.5, 8.0)),
+            emission_kg=float(rng.uniform(0.0, 40.0)),
+            price_usd=float(rng.uniform(0.0, 200.0)),
+            typical_start_hour=float(rng.uniform(6.0, 23.0)),
+        )
+        for i in range(n)
+    ]
+    travel = TravelPreferencesInput(eco_preference=0.8, crowd_comfort=0.3)
+    plain = predict_batch(travel, ["museum", "food"], activities, model=model, explain=False)
+    explained = predict_batch(travel, ["museum", "food"], activities, model=model, explain=True)
+    assert [(s.fit_score, s.regret_probability) for s in explained] == [
+        (s.fit_score, s.regret_probability) for s in plain
+    ]
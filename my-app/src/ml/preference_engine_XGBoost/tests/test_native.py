@@ -0,0 +1,129 @@
+# Tests for the native XGBoost artifact (UBJSON boosters + sidecar): parity with joblib, checksums, fallback.
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.calibration import CalibratedClassifierCV
+
+from ml.preference_engine_XGBoost.features import FEATURE_NAMES
+from ml.preference_engine_XGBoost.inference import NativeModel, make_backend
+from ml.preference_engine_XGBoost.model import _load_joblib_model, artifact_path, load_model
+from ml.preference_engine_XGBoost.native import export_native, load_native, sidecar_matches, sidecar_path
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+MODEL_PATH = PACKAGE_DIR / "artifacts" / "model.joblib"
+
+
+@pytest.fixture(scope="module")
+def sklearn_model():
+    if not MODEL_PATH.exists():
+        pytest.skip("Model not trained. Run: python -m ml.preference_engine_XGBoost.train")
+    return _load_joblib_model(MODEL_PATH)
+
+
+@pytest.fixture
+def exported(tmp_path, sklearn_model) -> Path:
+    path = tmp_path / "model.joblib"
+    shutil.copy(MODEL_PATH, path)
+    export_native(sklearn_model, path)
+    return path
+
+
+def _random_matrix(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).random((n, len(FEATURE_NAMES)), dtype=np.float32)
+
+
+@pytest.mark.parametrize("backend", ["booster", "numpy", "auto"])
+def test_native_matches_joblib(sklearn_model, exported: Path, backend: str) -> None:
+    model = load_model(exported, backend=backend)
+    assert model.load_info["format"] == "native"
+    assert model.load_info["path"] == str(sidecar_path(exported))
+    X = _random_matrix(300)
+    np.testing.assert_allclose(model.predict_proba(X), sklearn_model.predict_proba(X), rtol=0, atol=1e-6)
+    np.testing.assert_allclose(model.feature_importances_, sklearn_model.feature_importances_, rtol=1e-6)
+
+
+@pytest.mark.parametrize("method", ["sigmoid", "isotonic"])
+def test_native_round_trips_calibration(tmp_path, method: str) -> None:
+    X = _random_matrix(400, seed=1)
+    y = (X[:, 0] + 0.3 * X[:, 5] > 0.7).astype(int)
+    calibrated = CalibratedClassifierCV(xgb.XGBClassifier(n_estimators=10, max_depth=3), method=method, cv=2)
+    calibrated.fit(X, y)
+    sidecar = export_native(calibrated, tmp_path / "model.joblib")
+    assert sorted(p.name for p in tmp_path.glob("*.ubj")) == ["model.0.ubj", "model.1.ubj"]
+    native = load_native(sidecar)
+    X_test = _random_matrix(200, seed=2)
+    np.testing.assert_allclose(
+        make_backend(native, "booster").predict_proba(X_test), calibrated.predict_proba(X_test), rtol=0, atol=1e-6
+    )
+
+
+def test_checksum_mismatch_rejected(exported: Path) -> None:
+    booster_file = exported.with_name("model.ubj")
+    booster_file.write_bytes(booster_file.read_bytes()[:-10])
+    with pytest.raises(ValueError, match="checksum"):
+        load_native(sidecar_path(exported))
+
+
+def test_feature_name_mismatch_rejected(exported: Path) -> None:
+    sidecar = sidecar_path(exported)
+    meta = json.loads(sidecar.read_text())
+    meta["feature_names"] = meta["feature_names"][::-1]
+    sidecar.write_text(json.dumps(meta))
+    with pytest.raises(ValueError, match="feature names"):
+        load_native(sidecar)
+
+
+def test_falls_back_to_joblib(exported: Path) -> None:
+    assert artifact_path(exported) == sidecar_path(exported)
+    assert artifact_path(exported, fmt="joblib") == exported
+    assert artifact_path(exported, backend="sklearn") == exported
+    sidecar_path(exported).unlink()
+    assert artifact_path(exported) == exported
+    model = load_model(exported, backend="booster")
+    assert model.load_info["format"] == "joblib"
+    assert model.load_info["checksum"] is None
+
+
+def test_replaced_joblib_is_not_shadowed_by_a_stale_sidecar(exported: Path) -> None:
+    import joblib
+
+    sidecar = sidecar_path(exported)
+    # A new mtime with the same bytes (e.g. a checkout) still matches
+    st = exported.stat()
+    os.utime(exported, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert sidecar_matches(sidecar, exported)
+    assert artifact_path(exported) == sidecar
+    # Replacing model.joblib alone: the sidecar describes the old model
+    X = _random_matrix(200, seed=5)
+    replacement = xgb.XGBClassifier(n_estimators=5, max_depth=2).fit(X, (X[:, 0] > 0.5).astype(int))
+    joblib.dump(replacement, exported)
+    assert not sidecar_matches(sidecar, exported)
+    assert artifact_path(exported) == exported
+    model = load_model(exported, backend="booster")
+    assert model.load_info["format"] == "joblib"
+    np.testing.assert_allclose(model.predict_proba(X), replacement.predict_proba(X), rtol=0, atol=1e-6)
+    with pytest.raises(ValueError, match="not exported from the current"):
+        artifact_path(exported, fmt="native")
+    export_native(replacement, exported)
+    assert artifact_path(exported) == sidecar
+
+
+def test_sidecar_without_source_is_not_trusted(exported: Path) -> None:
+    sidecar = sidecar_path(exported)
+    meta = json.loads(sidecar.read_text())
+    del meta["source"]
+    sidecar.write_text(json.dumps(meta))
+    assert artifact_path(exported) == exported
+
+
+def test_sklearn_backend_needs_joblib(exported: Path) -> None:
+    native = load_native(sidecar_path(exported))
+    assert isinstance(native, NativeModel)
+    with pytest.raises(ValueError, match="joblib"):
+        make_backend(native, "sklearn")
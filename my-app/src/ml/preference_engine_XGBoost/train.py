@@ -1,4 +1,4 @@
-# Train XGBoost preference model and save to artifacts/model.joblib.
+# Train XGBoost preference model and save to artifacts/model.joblib (+ native model.ubj / model.native.json).
 # Usage: from src/ run: python -m ml.preference_engine_XGBoost.train
 
 import json
@@ -28,6 +28,7 @@ from ml.preference_engine_XGBoost.config.defaults import (
     XGBOOST_SUBSAMPLE,
 )
 from ml.preference_engine_XGBoost.features import FEATURE_NAMES
+from ml.preference_engine_XGBoost.native import export_native
 from ml.preference_engine_XGBoost.synthetic_data import generate_dataset, save_dataset
 
 ARTIFACTS_DIR = Path(DEFAULT_MODEL_PATH).parent
@@ -93,6 +94,7 @@ def main() -> None:
         raise SystemExit("joblib required: pip install joblib")
     with open(DEFAULT_MODEL_PATH, "wb") as f:
         joblib.dump(model, f)
+    sidecar = export_native(model, DEFAULT_MODEL_PATH)
     metadata = {
         "feature_names": FEATURE_NAMES,
         "n_samples": n_samples,
@@ -101,7 +103,7 @@ def main() -> None:
     }
     with open(METADATA_PATH, "w") as f:
         json.dump(metadata, f, indent=2)
-    print(f"Saved model to {DEFAULT_MODEL_PATH}, metadata to {METADATA_PATH}")
+    print(f"Saved model to {DEFAULT_MODEL_PATH} (native: {sidecar}), metadata to {METADATA_PATH}")
 
 
 if __name__ == "__main__":
@@ -1,43 +1,130 @@
 # FastAPI app for local testing; can be wrapped with Modal later.
 
 from contextlib import asynccontextmanager
-from typing import Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 
-from .model import load_model, predict
-from .schemas import PredictRequest, PredictResponse
+from ..serving.admin import admin_router
+from ..serving.admission import ADMISSION, INTERACTIVE, lane_for
+from ..serving.metrics import instrument, record_batch_size, timed
+from ..serving.registry import shared_registry
+from .model import _resolve_model_path, load_model, predict, predict_itinerary
+from .session import ItinerarySession, SessionStore
+from .schemas import (
+    ItineraryDelta,
+    ItineraryEdit,
+    ItineraryItem,
+    ItinerarySessionResponse,
+    PredictItineraryRequest,
+    PredictItineraryResponse,
+    PredictRequest,
+    PredictResponse,
+    UserPreferences,
+)
 
-_model: Optional[object] = None
+
+def _warmup(model) -> None:
+    predict(prefs=UserPreferences(), item=ItineraryItem(), model=model)
+
+
+_registry = shared_registry("regret_protection_engine", load_model, _resolve_model_path(), warmup=_warmup)
+_sessions = SessionStore()
 
 
 def get_model():
-    global _model
-    if _model is None:
-        _model = load_model()
-    return _model
+    return _registry.get()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
         get_model()
+        _registry.start_watching()
         yield
     finally:
-        pass
+        _registry.stop_watching()
 
 
 app = FastAPI(title="Regret Protection Engine", description="Safety-first regret-risk prediction", lifespan=lifespan)
+app.include_router(admin_router(_registry))
+instrument(app, "regret_protection_engine", _registry)
 
 
 @app.post("/predict", response_model=PredictResponse)
-def predict_endpoint(body: PredictRequest) -> PredictResponse:
+@timed
+async def predict_endpoint(body: PredictRequest) -> PredictResponse:
+    return await ADMISSION.run(INTERACTIVE, _predict, body)
+
+
+def _predict(body: PredictRequest) -> PredictResponse:
     model = get_model()
     ctx = body.context
     pred = predict(prefs=body.user_preferences, item=body.itinerary_item, ctx=ctx, model=model)
     return PredictResponse(prediction=pred)
 
 
+@app.post("/predict_itinerary", response_model=PredictItineraryResponse)
+@timed
+async def predict_itinerary_endpoint(body: PredictItineraryRequest) -> PredictItineraryResponse:
+    n_items = sum(len(day.items) for day in body.days)
+    record_batch_size(n_items)
+    return await ADMISSION.run(lane_for(n_items), _predict_itinerary, body)
+
+
+def _predict_itinerary(body: PredictItineraryRequest) -> PredictItineraryResponse:
+    days = predict_itinerary(
+        prefs=body.user_preferences,
+        days=[day.items for day in body.days],
+        ctx=body.context,
+        model=get_model(),
+    )
+    return PredictItineraryResponse(days=days)
+
+
+@app.post("/itinerary_sessions", response_model=ItinerarySessionResponse)
+@timed
+async def create_itinerary_session(body: PredictItineraryRequest) -> ItinerarySessionResponse:
+    n_items = sum(len(day.items) for day in body.days)
+    record_batch_size(n_items)
+    return await ADMISSION.run(lane_for(n_items), _create_itinerary_session, body)
+
+
+def _create_itinerary_session(body: PredictItineraryRequest) -> ItinerarySessionResponse:
+    session = ItinerarySession(
+        prefs=body.user_preferences,
+        days=[day.items for day in body.days],
+        ctx=body.context,
+        model=get_model(),
+    )
+    return ItinerarySessionResponse(session_id=_sessions.add(session), days=session.days())
+
+
+@app.post("/itinerary_sessions/{session_id}/edits", response_model=ItineraryDelta)
+@timed
+async def edit_itinerary_session(session_id: str, body: ItineraryEdit) -> ItineraryDelta:
+    session = _sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired itinerary session")
+    try:
+        return await ADMISSION.run(INTERACTIVE, _edit_itinerary_session, session, body)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _edit_itinerary_session(session: ItinerarySession, edit: ItineraryEdit) -> ItineraryDelta:
+    # After a hot reload the session re-scores every item with the new model as part of this edit
+    model = get_model()
+    with session.lock:
+        return session.apply(edit, model=model)
+
+
+@app.delete("/itinerary_sessions/{session_id}")
+def delete_itinerary_session(session_id: str) -> dict:
+    if not _sessions.remove(session_id):
+        raise HTTPException(status_code=404, detail="Unknown or expired itinerary session")
+    return {"session_id": session_id, "deleted": True}
+
+
 @app.get("/health")
 def health() -> dict:
-    return {"status": "ok", "engine": "regret_protection"}
+    return {"status": "ok", "engine": "regret_protection", "model": _registry.info(), "sessions": _sessions.stats()}
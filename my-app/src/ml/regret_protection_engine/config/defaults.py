@@ -1,5 +1,7 @@
 # Stricter thresholds and config for "safety first" regret protection.
 
+import os
+
 RISK_LOW_MAX = 0.25
 RISK_MEDIUM_MAX = 0.55
 
@@ -32,7 +34,12 @@ WALK_COMFORT_KM_MAX = 10.0
 EARLY_START_HOUR = 8.0
 LATE_NIGHT_HOUR = 22.0
 DEFAULT_MODEL_PATH = "data/model.pkl"
+# NumPy export of the same model (linear.py); preferred over the pickle when present
+ARRAY_MODEL_PATH = "data/model.npz"
 MAX_REASONS = 4
+# Itinerary scoring sessions (session.py): kept in process memory, dropped after SESSION_TTL_SECONDS unused
+SESSION_MAX_ENTRIES = int(os.environ.get("REGRET_PROTECTION_ENGINE_SESSION_MAX_ENTRIES", "1000"))
+SESSION_TTL_SECONDS = float(os.environ.get("REGRET_PROTECTION_ENGINE_SESSION_TTL_SECONDS", "1800"))
 
 FEATURE_COLUMNS = [
     "pace_overage",
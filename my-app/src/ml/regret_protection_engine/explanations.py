@@ -1,10 +1,74 @@
 # Map feature contributions to human-readable reasons.
 
-from typing import Any
+from typing import Any, Sequence
 
-from .config.defaults import FEATURE_NAMES_MISMATCH, MAX_REASONS, REASON_MESSAGES
+import numpy as np
+
+from .config.defaults import FEATURE_COLUMNS, FEATURE_NAMES_MISMATCH, MAX_REASONS, REASON_MESSAGES
 from .schemas import RegretReason
 
+MIN_CONTRIBUTION = 1e-6
+
+
+class ReasonWeights:
+    """A model's coefficients for the mismatch features, resolved against the feature columns once.
+
+    load_model attaches one to the model as model.reason_weights; get_reasons_batch builds it on the fly otherwise.
+    """
+
+    def __init__(self, model: Any, feature_columns: Sequence[str] = FEATURE_COLUMNS):
+        self.feature_columns = list(feature_columns)
+        base = model
+        if hasattr(model, "calibrated_classifiers_"):
+            base = model.calibrated_classifiers_[0].estimator
+        idx = {c: i for i, c in enumerate(self.feature_columns)}
+        names = [n for n in FEATURE_NAMES_MISMATCH if n in idx] if hasattr(base, "coef_") else []
+        self.columns = np.array([idx[n] for n in names], dtype=np.intp)
+        self.coef = np.asarray(base.coef_[0], dtype=np.float64)[self.columns] if names else np.empty(0)
+        # (code, message) per mismatch feature; None for a feature without a message (ranked, never shown)
+        self.messages = [REASON_MESSAGES.get(n) for n in names]
+
+
+def reason_weights(model: Any, feature_columns: Sequence[str] = FEATURE_COLUMNS) -> ReasonWeights:
+    weights = getattr(model, "reason_weights", None)
+    if isinstance(weights, ReasonWeights) and weights.feature_columns == list(feature_columns):
+        return weights
+    return ReasonWeights(model, feature_columns)
+
+
+def get_reasons_batch(
+    model: Any,
+    X: np.ndarray,
+    feature_columns: Sequence[str] = FEATURE_COLUMNS,
+    top_k: int = MAX_REASONS,
+) -> list[list[RegretReason]]:
+    """get_reasons for every row of X (N x len(feature_columns)).
+
+    Contributions (feature value x coefficient) come from one element-wise multiply. A stable argsort picks each
+    row's top_k, so ties keep FEATURE_NAMES_MISMATCH order. That gives the same selection as sorting row by row;
+    with 9 mismatch features the sort costs no more than argpartition. RegretReason objects are only built for
+    the selected entries.
+    """
+    weights = reason_weights(model, feature_columns)
+    if not len(weights.columns):
+        return [[] for _ in range(len(X))]
+    contrib = np.asarray(X, dtype=np.float64)[:, weights.columns] * weights.coef
+    contrib[~(contrib > MIN_CONTRIBUTION)] = -np.inf
+    order = np.argsort(-contrib, axis=1, kind="stable")[:, :top_k]
+    top = np.take_along_axis(contrib, order, axis=1)
+    out = []
+    for row_order, row_top in zip(order.tolist(), top.tolist()):
+        reasons = []
+        for j, strength in zip(row_order, row_top):
+            if strength == -np.inf:
+                break
+            message = weights.messages[j]
+            if message is not None:
+                code, text = message
+                reasons.append(RegretReason(code=code, message=text, strength=round(min(1.0, strength), 4)))
+        out.append(reasons)
+    return out
+
 
 def get_reasons(
     model: Any,
@@ -12,33 +76,5 @@ def get_reasons(
     feature_columns: list[str],
     top_k: int = MAX_REASONS,
 ) -> list[RegretReason]:
-    base = model
-    if hasattr(model, "calibrated_classifiers_"):
-        base = model.calibrated_classifiers_[0].estimator
-    if not hasattr(base, "coef_"):
-        return []
-    coef = base.coef_[0]
-    try:
-        idx = {c: i for i, c in enumerate(feature_columns)}
-    except Exception:
-        return []
-    contributions: list[tuple[str, float]] = []
-    for name in FEATURE_NAMES_MISMATCH:
-        if name not in idx:
-            continue
-        val = features.get(name, 0.0)
-        c = coef[idx[name]]
-        contrib = val * c
-        if contrib > 1e-6:
-            contributions.append((name, contrib))
-    contributions.sort(key=lambda x: -x[1])
-    top = contributions[:top_k]
-    reasons = []
-    for name, strength in top:
-        if name not in REASON_MESSAGES:
-            continue
-        code, message = REASON_MESSAGES[name]
-        reasons.append(
-            RegretReason(code=code, message=message, strength=round(min(1.0, strength), 4))
-        )
-    return reasons
+    row = np.array([[features.get(c, 0.0) for c in feature_columns]], dtype=np.float64)
+    return get_reasons_batch(model, row, feature_columns, top_k)[0]
@@ -0,0 +1,126 @@
+# Logistic model as plain NumPy arrays: export from the trained sklearn model, load and predict without
+# pandas / sklearn / pickle. Convert an existing model: from src/ run: python -m ml.regret_protection_engine.linear
+
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+if __name__ == "__main__":
+    src = Path(__file__).resolve().parents[2]
+    if str(src) not in sys.path:
+        sys.path.insert(0, str(src))
+
+from ml.regret_protection_engine.config.defaults import FEATURE_COLUMNS
+
+CALIBRATIONS = ("none", "sigmoid", "isotonic")
+
+
+class LinearModel:
+    """predict_proba = sigmoid(X @ coef + intercept) per member, mapped by the member's calibration, averaged.
+
+    One member for a plain LogisticRegression; one per fold for a CalibratedClassifierCV (like sklearn).
+    coef_ is the first member's (1 x F), which is what get_reasons reads for calibrated models too.
+    """
+
+    def __init__(
+        self,
+        coef: np.ndarray,
+        intercept: np.ndarray,
+        feature_columns: list[str],
+        calibrations: Optional[list[tuple[str, np.ndarray, np.ndarray]]] = None,
+    ):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64).reshape(len(intercept), -1)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.feature_columns = list(feature_columns)
+        self.calibrations = calibrations or [("none", np.empty(0), np.empty(0))] * len(self.intercept)
+        self.coef_ = self.coef[:1]
+        self.intercept_ = self.intercept[:1]
+
+    def predict_positive(self, X: np.ndarray) -> np.ndarray:
+        margin = np.asarray(X, dtype=np.float64) @ self.coef.T + self.intercept  # N x members
+        return self.probability_from_margin(margin)
+
+    def probability_from_margin(self, margin: np.ndarray) -> np.ndarray:
+        """Positive-class probability from the members' margins (N x members): calibrate each, then average."""
+        p = 1.0 / (1.0 + np.exp(-margin))
+        for j, (method, a, b) in enumerate(self.calibrations):
+            if method == "sigmoid":
+                # sklearn's _SigmoidCalibration on the decision function: 1 / (1 + exp(a * f + b))
+                p[:, j] = 1.0 / (1.0 + np.exp(a[0] * margin[:, j] + b[0]))
+            elif method == "isotonic":
+                p[:, j] = np.interp(margin[:, j], a, b)
+        return p.mean(axis=1)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        p = self.predict_positive(X)
+        return np.column_stack((1.0 - p, p))
+
+
+def _members(model: Any) -> list[tuple[Any, Optional[Any]]]:
+    if hasattr(model, "calibrated_classifiers_"):
+        return [(cc.estimator, cc.calibrators[0]) for cc in model.calibrated_classifiers_]
+    return [(model, None)]
+
+
+def _calibration(calibrator: Any) -> tuple[str, np.ndarray, np.ndarray]:
+    if calibrator is None:
+        return "none", np.empty(0), np.empty(0)
+    if hasattr(calibrator, "a_") and hasattr(calibrator, "b_"):
+        return "sigmoid", np.array([calibrator.a_], dtype=np.float64), np.array([calibrator.b_], dtype=np.float64)
+    if hasattr(calibrator, "X_thresholds_") and hasattr(calibrator, "y_thresholds_"):
+        return (
+            "isotonic",
+            np.asarray(calibrator.X_thresholds_, dtype=np.float64),
+            np.asarray(calibrator.y_thresholds_, dtype=np.float64),
+        )
+    raise ValueError(f"Unsupported calibrator {type(calibrator).__name__}")
+
+
+def export_linear(model: Any, path: Path | str) -> Path:
+    """Write coef / intercept / calibration of a fitted binary logistic model (optionally calibrated) as .npz."""
+    members = _members(model)
+    arrays: dict[str, np.ndarray] = {
+        "feature_columns": np.array(FEATURE_COLUMNS),
+        "coef": np.stack([np.asarray(est.coef_, dtype=np.float64)[0] for est, _ in members]),
+        "intercept": np.array([float(np.ravel(est.intercept_)[0]) for est, _ in members]),
+    }
+    methods = []
+    for i, (_, calibrator) in enumerate(members):
+        method, a, b = _calibration(calibrator)
+        methods.append(method)
+        arrays[f"calibration_a_{i}"] = a
+        arrays[f"calibration_b_{i}"] = b
+    arrays["calibration"] = np.array(methods)
+    path = Path(path)
+    tmp = path.with_name(path.stem + ".tmp.npz")
+    np.savez(tmp, **arrays)
+    tmp.replace(path)
+    return path
+
+
+def load_linear(path: Path | str) -> LinearModel:
+    """Load an export_linear artifact; no pickle (allow_pickle=False), feature order checked against config."""
+    with np.load(path, allow_pickle=False) as f:
+        columns = f["feature_columns"].tolist()
+        if columns != FEATURE_COLUMNS:
+            raise ValueError(f"{path}: feature columns do not match config FEATURE_COLUMNS; retrain or re-export")
+        methods = f["calibration"].tolist()
+        if any(m not in CALIBRATIONS for m in methods):
+            raise ValueError(f"{path}: unsupported calibration {methods}")
+        calibrations = [(m, f[f"calibration_a_{i}"], f[f"calibration_b_{i}"]) for i, m in enumerate(methods)]
+        return LinearModel(f["coef"], f["intercept"], columns, calibrations)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    from ml.regret_protection_engine.model import PICKLE_MODEL_PATH, load_model
+
+    argv = sys.argv[1:] if argv is None else argv
+    src = Path(argv[0]) if argv else PICKLE_MODEL_PATH
+    out = export_linear(load_model(src), src.with_suffix(".npz"))
+    print(f"Exported {src} -> {out}")
+
+
+if __name__ == "__main__":
+    main()
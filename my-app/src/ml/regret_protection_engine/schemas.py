@@ -73,3 +73,70 @@ class PredictRequest(BaseModel):
 
 class PredictResponse(BaseModel):
     prediction: RegretPrediction
+
+
+MAX_ITEMS_PER_DAY = 20
+
+
+class ItineraryDay(BaseModel):
+    # Visiting order; an empty day is a rest day
+    items: list[ItineraryItem] = Field(default_factory=list, max_length=MAX_ITEMS_PER_DAY)
+
+
+class PredictItineraryRequest(BaseModel):
+    user_preferences: UserPreferences
+    days: list[ItineraryDay] = Field(..., min_length=1, max_length=30)
+    context: Optional[Context] = None
+
+
+class DayPrediction(BaseModel):
+    day_number: int
+    predictions: list[RegretPrediction]
+    # Riskiest item of the day; None for a day without items
+    max_regret_probability: Optional[float] = Field(None, ge=0.0, le=1.0)
+    max_risk_bucket: Optional[RiskBucket] = None
+    max_risk_index: Optional[int] = None
+
+
+class PredictItineraryResponse(BaseModel):
+    days: list[DayPrediction]
+
+
+EditOp = Literal["insert", "remove", "move", "modify"]
+
+
+class ItineraryEdit(BaseModel):
+    # day_number is 1-based like DayPrediction, index 0-based like max_risk_index
+    op: EditOp
+    day_number: int = Field(..., ge=1)
+    index: int = Field(..., ge=0)
+    # insert, modify
+    item: Optional[ItineraryItem] = None
+    # move; to_index is the item's position in the target day after the move
+    to_day_number: Optional[int] = Field(None, ge=1)
+    to_index: Optional[int] = Field(None, ge=0)
+
+
+class PredictionChange(BaseModel):
+    index: int
+    prediction: RegretPrediction
+
+
+class DayDelta(BaseModel):
+    day_number: int
+    n_items: int
+    # Items whose prediction changed (inserted ones included), by position after the edit
+    changes: list[PredictionChange]
+    max_regret_probability: Optional[float] = Field(None, ge=0.0, le=1.0)
+    max_risk_bucket: Optional[RiskBucket] = None
+    max_risk_index: Optional[int] = None
+
+
+class ItineraryDelta(BaseModel):
+    # Only days whose items or predictions changed
+    days: list[DayDelta]
+
+
+class ItinerarySessionResponse(BaseModel):
+    session_id: str
+    days: list[DayPrediction]
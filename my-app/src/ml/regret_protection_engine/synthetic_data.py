@@ -7,7 +7,7 @@ import numpy as np
 import pandas as pd
 
 from .config.defaults import FEATURE_COLUMNS
-from .features import build_features
+from .features import build_feature_matrix
 from .schemas import Context, ItineraryItem, UserPreferences
 
 TRAVEL_VIBES = ["Chill", "Adventure", "Family", "Romantic", "Nightlife"]
@@ -69,23 +69,29 @@ def sample_itinerary_item() -> ItineraryItem:
     )
 
 
+HEURISTIC_WEIGHTS = {
+    "pace_overage": 0.22,
+    "walk_over_tolerance_km": 0.25,
+    "early_start_violation": 0.22,
+    "crowd_mismatch": 0.12,
+    "budget_overrun": 0.08,
+    "outdoor_bad_weather": 0.18,
+    "late_night_after_early": 0.12,
+    "noise_mismatch": 0.04,
+    "spontaneity_mismatch": 0.03,
+}
+
+
+def heuristic_regret_scores(X: np.ndarray) -> np.ndarray:
+    """Heuristic regret score per row of a build_feature_matrix matrix."""
+    raw = 0
+    for name, weight in HEURISTIC_WEIGHTS.items():
+        raw = raw + X[:, FEATURE_COLUMNS.index(name)] * weight
+    return np.clip(1.0 - np.exp(-2.8 * raw), 0.0, 1.0)
+
+
 def heuristic_regret_score(prefs: UserPreferences, item: ItineraryItem, ctx: Context | None = None) -> float:
-    ctx = ctx or Context()
-    feats = build_features(prefs, item, ctx)
-    w = {
-        "pace_overage": 0.22,
-        "walk_over_tolerance_km": 0.25,
-        "early_start_violation": 0.22,
-        "crowd_mismatch": 0.12,
-        "budget_overrun": 0.08,
-        "outdoor_bad_weather": 0.18,
-        "late_night_after_early": 0.12,
-        "noise_mismatch": 0.04,
-        "spontaneity_mismatch": 0.03,
-    }
-    raw = sum(feats.get(k, 0.0) * w.get(k, 0) for k in w)
-    p = 1.0 - np.exp(-2.8 * raw)
-    return float(np.clip(p, 0.0, 1.0))
+    return float(heuristic_regret_scores(build_feature_matrix(prefs, [item], [ctx]))[0])
 
 
 def sample_low_regret_item(prefs: UserPreferences) -> ItineraryItem:
@@ -123,7 +129,7 @@ def generate_dataset(
     include_context: bool = True,
 ) -> pd.DataFrame:
     _set_seed()
-    rows = []
+    users, items, ctxs, labels = [], [], [], []
     n_half = n_samples // 2
     for i in range(n_samples):
         prefs = sample_user_preferences(1)[0]
@@ -139,13 +145,15 @@ def generate_dataset(
                 previous_day_walking_km=float(np.random.uniform(0, 12)),
                 previous_day_end_hour=float(np.random.uniform(18, 24)),
             )
-        score = heuristic_regret_score(prefs, item, ctx)
-        feats = build_features(prefs, item, ctx)
-        row = {c: feats.get(c, 0.0) for c in FEATURE_COLUMNS}
-        row["regret_score"] = score
-        row["regret"] = label
-        rows.append(row)
-    return pd.DataFrame(rows)
+        users.append(prefs)
+        items.append(item)
+        ctxs.append(ctx)
+        labels.append(label)
+    X = build_feature_matrix(users, items, ctxs)
+    df = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+    df["regret_score"] = heuristic_regret_scores(X)
+    df["regret"] = labels
+    return df
 
 
 def save_dataset(df: pd.DataFrame, path: Path | str) -> None:
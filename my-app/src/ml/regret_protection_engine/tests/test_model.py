@@ -4,8 +4,9 @@ from pathlib import Path
 
 import pytest
 
-from ml.regret_protection_engine.model import load_model, predict
-from ml.regret_protection_engine.schemas import ItineraryItem, UserPreferences
+from ml.regret_protection_engine.features import chain_itinerary
+from ml.regret_protection_engine.model import load_model, predict, predict_itinerary
+from ml.regret_protection_engine.schemas import Context, ItineraryItem, UserPreferences
 
 PACKAGE_DIR = Path(__file__).resolve().parents[1]
 MODEL_PATH = PACKAGE_DIR / "data" / "model.pkl"
@@ -48,3 +49,24 @@ def test_extreme_overpacked_higher_risk_than_chill(model) -> None:
     pred_chill = predict(low_pace_user, chill_item, model=model)
     pred_packed = predict(low_pace_user, packed_item, model=model)
     assert pred_packed.regret_probability >= pred_chill.regret_probability - 0.01
+
+
+def test_predict_itinerary_matches_per_item_predict(model) -> None:
+    prefs = UserPreferences(pace=0.3, walking_effort=0.2, late_night_tolerance=0.2)
+    days = [
+        [ItineraryItem(start_hour=6.0, walking_km=5.0), ItineraryItem(start_hour=21.0, end_hour=23.0, walking_km=6.0)],
+        [ItineraryItem(start_hour=8.0, walking_km=3.0, is_late_night=True)],
+        [],
+    ]
+    ctx = Context(recent_pace_score=0.6)
+    result = predict_itinerary(prefs, days, ctx, model=model)
+    assert [d.day_number for d in result] == [1, 2, 3]
+    for day, chained in zip(result, chain_itinerary(days, ctx)):
+        assert day.predictions == [predict(prefs, item, c, model=model) for item, c in chained]
+        if day.predictions:
+            probs = [p.regret_probability for p in day.predictions]
+            assert day.max_regret_probability == max(probs)
+            assert day.max_risk_index == probs.index(max(probs))
+            assert day.max_risk_bucket == day.predictions[day.max_risk_index].risk_bucket
+        else:
+            assert day.max_regret_probability is None and day.max_risk_bucket is None
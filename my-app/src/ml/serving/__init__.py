@@ -0,0 +1 @@
+# Shared serving infrastructure for the engine APIs (model registry, admin routes)
@@ -0,0 +1,29 @@
+# Admin routes shared by the engine APIs: POST /admin/reload.
+
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from .config.defaults import ADMIN_TOKEN
+from .registry import ModelRegistry
+
+
+def admin_router(registry: ModelRegistry, token: Optional[str] = ADMIN_TOKEN) -> APIRouter:
+    """Admin routes for one registry; without a token they are disabled (403), since a reload costs a load + warm-up."""
+    router = APIRouter(prefix="/admin", tags=["admin"])
+
+    @router.post("/reload")
+    def reload(force: bool = False, x_admin_token: Optional[str] = Header(None)) -> dict:
+        """Load + warm the artifact again if it changed (or force=true) and swap it in; serving continues meanwhile."""
+        if token is None:
+            raise HTTPException(status_code=403, detail="Admin routes are disabled; set ML_ADMIN_TOKEN to enable them")
+        if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), token.encode()):
+            raise HTTPException(status_code=403, detail="Invalid admin token")
+        try:
+            registry.reload(force=force)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Reload failed, keeping current model: {e}")
+        return {"status": "ok", "model": registry.info()}
+
+    return router
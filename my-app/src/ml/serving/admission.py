@@ -0,0 +1,213 @@
+# Admission control: a bounded two-lane queue in front of the inference pool, with fail-fast shedding.
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from . import executor
+from .config.defaults import (
+    ADMISSION_BULK_DEADLINE_MS,
+    ADMISSION_BULK_MAX_QUEUE,
+    ADMISSION_ENABLED,
+    ADMISSION_INTERACTIVE_DEADLINE_MS,
+    ADMISSION_INTERACTIVE_MAX_ITEMS,
+    ADMISSION_INTERACTIVE_MAX_QUEUE,
+)
+from .metrics import METRICS, Metrics, add_stage
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)  # scheduling order
+_EWMA_ALPHA = 0.2
+
+
+def lane_for(n_items: int) -> str:
+    return INTERACTIVE if n_items <= ADMISSION_INTERACTIVE_MAX_ITEMS else BULK
+
+
+class Overloaded(HTTPException):
+    """503 + Retry-After: the request would not get an inference slot within its lane's deadline."""
+
+    def __init__(self, lane: str, reason: str, retry_after_s: float):
+        super().__init__(
+            status_code=503,
+            detail=f"Inference capacity exhausted ({lane} lane, {reason}); retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after_s)))},
+        )
+        self.lane = lane
+        self.reason = reason
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+class AdmissionController:
+    """At most capacity() inference calls run at once; the rest wait in per-lane FIFO queues.
+
+    A freed slot goes to the oldest interactive waiter, and to bulk only when no interactive work is waiting. On
+    arrival a request is shed (Overloaded -> 503) when its lane is full or when the expected wait -- the work
+    queued ahead of it at each lane's recent mean service time, spread over the slots -- exceeds the lane's
+    deadline; a request that is admitted to the queue but still waiting at the deadline is shed then. Lanes are
+    process-wide, so every engine mounted in one server shares them (and the inference pool).
+    """
+
+    def __init__(
+        self,
+        deadlines_s: Optional[dict[str, float]] = None,
+        max_queue: Optional[dict[str, int]] = None,
+        capacity: Callable[[], int] = executor.workers,
+        enabled: bool = ADMISSION_ENABLED,
+        metrics: Metrics = METRICS,
+    ):
+        self.deadlines_s = deadlines_s or {
+            INTERACTIVE: ADMISSION_INTERACTIVE_DEADLINE_MS / 1000.0,
+            BULK: ADMISSION_BULK_DEADLINE_MS / 1000.0,
+        }
+        self.max_queue = max_queue or {INTERACTIVE: ADMISSION_INTERACTIVE_MAX_QUEUE, BULK: ADMISSION_BULK_MAX_QUEUE}
+        self.capacity = capacity
+        self.enabled = enabled
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._queues: dict[str, deque[_Waiter]] = {lane: deque() for lane in LANES}
+        self._in_flight = 0
+        self._service_s: dict[str, Optional[float]] = {lane: None for lane in LANES}
+        self.admitted = {lane: 0 for lane in LANES}
+        self.shed = {lane: 0 for lane in LANES}
+
+    async def run(self, lane: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """fn(*args, **kwargs) on the inference pool once a slot is free; raises Overloaded instead of waiting
+        past the lane deadline."""
+        return await self._run(lane, True, fn, *args, **kwargs)
+
+    async def run_queued(self, lane: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Like run() but never sheds: for follow-up work of an already admitted request (later stream chunks)."""
+        return await self._run(lane, False, fn, *args, **kwargs)
+
+    async def _run(self, lane: str, shed: bool, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if not self.enabled:
+            return await executor.run_inference(fn, *args, **kwargs)
+        t0 = time.perf_counter()
+        await self._acquire(lane, shed)
+        started = time.perf_counter()
+        add_stage("queue_wait", started - t0)
+        try:
+            work = asyncio.ensure_future(executor.run_inference(fn, *args, **kwargs))
+        except BaseException:
+            self._release(lane, None)
+            raise
+        # A cancelled caller (client disconnect, timeout) does not stop the call on the pool, so the slot is freed
+        # when the call finishes rather than when the caller stops waiting
+        work.add_done_callback(lambda done: self._finished(done, lane, started))
+        return await asyncio.shield(work)
+
+    def expected_wait_s(self, lane: str) -> float:
+        """Estimated wait for a request arriving now in `lane` (call with the lock held)."""
+        ahead = LANES[: LANES.index(lane) + 1]
+        known = [s for s in self._service_s.values() if s is not None]
+        default = sum(known) / len(known) if known else 0.0
+        work = sum(len(self._queues[l]) * (self._service_s[l] or default) for l in ahead)
+        work += self._in_flight * default / 2.0  # running calls are on average half done
+        return work / max(1, self.capacity())
+
+    async def _acquire(self, lane: str, shed: bool = True) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            ahead = LANES[: LANES.index(lane) + 1]
+            if self._in_flight < self.capacity() and not any(self._queues[l] for l in ahead):
+                self._in_flight += 1
+                self.admitted[lane] += 1
+                self._publish()
+                return
+            if shed and len(self._queues[lane]) >= self.max_queue[lane]:
+                raise self._shed(lane, "queue_full", self.expected_wait_s(lane))
+            wait = self.expected_wait_s(lane)
+            if shed and wait > self.deadlines_s[lane]:
+                raise self._shed(lane, "deadline", wait)
+            waiter = _Waiter(loop)
+            self._queues[lane].append(waiter)
+            self._publish()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.deadlines_s[lane] if shed else None)
+        except BaseException as e:
+            with self._lock:
+                if not waiter.granted:
+                    self._queues[lane].remove(waiter)
+                    self._publish()
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise self._shed(lane, "timeout", self.expected_wait_s(lane)) from None
+                    raise
+            # The slot was handed over just as we gave up: keep it if we timed out, give it back if cancelled
+            if not isinstance(e, asyncio.TimeoutError):
+                self._release(lane, None)
+                raise
+        with self._lock:
+            self.admitted[lane] += 1
+
+    def _finished(self, work: asyncio.Future, lane: str, started: float) -> None:
+        if not work.cancelled():
+            work.exception()  # retrieved here, so an abandoned call's error is not logged as never retrieved
+        self._release(lane, time.perf_counter() - started)
+
+    def _release(self, lane: str, service_s: Optional[float]) -> None:
+        with self._lock:
+            if service_s is not None:
+                prev = self._service_s[lane]
+                self._service_s[lane] = service_s if prev is None else prev + _EWMA_ALPHA * (service_s - prev)
+            for next_lane in LANES:
+                if self._queues[next_lane]:
+                    # Hand the slot straight to the next waiter; in_flight stays the same
+                    waiter = self._queues[next_lane].popleft()
+                    waiter.granted = True
+                    waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+                    break
+            else:
+                self._in_flight -= 1
+            self._publish()
+
+    def _shed(self, lane: str, reason: str, retry_after_s: float) -> Overloaded:
+        self.shed[lane] += 1
+        self.metrics.inc("ml_admission_shed_total", 1, (("lane", lane), ("reason", reason)))
+        return Overloaded(lane, reason, retry_after_s)
+
+    def _publish(self) -> None:
+        for lane in LANES:
+            self.metrics.set("ml_admission_queue_depth", len(self._queues[lane]), (("lane", lane),))
+        self.metrics.set("ml_admission_in_flight", self._in_flight)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "capacity": self.capacity(),
+                "in_flight": self._in_flight,
+                "lanes": {
+                    lane: {
+                        "queued": len(self._queues[lane]),
+                        "max_queue": self.max_queue[lane],
+                        "deadline_ms": round(self.deadlines_s[lane] * 1000.0, 1),
+                        "admitted": self.admitted[lane],
+                        "shed": self.shed[lane],
+                        "mean_service_ms": round((self._service_s[lane] or 0.0) * 1000.0, 3),
+                    }
+                    for lane in LANES
+                },
+            }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+ADMISSION = AdmissionController()
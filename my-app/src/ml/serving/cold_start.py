@@ -0,0 +1,139 @@
+# Cold-start timing: startup stage timer for containers, and a local measurement of process start -> first response.
+# Usage: from src/ run: python -m ml.serving.cold_start [--engines preference,carbon] [--warm 50]
+
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+
+class StartupTimer:
+    """Times the named stages of a container start (import, model_load, first_call, warm_call, ...) in ms."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round((time.perf_counter() - t0) * 1000.0, 2)
+
+    def time_call(self, name: str, fn: Callable[[], Any]) -> Any:
+        with self.stage(name):
+            return fn()
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add a stage timed elsewhere (e.g. the load and warm-up times a ModelRegistry measured)."""
+        self.stages[name] = round(seconds * 1000.0, 2)
+
+    def info(self) -> dict:
+        return {**self.stages, "total": round((time.perf_counter() - self.started) * 1000.0, 2)}
+
+
+_PREDICT_BODY = {
+    "user_preferences": {"pace": 0.4, "walking_effort": 0.3},
+    "itinerary_item": {"start_hour": 7.5, "walking_km": 6.0, "activity_count_today": 4},
+}
+_SCORE_BODY = {
+    "travel": {"trip_pace": 0.4, "eco_preference": 0.8},
+    "interests": ["museum", "food"],
+    "activity": {"category": "museum", "duration_hours": 2.0, "emission_kg": 2.5, "price_usd": 20.0},
+}
+_CARBON_BODY = {"itinerary_json": {"days": [{"activities": [{"id": "a", "category": "museum"}]}]}}
+
+# name -> (uvicorn target, request path, request body)
+ENGINES: dict[str, tuple[str, str, dict]] = {
+    "preference": ("ml.preference_engine.api:app", "/predict", _PREDICT_BODY),
+    "regret_protection": ("ml.regret_protection_engine.api:app", "/predict", _PREDICT_BODY),
+    "dual_regret": ("ml.dual_regret.api:app", "/predict", _PREDICT_BODY),
+    "preference_xgboost": ("ml.preference_engine_XGBoost.api:app", "/score", _SCORE_BODY),
+    "carbon": ("ml.carbon_engine.api:app", "/carbon_predictor", _CARBON_BODY),
+    "server": ("ml.serving.server:app", "/preference_xgboost/score", _SCORE_BODY),
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _post(url: str, body: dict, timeout: float = 30.0) -> float:
+    """POST JSON; returns latency in ms, raises on connection errors and non-2xx."""
+    data = json.dumps(body).encode()
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    t0 = time.perf_counter()
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        resp.read()
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def measure_engine(
+    target: str, path: str, body: dict, warm_requests: int = 50, timeout_s: float = 120.0
+) -> dict:
+    """Start `uvicorn target` in a fresh process and time process start -> first successful response, then warm calls."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning"],
+        cwd=SRC_DIR,
+    )
+    try:
+        first_ms: Optional[float] = None
+        while first_ms is None:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{target} exited with code {proc.returncode} before serving")
+            if time.perf_counter() - t0 > timeout_s:
+                raise TimeoutError(f"{target} did not answer {path} within {timeout_s}s")
+            try:
+                first_ms = _post(url, body)
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        cold_ms = (time.perf_counter() - t0) * 1000.0
+        warm = sorted(_post(url, body) for _ in range(max(1, warm_requests)))
+        return {
+            "cold_start_ms": round(cold_ms, 1),
+            "first_request_ms": round(first_ms, 2),
+            "warm_p50_ms": round(statistics.median(warm), 2),
+            "warm_p99_ms": round(warm[min(len(warm) - 1, int(len(warm) * 0.99))], 2),
+        }
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Process start -> first response, per engine")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="comma-separated: " + ", ".join(ENGINES))
+    parser.add_argument("--warm", type=int, default=50, help="warm requests per engine after the first")
+    args = parser.parse_args(argv)
+    print(f"{'engine':>20}{'cold start ms':>16}{'first req ms':>14}{'warm p50':>10}{'warm p99':>10}")
+    for name in args.engines.split(","):
+        target, path, body = ENGINES[name]
+        r = measure_engine(target, path, body, warm_requests=args.warm)
+        print(
+            f"{name:>20}{r['cold_start_ms']:>16.1f}{r['first_request_ms']:>14.2f}"
+            f"{r['warm_p50_ms']:>10.2f}{r['warm_p99_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
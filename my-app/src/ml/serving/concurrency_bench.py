@@ -0,0 +1,153 @@
+# Throughput / tail-latency sweep: inference pool size x XGBoost nthread x client concurrency, one server per setting.
+# Usage: from src/ run: python -m ml.serving.concurrency_bench [--engine preference_xgboost_batch] [--workers 1,2,4]
+#                                                               [--nthread 1,0] [--concurrency 1,8,32] [--requests 400]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .cold_start import _SCORE_BODY, ENGINES, SRC_DIR, _free_port, _post
+
+_BATCH_BODY = {
+    "travel": _SCORE_BODY["travel"],
+    "interests": _SCORE_BODY["interests"],
+    "activities": [
+        {"category": ("museum", "food", "nature", "nightlife")[i % 4], "duration_hours": 1.0 + i % 5}
+        for i in range(200)
+    ],
+}
+
+# name -> (uvicorn target, request path, request body); the cold-start engines plus a 200-activity /batch_score
+LOADS: dict[str, tuple[str, str, dict]] = {
+    **{name: spec for name, spec in ENGINES.items() if name != "server"},
+    "preference_xgboost_batch": ("ml.preference_engine_XGBoost.api:app", "/batch_score", _BATCH_BODY),
+}
+
+
+def _percentile(sorted_ms: list[float], q: float) -> float:
+    return sorted_ms[min(len(sorted_ms) - 1, int(len(sorted_ms) * q))]
+
+
+def _start_server(target: str, port: int, env: dict, path: str, body: dict, timeout_s: float) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning"],
+        cwd=SRC_DIR,
+        env={**os.environ, **env},
+    )
+    t0 = time.perf_counter()
+    url = f"http://127.0.0.1:{port}{path}"
+    while True:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{target} exited with code {proc.returncode} before serving")
+        if time.perf_counter() - t0 > timeout_s:
+            proc.kill()
+            raise TimeoutError(f"{target} did not answer {path} within {timeout_s}s")
+        try:
+            _post(url, body)
+            return proc
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.01)
+
+
+def _try_post(url: str, body: dict) -> tuple[Optional[float], Optional[int]]:
+    """(latency ms, None) for a 2xx; (None, HTTP status) otherwise, status 0 for a connection error or timeout."""
+    try:
+        return _post(url, body), None
+    except urllib.error.HTTPError as e:
+        e.close()
+        return None, e.code
+    except (urllib.error.URLError, OSError):
+        return None, 0
+
+
+def run_load(url: str, body: dict, concurrency: int, requests: int) -> dict:
+    """Send `requests` POSTs from `concurrency` client threads.
+
+    Latency percentiles (ms) and requests/s count successful requests only; 503s (admission control shedding load)
+    are counted as shed and any other failure as an error, so an overloaded setting shows up in the table instead
+    of aborting the sweep. p50/p99 are None when nothing succeeded.
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        t0 = time.perf_counter()
+        results = list(pool.map(lambda _: _try_post(url, body), range(requests)))
+        elapsed = time.perf_counter() - t0
+    latencies = sorted(ms for ms, _ in results if ms is not None)
+    statuses = [status for _, status in results if status is not None]
+    return {
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p99_ms": round(_percentile(latencies, 0.99), 2) if latencies else None,
+        "rps": round(len(latencies) / elapsed, 1),
+        "shed": statuses.count(503),
+        "errors": len(statuses) - statuses.count(503),
+    }
+
+
+def sweep(
+    load: str,
+    workers: list[int],
+    nthreads: list[int],
+    concurrency: list[int],
+    requests: int = 400,
+    timeout_s: float = 120.0,
+) -> list[dict]:
+    """One server process per (workers, nthread); every concurrency level is measured against it."""
+    target, path, body = LOADS[load]
+    rows = []
+    for n_workers in workers:
+        for nthread in nthreads:
+            port = _free_port()
+            env = {"ML_INFERENCE_WORKERS": str(n_workers), "PREFERENCE_ENGINE_XGBOOST_NTHREAD": str(nthread)}
+            proc = _start_server(target, port, env, path, body, timeout_s)
+            try:
+                url = f"http://127.0.0.1:{port}{path}"
+                for c in concurrency:
+                    run_load(url, body, c, min(requests, 4 * c))  # warm the pool threads
+                    rows.append({"workers": n_workers, "nthread": nthread, "concurrency": c,
+                                 **run_load(url, body, c, requests)})
+            finally:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+    return rows
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sweep inference pool size and nthread against client concurrency")
+    parser.add_argument("--engine", default="preference_xgboost_batch", choices=list(LOADS))
+    parser.add_argument("--workers", type=_ints, default=[1, 2, 4], help="ML_INFERENCE_WORKERS values")
+    parser.add_argument("--nthread", type=_ints, default=[1, 0], help="XGBoost nthread values (0 = auto)")
+    parser.add_argument("--concurrency", type=_ints, default=[1, 8, 32], help="concurrent client requests")
+    parser.add_argument("--requests", type=int, default=400, help="requests per measurement")
+    args = parser.parse_args(argv)
+    print(f"{args.engine}: {LOADS[args.engine][1]} ({os.cpu_count()} CPUs)")
+    print(
+        f"{'workers':>8}{'nthread':>8}{'clients':>8}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}{'shed':>8}{'errors':>8}"
+    )
+    rows = sweep(args.engine, args.workers, args.nthread, args.concurrency, args.requests)
+    for r in rows:
+        print(
+            f"{r['workers']:>8}{r['nthread']:>8}{r['concurrency']:>8}"
+            f"{_ms(r['p50_ms']):>10}{_ms(r['p99_ms']):>10}{r['rps']:>10.1f}{r['shed']:>8}{r['errors']:>8}"
+        )
+    best = max(rows, key=lambda r: r["rps"])
+    print(f"best throughput: workers={best['workers']} nthread={best['nthread']} at {best['concurrency']} clients")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Config package for serving
@@ -0,0 +1,25 @@
+# Serving config shared by the engine APIs (env-overridable).
+
+import os
+
+# Poll the model artifact every N seconds and hot-swap when it changes (0 = only POST /admin/reload)
+MODEL_WATCH_SECONDS = float(os.environ.get("ML_MODEL_WATCH_SECONDS", "0"))
+# POST /admin/reload requires header X-Admin-Token with this value; unset = admin routes answer 403
+ADMIN_TOKEN = os.environ.get("ML_ADMIN_TOKEN") or None
+# Per-stage latency histograms on /metrics and Server-Timing headers (set to 0 to drop the middleware)
+METRICS_ENABLED = os.environ.get("ML_METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+# ml.serving.server: engine prefixes to mount (empty = all) and to import + warm at startup instead of first request
+SERVER_ENGINES = tuple(e for e in os.environ.get("ML_SERVER_ENGINES", "").split(",") if e)
+SERVER_PRELOAD = tuple(e for e in os.environ.get("ML_SERVER_PRELOAD", "").split(",") if e)
+# Threads in the dedicated inference pool (ml.serving.executor); 0 = min(4, CPU count)
+INFERENCE_WORKERS = int(os.environ.get("ML_INFERENCE_WORKERS", "0"))
+# Admission control in front of the inference pool (ml.serving.admission; set to 0 to queue everything, unbounded)
+ADMISSION_ENABLED = os.environ.get("ML_ADMISSION_ENABLED", "1").lower() not in ("0", "false", "no")
+# Requests scoring at most this many items go to the interactive lane (scheduled first), larger ones to bulk
+ADMISSION_INTERACTIVE_MAX_ITEMS = int(os.environ.get("ML_ADMISSION_INTERACTIVE_MAX_ITEMS", "64"))
+# Longest a request may wait for a slot before it is shed with 503 + Retry-After, per lane
+ADMISSION_INTERACTIVE_DEADLINE_MS = float(os.environ.get("ML_ADMISSION_INTERACTIVE_DEADLINE_MS", "5000"))
+ADMISSION_BULK_DEADLINE_MS = float(os.environ.get("ML_ADMISSION_BULK_DEADLINE_MS", "30000"))
+# Queue bound per lane; a full lane sheds immediately
+ADMISSION_INTERACTIVE_MAX_QUEUE = int(os.environ.get("ML_ADMISSION_INTERACTIVE_MAX_QUEUE", "256"))
+ADMISSION_BULK_MAX_QUEUE = int(os.environ.get("ML_ADMISSION_BULK_MAX_QUEUE", "32"))
@@ -0,0 +1,54 @@
+# Dedicated, explicitly sized thread pool for CPU-bound inference (instead of AnyIO's shared 40-thread default).
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .config.defaults import INFERENCE_WORKERS
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_workers = INFERENCE_WORKERS or min(4, os.cpu_count() or 1)
+
+
+def workers() -> int:
+    return _workers
+
+
+def threads_per_worker() -> int:
+    """CPU cores per inference thread, so pool size x library threads does not over-subscribe the machine."""
+    return max(1, (os.cpu_count() or 1) // _workers)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="inference")
+    return _executor
+
+
+def configure(n_workers: int) -> None:
+    """Resize the pool; work already submitted finishes on the old one."""
+    global _executor, _workers
+    with _lock:
+        old, _executor = _executor, None
+        _workers = max(1, n_workers)
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+async def run_inference(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await fn(*args, **kwargs) on the inference pool, inside a copy of the caller's context (metrics stages)."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def info() -> dict:
+    return {"workers": _workers, "threads_per_worker": threads_per_worker()}
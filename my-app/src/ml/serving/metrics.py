@@ -0,0 +1,288 @@
+# Low-overhead request metrics: fixed-bucket histograms, per-stage timings, Prometheus text, Server-Timing.
+
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from .config.defaults import METRICS_ENABLED
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000)
+
+Labels = tuple[tuple[str, str], ...]
+
+_HELP = {
+    "ml_request_duration_seconds": ("histogram", "Request latency from first byte in to response start, by endpoint"),
+    "ml_stage_duration_seconds": (
+        "histogram",
+        "Time per request stage: validate, handler (containing features, inference, explain, ...), serialize",
+    ),
+    "ml_batch_size": ("histogram", "Items scored per request or per micro-batch"),
+    "ml_model_load_seconds": ("gauge", "Time to load the active model artifact"),
+    "ml_model_warmup_seconds": ("gauge", "Time of the warm-up inference for the active model"),
+    "ml_model_loaded_timestamp_seconds": ("gauge", "Unix time the active model was swapped in"),
+    "ml_model_info": ("gauge", "Active model version (value is always 1)"),
+    "ml_admission_queue_depth": ("gauge", "Requests waiting for an inference slot, by lane"),
+    "ml_admission_in_flight": ("gauge", "Inference calls holding a slot"),
+    "ml_admission_shed_total": ("counter", "Requests rejected with 503 by admission control, by lane and reason"),
+}
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Process-wide store of histograms and gauges keyed by (name, labels); one lock, O(log buckets) per observe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, Labels], Histogram] = {}
+        self._gauges: dict[tuple[str, Labels], float] = {}
+        self._help = dict(_HELP)
+
+    def describe(self, name: str, kind: str, text: str) -> None:
+        self._help[name] = (kind, text)
+
+    def observe(self, name: str, value: float, labels: Labels = (), buckets: tuple = LATENCY_BUCKETS) -> None:
+        key = (name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    def set(self, name: str, value: float, labels: Labels = ()) -> None:
+        with self._lock:
+            self._gauges[(name, labels)] = value
+
+    def inc(self, name: str, value: float = 1.0, labels: Labels = ()) -> None:
+        """Add to a counter (rendered like a gauge; describe it with kind "counter")."""
+        with self._lock:
+            self._gauges[(name, labels)] = self._gauges.get((name, labels), 0.0) + value
+
+    def remove(self, name: str, match: Callable[[Labels], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._gauges if k[0] == name and match(k[1])]:
+                del self._gauges[key]
+
+    def histogram(self, name: str, labels: Labels) -> Optional[Histogram]:
+        return self._histograms.get((name, labels))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._gauges.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = sorted((k, (list(h.counts), h.sum, h.count, h.buckets)) for k, h in self._histograms.items())
+            gauges = sorted(self._gauges.items())
+        lines: list[str] = []
+        seen: set[str] = set()
+
+        def header(name: str, default_kind: str) -> None:
+            if name not in seen:
+                seen.add(name)
+                kind, text = self._help.get(name, (default_kind, name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), (counts, total, count, buckets) in histograms:
+            header(name, "histogram")
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', _fmt_num(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_num(total)}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+        for (name, labels), value in gauges:
+            header(name, "gauge")
+            lines.append(f"{name}{_fmt_labels(labels)} {_fmt_num(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _fmt_num(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+METRICS = Metrics()
+
+# Per-request timing state, set by MetricsMiddleware; None outside an instrumented request (then stage() is a no-op)
+_current: ContextVar[Optional[dict]] = ContextVar("ml_request_timings", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as request stage `name` (accumulates if entered more than once per request)."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = timings["stages"]
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - t0
+
+
+def add_stage(name: str, seconds: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings["stages"][name] = timings["stages"].get(name, 0.0) + seconds
+
+
+def record_batch_size(n: int) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings["batch_size"] = n
+
+
+def timed(endpoint: Callable) -> Callable:
+    """Mark when the endpoint body starts/ends so the middleware can split validate / handler / serialize."""
+
+    def mark(key: str) -> None:
+        timings = _current.get()
+        if timings is not None:
+            timings[key] = time.perf_counter()
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            mark("handler_start")
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                mark("handler_end")
+
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            mark("handler_start")
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                mark("handler_end")
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-request stage timings -> histograms + a Server-Timing response header."""
+
+    def __init__(self, app: Any, engine: str, metrics: Metrics = METRICS):
+        self.app = app
+        self.engine = engine
+        self.metrics = metrics
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings: dict = {"start": time.perf_counter(), "stages": {}}
+        token = _current.set(timings)
+
+        async def send_with_timing(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                timings["response_start"] = time.perf_counter()
+                timings["status"] = message["status"]
+                header = _server_timing(_breakdown(timings))
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._record(scope, timings)
+
+    def _record(self, scope: dict, timings: dict) -> None:
+        route = scope.get("route")
+        endpoint = getattr(route, "path", None) or "unmatched"
+        base = (("engine", self.engine), ("endpoint", endpoint))
+        status = str(timings.get("status", 500))
+        breakdown = _breakdown(timings)
+        m = self.metrics
+        m.observe("ml_request_duration_seconds", breakdown.pop("total"), base + (("status", status),))
+        for name, seconds in breakdown.items():
+            m.observe("ml_stage_duration_seconds", seconds, base + (("stage", name),))
+        if "batch_size" in timings:
+            m.observe("ml_batch_size", timings["batch_size"], base, buckets=SIZE_BUCKETS)
+
+
+def _breakdown(timings: dict) -> dict[str, float]:
+    end = timings.get("response_start") or time.perf_counter()
+    out: dict[str, float] = {}
+    if "handler_start" in timings:
+        out["validate"] = timings["handler_start"] - timings["start"]
+        if "handler_end" in timings:
+            out["handler"] = timings["handler_end"] - timings["handler_start"]
+    out.update(timings["stages"])
+    if "handler_end" in timings:
+        out["serialize"] = max(0.0, end - timings["handler_end"])
+    out["total"] = end - timings["start"]
+    return out
+
+
+def _server_timing(breakdown: dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000.0:.3f}" for name, seconds in breakdown.items())
+
+
+def metrics_response() -> Any:
+    from fastapi.responses import PlainTextResponse
+
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def observe_model_versions(engine: str, registry: Any, metrics: Metrics = METRICS) -> None:
+    """Export load/warm-up timings of every model version the registry swaps in."""
+
+    def update(version: Any) -> None:
+        labels = (("engine", engine),)
+        metrics.set("ml_model_load_seconds", version.load_seconds, labels)
+        metrics.set("ml_model_warmup_seconds", version.warmup_seconds, labels)
+        metrics.set("ml_model_loaded_timestamp_seconds", version.loaded_at, labels)
+        metrics.remove("ml_model_info", lambda ls: ls[0] == ("engine", engine))
+        metrics.set("ml_model_info", 1, labels + (("version", version.version),))
+
+    registry.on_swap(update)
+
+
+def instrument(app: Any, engine: str, registry: Any = None, enabled: bool = METRICS_ENABLED) -> None:
+    """Add GET /metrics, the timing middleware and model-load gauges to an engine app."""
+    app.add_api_route("/metrics", metrics_response, methods=["GET"], include_in_schema=False)
+    if registry is not None:
+        observe_model_versions(engine, registry)
+    if enabled:
+        app.add_middleware(MetricsMiddleware, engine=engine)
@@ -0,0 +1,213 @@
+# Versioned model registry: lazy load, background reload + warm-up, atomic swap.
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+from .config.defaults import MODEL_WATCH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Every registry created in this process, by name (one per engine); the multi-engine server reports on all of them
+REGISTRIES: dict[str, "ModelRegistry"] = {}
+_registries_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    model: Any
+    version: str  # sha256 prefix of the artifact bytes
+    path: str
+    loaded_at: float  # unix time
+    load_seconds: float
+    warmup_seconds: float
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "loaded_at": round(self.loaded_at, 3),
+            "load_ms": round(self.load_seconds * 1000.0, 2),
+            "warmup_ms": round(self.warmup_seconds * 1000.0, 2),
+        }
+
+
+def file_version(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:12]
+
+
+def _fingerprint(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ModelRegistry:
+    """Holds the active model for one engine and replaces it without a restart.
+
+    current() loads lazily on first use. reload() loads and warms a new version *outside* the lock and then swaps
+    the reference in one assignment, so requests that already called current() keep the version they started
+    with and new requests see either the old or the new version, never a half-loaded one. A failed reload keeps
+    the active version and is reported in info()["last_error"].
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[Path], Any],
+        path: Path | str,
+        warmup: Optional[Callable[[Any], None]] = None,
+        watch: Sequence[Path | str] = (),
+    ):
+        self.name = name
+        self.loader = loader
+        self.path = Path(path)
+        # Other files the loader may read instead of / besides path (e.g. an exported copy); a change to any reloads
+        self.watch = [Path(p) for p in watch]
+        self.warmup = warmup
+        self._active: Optional[ModelVersion] = None
+        self._fingerprint: Optional[tuple] = None
+        self._load_lock = threading.Lock()  # one load at a time; readers never take it once a model is active
+        self._listeners: list[Callable[[ModelVersion], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        REGISTRIES[name] = self
+
+    def current(self) -> ModelVersion:
+        active = self._active
+        if active is None:
+            with self._load_lock:
+                if self._active is None:
+                    self._swap(self._load())
+                active = self._active
+        return active
+
+    def get(self) -> Any:
+        return self.current().model
+
+    def on_swap(self, listener: Callable[[ModelVersion], None]) -> None:
+        """Call listener(new_version) after every swap (e.g. to invalidate result caches)."""
+        self._listeners.append(listener)
+
+    def reload(self, force: bool = False) -> ModelVersion:
+        """Load the artifact again if it changed (or force) and swap it in; returns the active version."""
+        with self._load_lock:
+            active = self._active
+            if active is not None and not force:
+                if self._fingerprints() == self._fingerprint or self._version() == active.version:
+                    self._fingerprint = self._fingerprints()
+                    return active
+            try:
+                new = self._load()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+            self._swap(new)
+            if active is not None:
+                self.reloads += 1
+                logger.info("%s: model %s -> %s", self.name, active.version, new.version)
+            return new
+
+    def _load(self) -> ModelVersion:
+        fingerprint = self._fingerprints()
+        version = self._version()
+        t0 = time.perf_counter()
+        model = self.loader(self.path)
+        load_seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        if self.warmup is not None:
+            self.warmup(model)
+        warmup_seconds = time.perf_counter() - t0
+        self._fingerprint = fingerprint
+        return ModelVersion(
+            model=model,
+            version=version,
+            path=str(self.path),
+            loaded_at=time.time(),
+            load_seconds=load_seconds,
+            warmup_seconds=warmup_seconds,
+        )
+
+    def _fingerprints(self) -> Optional[tuple]:
+        """mtime/size of path and every watched file; None when none of them exists."""
+        fingerprints = tuple(_fingerprint(p) for p in (self.path, *self.watch))
+        return None if all(f is None for f in fingerprints) else fingerprints
+
+    def _version(self) -> str:
+        """file_version of path; with watched files, a hash over every file's version."""
+        versions = [file_version(p) if p.exists() else "missing" for p in (self.path, *self.watch)]
+        if len(versions) == 1 or set(versions) == {"missing"}:
+            return versions[0]
+        return hashlib.sha256("|".join(versions).encode()).hexdigest()[:12]
+
+    def _swap(self, new: ModelVersion) -> None:
+        self._active = new
+        self.last_error = None
+        for listener in self._listeners:
+            listener(new)
+
+    def start_watching(self, interval_seconds: float = MODEL_WATCH_SECONDS) -> None:
+        """Poll the artifact's mtime/size in a daemon thread and reload in the background when it changes."""
+        if interval_seconds <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval_seconds,), name=f"{self.name}-model-watch", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch(self, interval_seconds: float) -> None:
+        while not self._stop.wait(interval_seconds):
+            fingerprint = self._fingerprints()
+            if fingerprint is None or fingerprint == self._fingerprint:
+                continue
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("%s: reload of %s failed; keeping current model", self.name, self.path)
+                self._fingerprint = fingerprint  # don't retry the same broken file every tick
+
+    def info(self) -> dict:
+        active = self._active
+        out: dict = {"loaded": active is not None, "reloads": self.reloads}
+        if active is not None:
+            out.update(active.info())
+        if self.last_error:
+            out["last_error"] = self.last_error
+        return out
+
+
+def shared_registry(
+    name: str,
+    loader: Callable[[Path], Any],
+    path: Path | str,
+    warmup: Optional[Callable[[Any], None]] = None,
+) -> ModelRegistry:
+    """The registry called `name` if this process already has one, else a new one.
+
+    Apps serving the same artifact (an engine and dual_regret in the combined server) then load, warm and reload it
+    once, and a reload through either app is seen by both.
+    """
+    with _registries_lock:
+        registry = REGISTRIES.get(name)
+        if registry is None:
+            registry = ModelRegistry(name, loader, path, warmup=warmup)
+        return registry
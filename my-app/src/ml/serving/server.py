@@ -0,0 +1,107 @@
+# One ASGI app for every engine: each mounted under a path prefix, imported and loaded on first use.
+# Run: from src/ run: uvicorn ml.serving.server:app
+
+import importlib
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Mount
+
+from .admission import ADMISSION
+from .config.defaults import SERVER_ENGINES, SERVER_PRELOAD
+from .metrics import metrics_response
+from .registry import REGISTRIES
+
+# prefix -> "module:attribute" of the engine's FastAPI app; request/response contracts are the engines' own
+ENGINES = {
+    "preference": "ml.preference_engine.api:app",
+    "regret_protection": "ml.regret_protection_engine.api:app",
+    "dual_regret": "ml.dual_regret.api:app",
+    "preference_xgboost": "ml.preference_engine_XGBoost.api:app",
+    "carbon": "ml.carbon_engine.api:app",
+}
+
+
+class LazyEngine:
+    """ASGI app that imports the target engine app on the first request (in a worker thread) and delegates to it.
+
+    Importing pulls in that engine's dependencies (pandas/sklearn/xgboost) only when it is actually used; the model
+    itself is then loaded by the engine's ModelRegistry on its first request.
+    """
+
+    def __init__(self, target: str):
+        self.target = target
+        self._app: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._app is not None
+
+    def load(self) -> Any:
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    module_name, attr = self.target.split(":")
+                    self._app = getattr(importlib.import_module(module_name), attr)
+                    for registry in list(REGISTRIES.values()):
+                        registry.start_watching()
+        return self._app
+
+    def warm(self) -> None:
+        """Import the engine and load + warm its model now instead of on the first request."""
+        self.load()
+        module = importlib.import_module(self.target.split(":")[0])
+        get_model = getattr(module, "get_model", None)
+        if get_model is not None:
+            get_model()
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        app = self._app if self._app is not None else await run_in_threadpool(self.load)
+        await app(scope, receive, send)
+
+
+def create_app(engines: Optional[dict[str, str]] = None, preload: tuple[str, ...] = SERVER_PRELOAD) -> FastAPI:
+    if engines is None:
+        engines = {k: v for k, v in ENGINES.items() if not SERVER_ENGINES or k in SERVER_ENGINES}
+    mounts = {prefix: LazyEngine(target) for prefix, target in engines.items()}
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        for prefix in preload:
+            if prefix in mounts:
+                await run_in_threadpool(mounts[prefix].warm)
+        try:
+            yield
+        finally:
+            for registry in list(REGISTRIES.values()):
+                registry.stop_watching()
+
+    app = FastAPI(
+        title="PlantRoute inference server",
+        description="All engines in one process: " + ", ".join(f"/{p}" for p in mounts),
+        lifespan=lifespan,
+    )
+
+    @app.get("/health")
+    def health() -> dict:
+        return {
+            "status": "ok",
+            "engines": {
+                prefix: {"target": lazy.target, "imported": lazy.loaded} for prefix, lazy in mounts.items()
+            },
+            "models": {name: registry.info() for name, registry in REGISTRIES.items()},
+            "admission": ADMISSION.stats(),
+        }
+
+    app.add_api_route("/metrics", metrics_response, methods=["GET"], include_in_schema=False)
+    for prefix, lazy in mounts.items():
+        app.router.routes.append(Mount(f"/{prefix}", app=lazy))
+    app.state.engines = mounts
+    return app
+
+
+app = create_app()
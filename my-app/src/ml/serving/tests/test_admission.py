@@ -0,0 +1,153 @@
+# Tests for admission control: lane priority, shedding, metrics.
+
+import asyncio
+import threading
+
+import pytest
+
+from ml.serving.admission import BULK, INTERACTIVE, AdmissionController, Overloaded, lane_for
+from ml.serving.metrics import Metrics
+
+
+def _controller(**kwargs) -> AdmissionController:
+    kwargs.setdefault("deadlines_s", {INTERACTIVE: 5.0, BULK: 5.0})
+    kwargs.setdefault("max_queue", {INTERACTIVE: 10, BULK: 10})
+    return AdmissionController(capacity=lambda: 1, enabled=True, metrics=Metrics(), **kwargs)
+
+
+async def _occupy(ctrl: AdmissionController, release: threading.Event) -> asyncio.Task:
+    """Start a call that holds the single slot until `release` is set."""
+    task = asyncio.ensure_future(ctrl.run(BULK, release.wait, 5))
+    while ctrl.stats()["in_flight"] == 0:
+        await asyncio.sleep(0.001)
+    return task
+
+
+def test_lane_for() -> None:
+    assert lane_for(1) == INTERACTIVE
+    assert lane_for(10_000) == BULK
+
+
+def test_interactive_runs_before_earlier_bulk() -> None:
+    ctrl = _controller()
+    order = []
+
+    async def main():
+        release = threading.Event()
+        blocker = await _occupy(ctrl, release)
+        bulk = asyncio.ensure_future(ctrl.run(BULK, order.append, "bulk"))
+        await asyncio.sleep(0.01)
+        interactive = asyncio.ensure_future(ctrl.run(INTERACTIVE, order.append, "interactive"))
+        await asyncio.sleep(0.01)
+        assert ctrl.stats()["lanes"][BULK]["queued"] == 1
+        assert ctrl.stats()["lanes"][INTERACTIVE]["queued"] == 1
+        release.set()
+        await asyncio.gather(blocker, bulk, interactive)
+
+    asyncio.run(main())
+    assert order == ["interactive", "bulk"]
+    assert ctrl.stats()["in_flight"] == 0
+
+
+def test_waiting_past_deadline_is_shed_with_retry_after() -> None:
+    ctrl = _controller(deadlines_s={INTERACTIVE: 0.05, BULK: 0.05})
+
+    async def main():
+        release = threading.Event()
+        blocker = await _occupy(ctrl, release)
+        try:
+            with pytest.raises(Overloaded) as exc:
+                await ctrl.run(INTERACTIVE, lambda: None)
+        finally:
+            release.set()
+            await blocker
+        return exc.value
+
+    err = asyncio.run(main())
+    assert err.status_code == 503
+    assert err.reason == "timeout"
+    assert int(err.headers["Retry-After"]) >= 1
+    lane = ctrl.stats()["lanes"][INTERACTIVE]
+    assert (lane["queued"], lane["shed"]) == (0, 1)
+    assert 'ml_admission_shed_total{lane="interactive",reason="timeout"} 1' in ctrl.metrics.render()
+
+
+def test_expected_wait_over_deadline_fails_fast() -> None:
+    ctrl = _controller(deadlines_s={INTERACTIVE: 5.0, BULK: 0.5})
+    ctrl._service_s[BULK] = 2.0  # recent bulk calls took 2 s each
+
+    async def main():
+        release = threading.Event()
+        blocker = await _occupy(ctrl, release)
+        try:
+            with pytest.raises(Overloaded) as exc:
+                await ctrl.run(BULK, lambda: None)
+            # Interactive work is not held back by the same estimate
+            queued = asyncio.ensure_future(ctrl.run(INTERACTIVE, lambda: "ok"))
+            await asyncio.sleep(0.01)
+        finally:
+            release.set()
+            await blocker
+        return exc.value, await queued
+
+    err, result = asyncio.run(main())
+    assert err.reason == "deadline"
+    assert result == "ok"
+
+
+def test_full_lane_is_shed() -> None:
+    ctrl = _controller(max_queue={INTERACTIVE: 10, BULK: 0})
+
+    async def main():
+        release = threading.Event()
+        blocker = await _occupy(ctrl, release)
+        try:
+            with pytest.raises(Overloaded) as exc:
+                await ctrl.run(BULK, lambda: None)
+        finally:
+            release.set()
+            await blocker
+        return exc.value
+
+    assert asyncio.run(main()).reason == "queue_full"
+    assert 'ml_admission_queue_depth{lane="bulk"} 0' in ctrl.metrics.render()
+
+
+def test_run_queued_never_sheds() -> None:
+    ctrl = _controller(deadlines_s={INTERACTIVE: 0.01, BULK: 0.01}, max_queue={INTERACTIVE: 0, BULK: 0})
+
+    async def main():
+        release = threading.Event()
+        blocker = await _occupy(ctrl, release)
+        queued = asyncio.ensure_future(ctrl.run_queued(BULK, lambda: "done"))
+        await asyncio.sleep(0.05)
+        release.set()
+        await blocker
+        return await queued
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_cancelled_call_holds_its_slot_until_the_pool_work_ends() -> None:
+    ctrl = _controller()
+    order = []
+
+    async def main():
+        release = threading.Event()
+        blocker = await _occupy(ctrl, release)
+        queued = asyncio.ensure_future(ctrl.run(INTERACTIVE, order.append, "queued"))
+        await asyncio.sleep(0.01)
+        # The caller gives up (client disconnect) while its call still runs on the pool
+        blocker.cancel()
+        await asyncio.sleep(0.05)
+        assert ctrl.stats()["in_flight"] == 1
+        assert ctrl.stats()["lanes"][INTERACTIVE]["queued"] == 1
+        assert order == []
+        release.set()
+        await queued
+        with pytest.raises(asyncio.CancelledError):
+            await blocker
+
+    asyncio.run(main())
+    assert order == ["queued"]
+    assert ctrl.stats()["in_flight"] == 0
@@ -0,0 +1,30 @@
+# Tests for cold-start timing.
+
+import importlib.util
+import time
+
+import pytest
+
+from ml.serving.cold_start import ENGINES, StartupTimer, measure_engine
+
+
+def test_startup_timer_records_stages() -> None:
+    timer = StartupTimer()
+    with timer.stage("import"):
+        time.sleep(0.002)
+    assert timer.time_call("warm_call", lambda: 42) == 42
+    timer.record("model_load", 0.0125)
+    info = timer.info()
+    assert info["import"] >= 2.0
+    assert info["model_load"] == 12.5
+    assert set(info) == {"import", "warm_call", "model_load", "total"}
+    assert info["total"] >= info["import"]
+
+
+@pytest.mark.skipif(importlib.util.find_spec("uvicorn") is None, reason="uvicorn not installed")
+def test_measure_engine_end_to_end() -> None:
+    target, path, body = ENGINES["carbon"]
+    result = measure_engine(target, path, body, warm_requests=3)
+    assert result["cold_start_ms"] > 0
+    assert result["cold_start_ms"] >= result["first_request_ms"]
+    assert result["warm_p50_ms"] <= result["warm_p99_ms"]
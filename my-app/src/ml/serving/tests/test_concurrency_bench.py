@@ -0,0 +1,38 @@
+# Tests for the concurrency sweep's load generator.
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ml.serving.concurrency_bench import run_load
+
+
+class _EveryThirdShed(BaseHTTPRequestHandler):
+    count = 0
+    lock = threading.Lock()
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with self.lock:
+            type(self).count += 1
+            n = self.count
+        status = 503 if n % 3 == 0 else 500 if n % 10 == 0 else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def test_run_load_counts_shed_and_failed_requests() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EveryThirdShed)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        result = run_load(f"http://127.0.0.1:{server.server_port}/score", {}, concurrency=4, requests=30)
+    finally:
+        server.shutdown()
+    # Requests 3, 6, ... 30 are shed; 10 and 20 fail; the rest succeed
+    assert (result["shed"], result["errors"]) == (10, 2)
+    assert result["p50_ms"] is not None and result["rps"] > 0
@@ -0,0 +1,35 @@
+# Tests for the inference thread pool.
+
+import asyncio
+import contextvars
+import threading
+
+from ml.serving import executor
+
+_request_id: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+
+
+def test_run_inference_uses_pool_and_keeps_context() -> None:
+    def work(x, y=0):
+        return threading.current_thread().name, _request_id.get(), x + y
+
+    async def call():
+        _request_id.set("r1")
+        return await executor.run_inference(work, 1, y=2)
+
+    name, request_id, total = asyncio.run(call())
+    assert name.startswith("inference")
+    assert request_id == "r1"
+    assert total == 3
+
+
+def test_configure_resizes_pool() -> None:
+    before = executor.workers()
+    try:
+        executor.configure(3)
+        assert executor.workers() == 3
+        assert executor.get_executor()._max_workers == 3
+        assert executor.info()["workers"] == 3
+        assert executor.threads_per_worker() >= 1
+    finally:
+        executor.configure(before)
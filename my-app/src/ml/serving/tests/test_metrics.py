@@ -0,0 +1,53 @@
+# Tests for request metrics, Server-Timing and the Prometheus exposition.
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ml.serving.metrics import METRICS, Metrics, instrument, record_batch_size, stage, timed
+
+
+def test_histogram_buckets_and_render() -> None:
+    m = Metrics()
+    labels = (("engine", "e"), ("endpoint", "/x"))
+    for v in (0.0004, 0.001, 0.003, 20.0):
+        m.observe("ml_request_duration_seconds", v, labels)
+    m.set("ml_model_info", 1, (("engine", "e"), ("version", 'a"b')))
+    text = m.render()
+    assert "# TYPE ml_request_duration_seconds histogram" in text
+    assert 'ml_request_duration_seconds_bucket{engine="e",endpoint="/x",le="0.0005"} 1' in text
+    assert 'ml_request_duration_seconds_bucket{engine="e",endpoint="/x",le="0.001"} 2' in text  # le is inclusive
+    assert 'ml_request_duration_seconds_bucket{engine="e",endpoint="/x",le="10"} 3' in text
+    assert 'ml_request_duration_seconds_bucket{engine="e",endpoint="/x",le="+Inf"} 4' in text
+    assert 'ml_request_duration_seconds_count{engine="e",endpoint="/x"} 4' in text
+    assert 'ml_model_info{engine="e",version="a\\"b"} 1' in text
+
+
+def test_stage_is_noop_outside_requests() -> None:
+    with stage("features"):
+        pass
+    record_batch_size(3)  # no request in flight: nothing to record, no error
+
+
+def test_middleware_reports_stages() -> None:
+    app = FastAPI()
+    instrument(app, "test_engine")
+
+    @app.post("/work")
+    @timed
+    def work(n: int = 1) -> dict:
+        record_batch_size(n)
+        with stage("inference"):
+            pass
+        return {"n": n}
+
+    client = TestClient(app)
+    r = client.post("/work?n=7")
+    assert r.status_code == 200 and r.json() == {"n": 7}
+    timing = {part.split(";")[0] for part in r.headers["server-timing"].split(", ")}
+    assert {"validate", "handler", "inference", "serialize", "total"} <= timing
+
+    base = (("engine", "test_engine"), ("endpoint", "/work"))
+    assert METRICS.histogram("ml_stage_duration_seconds", base + (("stage", "inference"),)).count >= 1
+    assert METRICS.histogram("ml_batch_size", base).sum >= 7
+    text = client.get("/metrics").text
+    assert 'ml_request_duration_seconds_count{engine="test_engine",endpoint="/work",status="200"}' in text
@@ -0,0 +1,128 @@
+# Tests for the versioned model registry and admin reload route.
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ml.serving.admin import admin_router
+from ml.serving.registry import ModelRegistry
+
+
+def _loader(path: Path) -> str:
+    text = path.read_text()
+    if text == "broken":
+        raise ValueError("corrupt artifact")
+    return text
+
+
+@pytest.fixture
+def artifact(tmp_path: Path) -> Path:
+    p = tmp_path / "model.bin"
+    p.write_text("v1")
+    return p
+
+
+def _rewrite(path: Path, text: str) -> None:
+    path.write_text(text)
+    # Make sure mtime moves even on coarse-grained filesystems
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_lazy_load_and_warmup(artifact: Path) -> None:
+    warmed = []
+    registry = ModelRegistry("t", _loader, artifact, warmup=warmed.append)
+    assert registry.info()["loaded"] is False
+    assert registry.get() == "v1"
+    assert warmed == ["v1"]
+    info = registry.info()
+    assert info["loaded"] is True and len(info["version"]) == 12 and info["load_ms"] >= 0
+
+
+def test_reload_swaps_only_when_artifact_changes(artifact: Path) -> None:
+    registry = ModelRegistry("t", _loader, artifact)
+    swaps = []
+    registry.on_swap(lambda v: swaps.append(v.model))
+    first = registry.current()
+    assert registry.reload() is first  # unchanged file: no reload
+    _rewrite(artifact, "v2")
+    second = registry.reload()
+    assert second.model == "v2" and second.version != first.version
+    # A request that grabbed the old version keeps it
+    assert first.model == "v1"
+    assert registry.get() == "v2"
+    assert swaps == ["v1", "v2"]
+    assert registry.info()["reloads"] == 1
+
+
+def test_change_to_a_watched_file_reloads(artifact: Path) -> None:
+    export = artifact.with_name("model.export")
+    # Prefers the export when there is one, like the XGBoost engine's native sidecar
+    registry = ModelRegistry("t", lambda p: _loader(export if export.exists() else p), artifact, watch=[export])
+    first = registry.current()
+    assert first.model == "v1"
+    export.write_text("exported")
+    second = registry.reload()
+    assert second.model == "exported" and second.version != first.version
+    assert registry.reload() is second
+    _rewrite(artifact, "v2")
+    assert registry.reload() is not second
+
+
+def test_failed_reload_keeps_active_model(artifact: Path) -> None:
+    registry = ModelRegistry("t", _loader, artifact)
+    registry.get()
+    _rewrite(artifact, "broken")
+    with pytest.raises(ValueError):
+        registry.reload()
+    assert registry.get() == "v1"
+    assert "corrupt artifact" in registry.info()["last_error"]
+
+
+def test_watcher_picks_up_new_artifact(artifact: Path) -> None:
+    registry = ModelRegistry("t", _loader, artifact)
+    registry.get()
+    registry.start_watching(interval_seconds=0.01)
+    try:
+        _rewrite(artifact, "v2")
+        deadline = time.monotonic() + 5
+        while registry.get() != "v2" and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        registry.stop_watching()
+    assert registry.get() == "v2"
+
+
+def test_admin_reload_route(artifact: Path) -> None:
+    registry = ModelRegistry("t", _loader, artifact)
+    app = FastAPI()
+    app.include_router(admin_router(registry, token="secret"))
+    client = TestClient(app)
+    registry.get()
+    _rewrite(artifact, "v2")
+    assert client.post("/admin/reload").status_code == 403
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "secreT"}).status_code == 403
+    r = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert r.status_code == 200
+    assert r.json()["model"]["version"] == registry.current().version
+    assert registry.get() == "v2"
+    _rewrite(artifact, "broken")
+    r = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert r.status_code == 500
+    assert registry.get() == "v2"
+
+
+def test_admin_reload_disabled_without_token(artifact: Path) -> None:
+    registry = ModelRegistry("t", _loader, artifact)
+    app = FastAPI()
+    app.include_router(admin_router(registry, token=None))
+    client = TestClient(app)
+    registry.get()
+    for headers in ({}, {"X-Admin-Token": ""}):
+        r = client.post("/admin/reload", params={"force": True}, headers=headers)
+        assert r.status_code == 403
+    assert registry.info()["reloads"] == 0
@@ -0,0 +1,60 @@
+# Tests for the multi-engine server.
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ml.serving.server import LazyEngine, create_app
+
+ML_DIR = Path(__file__).resolve().parents[2]
+XGB_MODEL = ML_DIR / "preference_engine_XGBoost" / "artifacts" / "model.joblib"
+LINEAR_MODEL = ML_DIR / "preference_engine" / "data" / "model.pkl"
+
+
+def test_engines_are_imported_on_first_request() -> None:
+    app = create_app({"carbon": "ml.carbon_engine.api:app"})
+    client = TestClient(app)
+    lazy: LazyEngine = app.state.engines["carbon"]
+    assert not lazy.loaded
+    assert client.get("/health").json()["engines"]["carbon"]["imported"] is False
+    r = client.post("/carbon/carbon_predictor", json={"itinerary_json": {"days": [{"hotel": {"id": "h"}}]}})
+    assert r.status_code == 200
+    assert r.json()["total_kg"] == 15.0
+    assert lazy.loaded
+    assert client.get("/health").json()["engines"]["carbon"]["imported"] is True
+
+
+def test_mounted_engines_keep_their_contracts() -> None:
+    if not XGB_MODEL.exists() or not LINEAR_MODEL.exists():
+        pytest.skip("Models not trained")
+    from ml.preference_engine.api import app as preference_app
+    from ml.preference_engine_XGBoost.api import app as xgb_app
+
+    client = TestClient(create_app())
+    body = {
+        "travel": {"trip_pace": 0.4},
+        "interests": ["museum"],
+        "activities": [{"category": "museum", "duration_hours": 2.0}, {"category": "ski", "price_usd": 90.0}],
+    }
+    r = client.post("/preference_xgboost/batch_score", json=body)
+    assert r.status_code == 200
+    assert r.json() == TestClient(xgb_app).post("/batch_score", json=body).json()
+
+    predict = {"user_preferences": {}, "itinerary_item": {"start_hour": 7.0, "walking_km": 9.0}}
+    r = client.post("/preference/predict", json=predict)
+    assert r.status_code == 200
+    assert r.json() == TestClient(preference_app).post("/predict", json=predict).json()
+
+    health = client.get("/health").json()
+    assert health["models"]["preference_engine_XGBoost"]["loaded"] is True
+    assert "ml_request_duration_seconds" in client.get("/metrics").text
+
+
+def test_preload_warms_models() -> None:
+    if not LINEAR_MODEL.exists():
+        pytest.skip("Model not trained")
+    app = create_app({"regret_protection": "ml.regret_protection_engine.api:app"}, preload=("regret_protection",))
+    with TestClient(app) as client:
+        assert app.state.engines["regret_protection"].loaded
+        assert client.get("/health").json()["models"]["regret_protection_engine"]["loaded"] is True